@@ -1,6 +1,10 @@
 # -*- coding: utf-8 -*-
 """Main script of current project"""
+from multiprocessing import freeze_support
+
+from blf_converter.common.batch_converter import BatchConverter, find_blf_files, print_summary
 from blf_converter.common.blf_converter import BlfConverter
+from blf_converter.common.utils import get_channel_dbc_files
 from blf_converter.module.args_parser import parser
 
 
@@ -10,9 +14,38 @@ def main():
     blf = args_dict.get("blf_file")
     dbc = args_dict.get("dbc_file")
     signal_list = args_dict.get("signal_list")
-    blf_converter = BlfConverter(blf, dbc, signal_list)
-    blf_converter.decode(to_type='csv')
+    num_workers = args_dict.get("workers")
+    dbc_cache_dir = args_dict.get("dbc_cache_dir")
+    batch = args_dict.get("batch")
+    to_type = args_dict.get("to_type")
+    compression = args_dict.get("compression")
+    converter_options = {"float_precision": args_dict.get("float_precision"),
+                         "resample_rate": args_dict.get("resample_rate"),
+                         "resample_method": args_dict.get("resample_method"),
+                         "start": args_dict.get("start"),
+                         "end": args_dict.get("end"),
+                         "use_index": args_dict.get("index"),
+                         "bulk_decoding": args_dict.get("bulk"),
+                         "max_memory": args_dict.get("max_memory"),
+                         "compression": None if compression == 'none' else compression,
+                         "row_group_size": args_dict.get("row_group_size"),
+                         "channel_dbc_files": get_channel_dbc_files(args_dict.get("channel_dbc"),
+                                                                    args_dict.get("channel_config"))}
+    if batch is not None:
+        blf_files = find_blf_files(batch)
+        if not blf_files:
+            raise SystemExit(f"No BLF files found for {batch}")
+        batch_converter = BatchConverter(blf_files, dbc, signal_list, num_workers, dbc_cache_dir,
+                                         **converter_options)
+        results = batch_converter.decode(to_type)
+        print_summary(results)
+        if not all(result.success for result in results):
+            raise SystemExit(1)
+        return
+    blf_converter = BlfConverter(blf, dbc, signal_list, num_workers, dbc_cache_dir=dbc_cache_dir, **converter_options)
+    blf_converter.decode(to_type)
 
 
 if __name__ == '__main__':
+    freeze_support()
     main()
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+import glob
+import time
+from dataclasses import dataclass
+from multiprocessing import Pool
+from pathlib import Path
+
+from blf_converter.common.blf_converter import BlfConverter
+from blf_converter.common.signal_decoder import ChannelDecoder, SignalDecoder, build_decoder
+
+# Decoder and options of the batch in a worker process, set once by the pool initializer.
+_worker_decoder: SignalDecoder | ChannelDecoder | None = None
+_worker_options: dict = {}
+
+
+@dataclass
+class BatchResult:
+    """
+    Result of the conversion of a single BLF file of a batch.
+    """
+    blf_file: Path
+    size: int
+    seconds: float
+    output: dict | Path | None = None
+    error: str | None = None
+
+    @property
+    def success(self) -> bool:
+        """True if the file was converted without an error."""
+        return self.error is None
+
+    @property
+    def throughput(self) -> float:
+        """Processed megabytes of the BLF file per second."""
+        return self.size / 1e6 / self.seconds if self.seconds > 0 else 0.0
+
+    def __str__(self) -> str:
+        if not self.success:
+            return f"{self.blf_file}: FAILED after {self.seconds:.2f} s: {self.error}"
+        return (f"{self.blf_file}: {self.size / 1e6:.1f} MB in {self.seconds:.2f} s "
+                f"({self.throughput:.1f} MB/s)")
+
+
+def find_blf_files(pattern: Path) -> list[Path]:
+    """
+    Find the BLF files of a batch.
+
+    Parameters
+    ----------
+    pattern : Path
+        A directory, whose BLF files are converted, or a glob pattern, e.g. logs/**/*.blf.
+
+    Returns
+    -------
+    list[Path]
+        The sorted paths of the BLF files.
+    """
+    if pattern.is_dir():
+        files = (path for path in pattern.iterdir() if path.suffix.lower() == '.blf')
+    else:
+        files = (Path(path) for path in glob.glob(str(pattern), recursive=True))
+    return sorted(path for path in files if path.is_file())
+
+
+def _init_worker(decoder: SignalDecoder | ChannelDecoder, options: dict) -> None:
+    """
+    Store the decoder and options of the batch in a worker process.
+
+    Parameters
+    ----------
+    decoder : SignalDecoder | ChannelDecoder
+        The decoder of the requested signals.
+    options : dict
+        The arguments of convert_file besides the BLF file.
+    """
+    global _worker_decoder, _worker_options
+    _worker_decoder = decoder
+    _worker_options = options
+
+
+def _convert_file_in_worker(blf_file: Path) -> BatchResult:
+    """
+    Convert a BLF file with the decoder and options of the worker process.
+
+    Parameters
+    ----------
+    blf_file : Path
+        Path to the BLF file.
+
+    Returns
+    -------
+    BatchResult
+        The result of the conversion.
+    """
+    assert _worker_decoder is not None
+    return convert_file(blf_file, decoder=_worker_decoder, **_worker_options)
+
+
+def convert_file(blf_file: Path, dbc_files: list[Path], signal_list: list[str],
+                 decoder: SignalDecoder | ChannelDecoder, to_type: str = 'csv', **converter_options) -> BatchResult:
+    """
+    Convert a single BLF file of a batch and measure the duration.
+
+    Errors are not raised but returned in the result, so a broken file does not stop the batch.
+
+    Parameters
+    ----------
+    blf_file : Path
+        Path to the BLF file.
+    dbc_files : list[Path]
+        List of paths to the DBC files.
+    signal_list : list[str]
+        List of signals to decode.
+    decoder : SignalDecoder | ChannelDecoder
+        The decoder of the requested signals.
+    to_type : str
+        Output format (mf4, csv, resampled, parquet or feather), by default csv.
+    **converter_options
+        Further options of the BlfConverter, e.g. float_precision or resample_rate.
+
+    Returns
+    -------
+    BatchResult
+        The result of the conversion.
+    """
+    start = time.perf_counter()
+    result = BatchResult(blf_file=blf_file, size=blf_file.stat().st_size, seconds=0.0)
+    try:
+        converter = BlfConverter(blf_file, dbc_files, signal_list, decoder=decoder, **converter_options)
+        result.output = converter.decode(to_type)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+class BatchConverter:
+    """
+    BatchConverter class to decode many BLF files with the same DBC files and signals.
+
+    The DBC files are loaded and the decoder is built only once for the whole batch. With more than one worker,
+    whole files are distributed to a process pool, the largest files first, so the workers are evenly loaded. If only
+    one file is converted at a time, e.g. a batch of a single file, the workers decode the chunks of that file instead.
+    """
+
+    def __init__(self, blf_files: list[Path], dbc_file: list[Path], signal_list: list[str], num_workers: int = 1,
+                 dbc_cache_dir: Path | None = None, **converter_options):
+        """
+        Initialize the BatchConverter class.
+
+        Parameters
+        ----------
+        blf_files : list[Path]
+            Paths to the BLF files.
+        dbc_file : list[Path]
+            List of paths to the DBC files.
+        signal_list : list[str]
+            List of signals to decode.
+        num_workers : int
+            Number of worker processes, each converting one file at a time, or decoding the chunks of the only file
+            of the batch, by default 1.
+        dbc_cache_dir : Path | None
+            Directory to cache the loaded DBC files, by default None (no caching).
+        **converter_options
+            Further options of the BlfConverter of every file, e.g. float_precision or resample_rate.
+        """
+        self.blf_files = blf_files
+        self.dbc = dbc_file
+        self.signals = signal_list
+        self.num_workers = num_workers
+        self.dbc_cache_dir = dbc_cache_dir
+        self.converter_options = converter_options
+
+    def decode(self, to_type: str) -> list[BatchResult]:
+        """
+        Decode all BLF files and print the result of every file.
+
+        Parameters
+        ----------
+        to_type : str
+            Output format (mf4, csv, resampled, parquet or feather).
+
+        Returns
+        -------
+        list[BatchResult]
+            The results in the order of the BLF files.
+        """
+        decoder = build_decoder(self.dbc, self.signals, self.dbc_cache_dir,
+                                self.converter_options.get('channel_dbc_files'))
+        options = {'dbc_files': self.dbc, 'signal_list': self.signals, 'to_type': to_type, **self.converter_options}
+        results: dict[Path, BatchResult] = {}
+        num_workers = min(self.num_workers, len(self.blf_files))
+        if options.get('max_memory') is not None:
+            # The files converted in parallel share the memory budget
+            options['max_memory'] //= max(num_workers, 1)
+        if num_workers <= 1:
+            # The files are converted one after the other, each with a pool of its own for the chunks
+            options['num_workers'] = self.num_workers
+            for blf_file in self.blf_files:
+                results[blf_file] = convert_file(blf_file, decoder=decoder, **options)
+                print(results[blf_file])
+        else:
+            largest_first = sorted(self.blf_files, key=lambda path: path.stat().st_size, reverse=True)
+            with Pool(num_workers, initializer=_init_worker, initargs=(decoder, options)) as pool:
+                for result in pool.imap_unordered(_convert_file_in_worker, largest_first):
+                    results[result.blf_file] = result
+                    print(result)
+        return [results[blf_file] for blf_file in self.blf_files]
+
+
+def print_summary(results: list[BatchResult]) -> None:
+    """
+    Print the total throughput and the failed files of a batch.
+
+    Parameters
+    ----------
+    results : list[BatchResult]
+        The results of the batch.
+    """
+    failed = [result for result in results if not result.success]
+    size = sum(result.size for result in results)
+    seconds = sum(result.seconds for result in results)
+    print(f"Converted {len(results) - len(failed)} of {len(results)} files "
+          f"({size / 1e6:.1f} MB, {seconds:.2f} s decoding time)")
+    for result in failed:
+        print(f"Failed: {result.blf_file}: {result.error}")
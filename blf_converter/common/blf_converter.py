@@ -1,11 +1,12 @@
 # -*- coding: utf-8 -*-
+from datetime import datetime
 from pathlib import Path
 
-from asammdf import MDF
-
+from blf_converter.common.memory_budget import DEFAULT_CHUNK_SIZE, ChunkBudget
 from blf_converter.common.processing_chunks import read_blf_file
+from blf_converter.common.signal_decoder import ChannelDecoder, SignalDecoder
+from blf_converter.common.signal_writers import DEFAULT_ROW_GROUP_SIZE
 from blf_converter.common.utils import validate_paths
-from blf_converter.module.signal_files_rename import CSVFileRenamer
 
 
 class BlfConverter:
@@ -14,7 +15,14 @@ class BlfConverter:
     Including methods to decode BLF files to different formats.
     """
 
-    def __init__(self, blf_file: Path, dbc_file: list[Path], signal_list: list[str]):
+    def __init__(self, blf_file: Path, dbc_file: list[Path], signal_list: list[str], num_workers: int = 1,
+                 float_precision: int | None = None, dbc_cache_dir: Path | None = None,
+                 decoder: SignalDecoder | ChannelDecoder | None = None, resample_rate: float = 100.0,
+                 resample_method: str = 'zoh',
+                 start: float | datetime | None = None, end: float | datetime | None = None,
+                 use_index: bool = False, bulk_decoding: bool = False,
+                 channel_dbc_files: dict[int, list[Path]] | None = None, max_memory: int | None = None,
+                 compression: str | None = 'zstd', row_group_size: int = DEFAULT_ROW_GROUP_SIZE):
         """
         Initialize the CustomBLF class.
 
@@ -23,17 +31,65 @@ class BlfConverter:
         blf_file : str
             Path to the BLF file.
         dbc_file : List[str]
-            List of paths to the DBC files.
+            List of paths to the DBC files, used for all channels without own DBC files.
         signal_list : List[str]
             List of signals to decode.
+        num_workers : int
+            Number of worker processes to decode the chunks, by default 1.
+        float_precision : int | None
+            Number of decimals of float values in exported CSV files, by default None (full precision).
+        dbc_cache_dir : Path | None
+            Directory to cache the loaded DBC files, by default None (no caching).
+        decoder : SignalDecoder | ChannelDecoder | None
+            Decoder of the signal list built beforehand, e.g. shared by a batch, by default None (the DBC files are
+            loaded for this file).
+        resample_rate : float
+            Sample rate in Hz of the time grid of the resampled export, by default 100.
+        resample_method : str
+            Resampling method of the resampled export, 'zoh' (zero-order hold) or 'linear', by default 'zoh'.
+        start : float | datetime | None
+            Start of the decoded time window in seconds relative to the start of the measurement or as point in
+            time, by default None (start of the file).
+        end : float | datetime | None
+            End of the decoded time window in seconds relative to the start of the measurement or as point in time,
+            by default None (end of the file).
+        use_index : bool
+            Whether to build and use a sidecar index of the BLF file to skip log containers without requested
+            messages, by default False.
+        bulk_decoding : bool
+            Whether to parse the frames into arrays and decode them in bulk per message with NumPy, by default
+            False (every frame is decoded on its own).
+        channel_dbc_files : dict[int, list[Path]] | None
+            DBC files of single CAN channels of a multi-bus log, by channel number starting at 1, by default None
+            (all channels are decoded with dbc_file).
+        max_memory : int | None
+            Memory budget in bytes of the decoded chunks. The chunk size and the number of chunks in flight are
+            adapted to the memory per frame measured while decoding, by default None (chunks of DEFAULT_CHUNK_SIZE
+            frames).
+        compression : str | None
+            Compression codec of the Parquet and Feather export, e.g. zstd, lz4 or None (uncompressed), by default
+            zstd.
+        row_group_size : int
+            Number of samples per row group of the Parquet and Feather export, by default DEFAULT_ROW_GROUP_SIZE.
         """
         self.blf: Path = blf_file
         self.dbc = dbc_file
         self.signals = signal_list
+        self.num_workers = num_workers
+        self.float_precision = float_precision
+        self.dbc_cache_dir = dbc_cache_dir
+        self.decoder = decoder
+        self.resample_rate = resample_rate
+        self.resample_method = resample_method
+        self.start = start
+        self.end = end
+        self.use_index = use_index
+        self.bulk_decoding = bulk_decoding
+        self.channel_dbc_files = channel_dbc_files
+        self.compression = compression
+        self.row_group_size = row_group_size
         validate_paths(self.blf, self.dbc, self.output_path)
-        # Set default values for chunk size and RAM size.
-        # These values can be adjusted based on the system configuration and data volume.
-        self.chunk_size = 150000  # Defines the number of records to process in each chunk.
+        self.chunk_size: int | ChunkBudget = DEFAULT_CHUNK_SIZE if max_memory is None else ChunkBudget(max_memory)
 
     @property
     def name(self) -> str:
@@ -73,42 +129,82 @@ class BlfConverter:
         """
         self.output_path.joinpath(self.name + ".mf4").unlink(missing_ok=True)
         output_filename = self.output_path / 'mf4' / (self.name + ".mf4")
-        mf4_file = read_blf_file(self.blf, self.dbc, self.chunk_size, output_filename, self.signals)
+        mf4_file = read_blf_file(self.blf, self.dbc, self.chunk_size, output_filename, self.signals,
+                                 self.num_workers, dbc_cache_dir=self.dbc_cache_dir, decoder=self.decoder,
+                                 start=self.start, end=self.end, use_index=self.use_index,
+                                 bulk_decoding=self.bulk_decoding,
+                                 channel_dbc_files=self.channel_dbc_files)
         return mf4_file
 
     def _decode_blf2csv(self) -> dict:
         """
-        Decode the BLF file and export the data to a CSV file.
+        Decode the BLF file and export the data to one CSV file per signal.
+
+        The CSV files are written directly from the decoded chunks, without an intermediate MF4 file.
 
         Returns
         -------
-        Path
-            Directory of the exported CSV files.
+        dict
+            A dictionary mapping signal names to their CSV files.
         """
-
-        mf4_filename = self._decode_blf2mf4()
-        mdf = MDF(mf4_filename)
         csv_file_path = self.output_path / 'csv'
-        if not csv_file_path.is_dir():
-            csv_file_path.mkdir(parents=True, exist_ok=True)
-        mdf.export(filename=csv_file_path, fmt='csv', add_units=False, reduce_memory_usage=True)
-        renamer = CSVFileRenamer(self.output_path)
-        renamer.rename_files()
+        read_blf_file(self.blf, self.dbc, self.chunk_size, csv_file_path, self.signals, self.num_workers,
+                      to_type='csv', dbc_cache_dir=self.dbc_cache_dir, decoder=self.decoder, start=self.start,
+                      end=self.end, use_index=self.use_index, bulk_decoding=self.bulk_decoding,
+                      channel_dbc_files=self.channel_dbc_files, float_precision=self.float_precision)
         return self._get_data_mapping()
 
-    def _get_data_mapping(self) -> dict:
+    def _decode_blf2resampled(self) -> Path:
+        """
+        Decode the BLF file and export all signals resampled onto a common time grid to a single CSV file.
+
+        Returns
+        -------
+        Path
+            Output .csv file.
+        """
+        output_filename = self.output_path / 'resampled' / (self.name + ".csv")
+        return read_blf_file(self.blf, self.dbc, self.chunk_size, output_filename, self.signals, self.num_workers,
+                             to_type='resampled', dbc_cache_dir=self.dbc_cache_dir, decoder=self.decoder,
+                             start=self.start, end=self.end, use_index=self.use_index,
+                             bulk_decoding=self.bulk_decoding, channel_dbc_files=self.channel_dbc_files,
+                             rate=self.resample_rate, method=self.resample_method,
+                             float_precision=self.float_precision)
+
+    def _decode_blf2arrow(self, to_type: str) -> dict:
+        """
+        Decode the BLF file and export the data to one Parquet or Feather file per signal.
+
+        Parameters
+        ----------
+        to_type : str
+            Output format (parquet or feather).
+
+        Returns
+        -------
+        dict
+            A dictionary mapping signal names to their files.
+        """
+        read_blf_file(self.blf, self.dbc, self.chunk_size, self.output_path / to_type, self.signals, self.num_workers,
+                      to_type=to_type, dbc_cache_dir=self.dbc_cache_dir, decoder=self.decoder, start=self.start,
+                      end=self.end, use_index=self.use_index, bulk_decoding=self.bulk_decoding,
+                      channel_dbc_files=self.channel_dbc_files, compression=self.compression,
+                      row_group_size=self.row_group_size)
+        return self._get_data_mapping(to_type)
+
+    def _get_data_mapping(self, folder: str = 'csv') -> dict:
         """
-        Get a mapping of file names to their corresponding paths in the csv directory.
+        Get a mapping of file names to their corresponding paths in the export directory.
 
         Parameters:
         ----------
-        export_path: Path
-            The base path where the 'csv' folder is located.
+        folder: str
+            The folder of the output path where the files are located, by default 'csv'.
 
         Returns: dict
             A dictionary mapping file names to their full paths.
         """
-        csv_dir = Path(self.output_path) / 'csv'
+        csv_dir = Path(self.output_path) / folder
         data_mapping: dict = {}
 
         # Check if the csv directory exists
@@ -129,7 +225,7 @@ class BlfConverter:
         Parameters
         ----------
         to_type : str
-            Output format (mf4 or csv).
+            Output format (mf4, csv, resampled, parquet or feather).
 
         Returns
         -------
@@ -140,5 +236,9 @@ class BlfConverter:
             return self._decode_blf2mf4()
         elif to_type == 'csv':
             return self._decode_blf2csv()
+        elif to_type == 'resampled':
+            return self._decode_blf2resampled()
+        elif to_type in ('parquet', 'feather'):
+            return self._decode_blf2arrow(to_type)
         else:
             raise ValueError(f"Unsupported output format: {to_type}")
@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+import mmap
+import struct
+from collections.abc import Generator, Iterator
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from can.io.blf import (BLFParseError, CAN_FD_MESSAGE, CAN_FD_MESSAGE_64, CAN_MESSAGE, CAN_MESSAGE2, CAN_MSG_EXT,
+                        OBJ_HEADER_BASE_STRUCT, OBJ_HEADER_V1_STRUCT, OBJ_HEADER_V2_STRUCT)
+
+from blf_converter.common.blf_index import load_or_build_index
+from blf_converter.common.blf_reader import SeekableBLFReader, resolve_time
+from blf_converter.common.memory_budget import ChunkBudget, current_chunk_size
+
+# Maximum number of data bytes of a CAN FD frame.
+MAX_DATA_LENGTH = 64
+# Structured array type of parsed CAN frames, the fields correspond to the attributes of can.Message.
+# dlc is the number of valid bytes in data, the remaining bytes are zero.
+FRAME_DTYPE = np.dtype([('timestamp', '<f8'), ('channel', '<i2'), ('arbitration_id', '<u4'),
+                        ('is_extended_id', '?'), ('is_fd', '?'), ('dlc', 'u1'), ('data', 'u1', (MAX_DATA_LENGTH,))])
+# Object types parsed into frames. Error frames carry no signals and are skipped.
+FRAME_OBJECT_TYPES = (CAN_MESSAGE, CAN_MESSAGE2, CAN_FD_MESSAGE, CAN_FD_MESSAGE_64)
+# Offset of the data bytes in the object data of the frame object types, behind the object header.
+DATA_OFFSETS = {CAN_MESSAGE: 8, CAN_MESSAGE2: 8, CAN_FD_MESSAGE: 20, CAN_FD_MESSAGE_64: 40}
+# Signature and size fields of the object header base.
+OBJ_SIGNATURE_SIZE_STRUCT = struct.Struct("<4s4xL")
+# Minimum size of the decompressed data parsed at once, small log containers are joined up to this size.
+PARSE_BUFFER_SIZE = 1 << 18
+# Minimum size of a log container which is parsed in place instead of being joined with other log containers.
+IN_PLACE_PARSE_SIZE = 1 << 16
+
+
+def parse_frames(data: bytes | memoryview, start_timestamp: float = 0.0) -> tuple[np.ndarray, int]:
+    """
+    Parse the CAN and CAN FD message objects of decompressed log containers into a structured array.
+
+    Only the offsets of the objects are found one by one, the fields of all frames are gathered from the data at once. The
+    frames have the same values as the messages of can.BLFReader, except that error frames are skipped. The data is not
+    copied, so it may also be a view on a mapped file.
+
+    Parameters
+    ----------
+    data : bytes | memoryview
+        The decompressed data, starting with an object.
+    start_timestamp : float
+        The start of the measurement as POSIX timestamp, by default 0.0 (timestamps relative to the start).
+
+    Returns
+    -------
+    tuple[np.ndarray, int]
+        The frames as array of FRAME_DTYPE in file order, and the end of the last complete object, where the object
+        continuing in the next log container starts.
+
+    Raises
+    ------
+    BLFParseError
+        If the data does not continue with an object.
+    """
+    object_positions, end = _object_positions(data)
+    # The fields of complete objects are gathered in place, only the data bytes may reach beyond the buffer
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    positions = np.array(object_positions, dtype=np.int64)
+    versions = _gather(buffer, positions + 6, '<u2')
+    types = _gather(buffer, positions + 12, '<u4')
+    positions = positions[np.isin(types, FRAME_OBJECT_TYPES) & ((versions == 1) | (versions == 2))]
+    frames = np.zeros(len(positions), dtype=FRAME_DTYPE)
+    if not len(positions):
+        return frames, end
+
+    versions = _gather(buffer, positions + 6, '<u2')
+    types = _gather(buffer, positions + 12, '<u4')
+    header_size = np.where(versions == 1, OBJ_HEADER_V1_STRUCT.size, OBJ_HEADER_V2_STRUCT.size)
+    body = positions + OBJ_HEADER_BASE_STRUCT.size + header_size
+    is_fd = types == CAN_FD_MESSAGE
+    is_fd_64 = types == CAN_FD_MESSAGE_64
+
+    # The object headers of both versions start with the flags, followed by the timestamp at offset 8
+    time_flags = _gather(buffer, positions + OBJ_HEADER_BASE_STRUCT.size, '<u4')
+    timestamps = _gather(buffer, positions + OBJ_HEADER_BASE_STRUCT.size + 8, '<u8')
+    frames['timestamp'] = np.where(time_flags == 1, timestamps * 1e-5, timestamps * 1e-9) + start_timestamp
+    channels = np.where(is_fd_64, _gather(buffer, body, 'u1'), _gather(buffer, body, '<u2'))
+    frames['channel'] = channels.astype(np.int32) - 1
+    can_ids = _gather(buffer, body + 4, '<u4')
+    frames['arbitration_id'] = can_ids & 0x1FFFFFFF
+    frames['is_extended_id'] = (can_ids & CAN_MSG_EXT) != 0
+    frames['is_fd'] = np.select([is_fd, is_fd_64], [_gather(buffer, body + 13, 'u1') & 0x1,
+                                                    _gather(buffer, body + 12, '<u4') & 0x1000]) != 0
+    lengths = np.select([is_fd, is_fd_64], [_gather(buffer, body + 14, 'u1'), _gather(buffer, body + 2, 'u1')],
+                        np.minimum(_gather(buffer, body + 3, 'u1'), 8))
+    lengths = np.minimum(lengths, MAX_DATA_LENGTH)
+    frames['dlc'] = lengths
+
+    data_offsets = np.select([is_fd, is_fd_64], [DATA_OFFSETS[CAN_FD_MESSAGE], DATA_OFFSETS[CAN_FD_MESSAGE_64]],
+                             DATA_OFFSETS[CAN_MESSAGE])
+    data_indices = (body + data_offsets)[:, None] + np.arange(MAX_DATA_LENGTH)
+    if data_indices[-1, -1] >= len(buffer):
+        np.minimum(data_indices, len(buffer) - 1, out=data_indices)
+    payload = buffer[data_indices]
+    payload[np.arange(MAX_DATA_LENGTH) >= lengths[:, None]] = 0
+    frames['data'] = payload
+    return frames, end
+
+
+def _object_positions(data: bytes | memoryview) -> tuple[list[int], int]:
+    """
+    Find the complete objects in decompressed data like iter_objects, in one tight loop over the object headers.
+
+    The headers are unpacked in place, so the data may also be a view on a mapped file.
+
+    Parameters
+    ----------
+    data : bytes | memoryview
+        The decompressed data, starting with an object.
+
+    Returns
+    -------
+    tuple[list[int], int]
+        The offsets of the complete objects and the end of the last complete object.
+
+    Raises
+    ------
+    BLFParseError
+        If the data does not continue with an object.
+    """
+    unpack_header = OBJ_SIGNATURE_SIZE_STRUCT.unpack_from
+    header_size = OBJ_HEADER_BASE_STRUCT.size
+    last_header = len(data) - header_size
+    positions: list[int] = []
+    append = positions.append
+    pos = 0
+    while pos <= last_header:
+        signature, obj_size = unpack_header(data, pos)
+        if signature != b"LOBJ":
+            # Objects are aligned, so the next object starts within the padding bytes
+            padding = bytes(data[pos:pos + 8]).find(b"LOBJ")
+            if padding == -1:
+                raise BLFParseError("Could not find next object")
+            pos += padding
+            continue
+        if obj_size < header_size:
+            raise BLFParseError(f"Invalid object size {obj_size}")
+        if pos + obj_size > len(data):
+            break
+        append(pos)
+        pos += obj_size
+    return positions, pos
+
+
+def _gather(buffer: np.ndarray, positions: np.ndarray, dtype: str) -> np.ndarray:
+    """
+    Read a field of the given type at every position of a buffer.
+
+    Parameters
+    ----------
+    buffer : np.ndarray
+        The data as uint8 array.
+    positions : np.ndarray
+        The offsets of the field.
+    dtype : str
+        The type of the field.
+
+    Returns
+    -------
+    np.ndarray
+        The value of the field at every position.
+    """
+    field_type = np.dtype(dtype)
+    return buffer[positions[:, None] + np.arange(field_type.itemsize)].view(field_type)[:, 0]
+
+
+def iter_frames(filename: Path, chunk_size: int | ChunkBudget, start: float | datetime | None = None,
+                end: float | datetime | None = None, frame_ids: set[int] | None = None,
+                use_index: bool = False) -> Iterator[np.ndarray]:
+    """
+    Read a BLF file lazily and yield its CAN frames as structured arrays.
+
+    This is the counterpart of iter_chunks for bulk processing, the frames of a log container are parsed at once
+    without creating a can.Message per frame.
+
+    Parameters
+    ----------
+    filename : Path
+        Path to the BLF file.
+    chunk_size : int | ChunkBudget
+        The maximum number of frames per array, or the memory budget which adapts it before every array.
+    start : float | datetime | None
+        The start of the time window, see iter_chunks, by default None (start of the file).
+    end : float | datetime | None
+        The end of the time window, see iter_chunks, by default None (end of the file).
+    frame_ids : set[int] | None
+        The arbitration ids of the frames to read, used to skip log containers with the index, by default None
+        (all ids).
+    use_index : bool
+        Whether to use the sidecar index of the BLF file, by default False.
+
+    Yields
+    ------
+    np.ndarray
+        The next frames as array of FRAME_DTYPE.
+    """
+    with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+        reader = SeekableBLFReader(mapped_file)
+        start_time = resolve_time(start, reader.start_timestamp)
+        end_time = resolve_time(end, reader.start_timestamp)
+        index = load_or_build_index(filename) if use_index else None
+        containers = reader.window_containers(start_time, end_time, index, frame_ids)
+        container_frames = _iter_container_frames(reader, containers)
+        pending: list[np.ndarray] = []
+        count = 0
+        try:
+            for frames in container_frames:
+                if start_time is not None or end_time is not None:
+                    frames = frames[_window_mask(frames['timestamp'], start_time, end_time)]
+                pending.append(frames)
+                count += len(frames)
+                while count >= (size := current_chunk_size(chunk_size)):
+                    chunk = np.concatenate(pending)
+                    yield chunk[:size]
+                    pending = [chunk[size:]]
+                    count -= size
+        finally:
+            # Release the views on the mapped file before it is closed
+            container_frames.close()
+        if count:
+            yield np.concatenate(pending)
+
+
+def _iter_container_frames(reader: SeekableBLFReader,
+                           containers: Iterator[tuple[int, int | None]]) -> Generator[np.ndarray, None, None]:
+    """
+    Parse the frames of log containers, joining the data of small log containers.
+
+    Large log containers are parsed in place, so uncompressed log containers of a mapped file are not copied. Only
+    the object which continues from the data before is completed with the beginning of the container.
+
+    Parameters
+    ----------
+    reader : SeekableBLFReader
+        The reader of the BLF file.
+    containers : Iterator[tuple[int, int | None]]
+        The log containers to read, see SeekableBLFReader.window_containers.
+
+    Yields
+    ------
+    np.ndarray
+        The frames of the next log containers.
+    """
+    parts: list[bytes | memoryview] = []
+    size = 0
+    for offset, first_object in containers:
+        data = reader.container_buffer(offset)
+        if first_object is not None:
+            # Not continued by this container, the incomplete last object of the data before is dropped
+            if size:
+                yield parse_frames(b"".join(parts), reader.start_timestamp)[0]
+            parts, size = [], 0
+            data = data[first_object:]
+        if size and len(data) >= IN_PLACE_PARSE_SIZE:
+            pending = b"".join(parts)
+            head = _continued_object_end(pending, data)
+            if head is not None:
+                yield parse_frames(pending + bytes(data[:head]), reader.start_timestamp)[0]
+                parts, size = [], 0
+                data = data[head:]
+        if not size and len(data) >= IN_PLACE_PARSE_SIZE:
+            frames, pos = parse_frames(data, reader.start_timestamp)
+            yield frames
+            parts, size = [bytes(data[pos:])], len(data) - pos
+            continue
+        parts.append(data)
+        size += len(data)
+        if size >= PARSE_BUFFER_SIZE:
+            joined = b"".join(parts)
+            frames, pos = parse_frames(joined, reader.start_timestamp)
+            yield frames
+            parts, size = [joined[pos:]], len(joined) - pos
+    if size:
+        yield parse_frames(b"".join(parts), reader.start_timestamp)[0]
+
+
+def _continued_object_end(pending: bytes, data: bytes | memoryview) -> int | None:
+    """
+    Get the end of the object in the next data which continues the incomplete last object of the pending data.
+
+    Parameters
+    ----------
+    pending : bytes
+        The pending data, starting with an object.
+    data : bytes | memoryview
+        The next data, continuing the pending data.
+
+    Returns
+    -------
+    int | None
+        The number of bytes of the next data which complete the pending data, None if the object continues beyond
+        the next data or its header is invalid.
+    """
+    tail = pending[_object_positions(pending)[1]:]
+    if not tail:
+        return 0
+    probe = tail + bytes(data[:OBJ_HEADER_BASE_STRUCT.size + 8])
+    obj_pos = probe.find(b"LOBJ", 0, 8)
+    if obj_pos >= len(tail) or (obj_pos == -1 and len(tail) < 8):
+        # Only padding bytes are pending, the next object starts in the next data
+        return 0
+    if obj_pos == -1 or obj_pos + OBJ_HEADER_BASE_STRUCT.size > len(probe):
+        return None
+    obj_size = OBJ_SIGNATURE_SIZE_STRUCT.unpack_from(probe, obj_pos)[1]
+    end = obj_pos + obj_size - len(tail)
+    return end if obj_size >= OBJ_HEADER_BASE_STRUCT.size and end <= len(data) else None
+
+
+def _window_mask(timestamps: np.ndarray, start_time: float | None, end_time: float | None) -> np.ndarray:
+    """
+    Get the mask of the timestamps within a time window.
+
+    Parameters
+    ----------
+    timestamps : np.ndarray
+        The POSIX timestamps.
+    start_time : float | None
+        The POSIX timestamp of the start of the window, None for no limit.
+    end_time : float | None
+        The POSIX timestamp of the end of the window, None for no limit.
+
+    Returns
+    -------
+    np.ndarray
+        True for the timestamps within the window.
+    """
+    mask = np.ones(len(timestamps), dtype=bool)
+    if start_time is not None:
+        mask &= timestamps >= start_time
+    if end_time is not None:
+        mask &= timestamps <= end_time
+    return mask
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+import mmap
+import os
+import struct
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from can.io.blf import (CAN_ERROR_EXT, CAN_FD_MESSAGE, CAN_FD_MESSAGE_64, CAN_MESSAGE, CAN_MESSAGE2,
+                        OBJ_HEADER_BASE_STRUCT, OBJ_HEADER_V1_STRUCT, OBJ_HEADER_V2_STRUCT)
+
+from blf_converter.common.blf_reader import SeekableBLFReader, iter_objects
+
+# Version of the index format, indexes of another version are rebuilt.
+INDEX_VERSION = 1
+# Suffix appended to the name of the BLF file to get the name of its index file.
+INDEX_SUFFIX = '.index.npz'
+# Offset of the arbitration id in the object data of the CAN message objects, behind the object header.
+CAN_ID_OFFSETS = {CAN_MESSAGE: 4, CAN_MESSAGE2: 4, CAN_FD_MESSAGE: 4, CAN_FD_MESSAGE_64: 4, CAN_ERROR_EXT: 16}
+CAN_ID_STRUCT = struct.Struct("<L")
+
+
+@dataclass
+class BlfIndex:
+    """
+    Index of the log containers of a BLF file.
+
+    For every log container the index holds its file offset, the offset of the first object which starts in its
+    decompressed data, the first and last timestamp and the arbitration ids of its CAN messages. A message object
+    which spans several containers is accounted to all of them, so reading only the selected containers never
+    misses a relevant message. The ids are stored as one array with the start of the ids of every container in
+    id_pointers, ids of container i are ids[id_pointers[i]:id_pointers[i + 1]].
+    """
+    offsets: np.ndarray
+    first_objects: np.ndarray
+    start_times: np.ndarray
+    end_times: np.ndarray
+    id_pointers: np.ndarray
+    ids: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def container_ids(self, index: int) -> np.ndarray:
+        """
+        Get the arbitration ids of the CAN messages of a log container.
+
+        Parameters
+        ----------
+        index : int
+            The index of the log container.
+
+        Returns
+        -------
+        np.ndarray
+            The sorted unique arbitration ids.
+        """
+        return self.ids[self.id_pointers[index]:self.id_pointers[index + 1]]
+
+    def select(self, start: float | None = None, end: float | None = None,
+               frame_ids: set[int] | None = None) -> np.ndarray:
+        """
+        Select the log containers with CAN messages of a time window and of given arbitration ids.
+
+        Parameters
+        ----------
+        start : float | None
+            The POSIX timestamp of the start of the window, by default None (no limit).
+        end : float | None
+            The POSIX timestamp of the end of the window, by default None (no limit).
+        frame_ids : set[int] | None
+            The arbitration ids of the messages to read, by default None (all ids).
+
+        Returns
+        -------
+        np.ndarray
+            The indices of the selected log containers in file order.
+        """
+        if start is None and end is None and frame_ids is None:
+            return np.arange(len(self))
+        selected = ~np.isnan(self.start_times)
+        if start is not None:
+            selected &= self.end_times >= start
+        if end is not None:
+            selected &= self.start_times <= end
+        if frame_ids is not None:
+            matches = np.isin(self.ids, np.fromiter(frame_ids, dtype=np.int64, count=len(frame_ids)))
+            # Number of matching ids of every container
+            counts = np.add.reduceat(np.append(matches, False).astype(np.int64), self.id_pointers[:-1])
+            counts[self.id_pointers[:-1] == self.id_pointers[1:]] = 0
+            selected &= counts > 0
+        return np.flatnonzero(selected)
+
+    def iter_containers(self, selected: np.ndarray) -> Iterator[tuple[int, int | None]]:
+        """
+        Iterate over the selected log containers for SeekableBLFReader.iter_containers.
+
+        Parameters
+        ----------
+        selected : np.ndarray
+            The indices of the log containers in file order.
+
+        Yields
+        ------
+        tuple[int, int | None]
+            The file offset of the log container and the offset of its first object, or None if the log container
+            before is read too, so reading continues with the end of its last object.
+        """
+        previous = -2
+        for index in selected.tolist():
+            if index == previous + 1:
+                yield int(self.offsets[index]), None
+            elif self.first_objects[index] >= 0:
+                yield int(self.offsets[index]), int(self.first_objects[index])
+            else:
+                continue
+            previous = index
+
+    def save(self, path: Path, blf_file: Path) -> None:
+        """
+        Save the index together with the size and modification time of the BLF file.
+
+        Parameters
+        ----------
+        path : Path
+            The path of the index file.
+        blf_file : Path
+            The path of the indexed BLF file.
+        """
+        stat = blf_file.stat()
+        temp_file = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(temp_file, 'wb') as f:
+            np.savez(f, version=INDEX_VERSION, blf_size=stat.st_size, blf_mtime_ns=stat.st_mtime_ns,
+                     offsets=self.offsets, first_objects=self.first_objects, start_times=self.start_times,
+                     end_times=self.end_times, id_pointers=self.id_pointers, ids=self.ids)
+        os.replace(temp_file, path)
+
+    @classmethod
+    def load(cls, path: Path, blf_file: Path) -> 'BlfIndex | None':
+        """
+        Load the index of a BLF file.
+
+        Parameters
+        ----------
+        path : Path
+            The path of the index file.
+        blf_file : Path
+            The path of the indexed BLF file.
+
+        Returns
+        -------
+        BlfIndex | None
+            The index, None if there is no index or it does not belong to the current BLF file.
+        """
+        if not path.is_file():
+            return None
+        stat = blf_file.stat()
+        try:
+            with np.load(path) as data:
+                if (data['version'] != INDEX_VERSION or data['blf_size'] != stat.st_size
+                        or data['blf_mtime_ns'] != stat.st_mtime_ns):
+                    return None
+                return cls(**{name: data[name] for name in ('offsets', 'first_objects', 'start_times', 'end_times',
+                                                            'id_pointers', 'ids')})
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring invalid BLF index {path}: {e}")
+            return None
+
+
+def get_index_path(blf_file: Path) -> Path:
+    """
+    Get the path of the sidecar index file of a BLF file.
+
+    Parameters
+    ----------
+    blf_file : Path
+        Path to the BLF file.
+
+    Returns
+    -------
+    Path
+        The path of the index file next to the BLF file.
+    """
+    return blf_file.with_name(blf_file.name + INDEX_SUFFIX)
+
+
+def build_index(blf_file: Path) -> BlfIndex:
+    """
+    Build the index of a BLF file by reading the object headers of all log containers.
+
+    Parameters
+    ----------
+    blf_file : Path
+        Path to the BLF file.
+
+    Returns
+    -------
+    BlfIndex
+        The index of the BLF file.
+    """
+    with open(blf_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+        reader = SeekableBLFReader(mapped_file)
+        offsets = reader.container_offsets()
+        first_objects = [-1] * len(offsets)
+        start_times = [np.nan] * len(offsets)
+        end_times = [np.nan] * len(offsets)
+        container_ids: list[set[int]] = [set() for _ in offsets]
+
+        tail = b""
+        tail_container = 0
+        for i, offset in enumerate(offsets):
+            data = tail + reader.read_container(offset)
+            pos = 0
+            for obj_pos, obj_size, header_version, obj_type in iter_objects(data):
+                first_container = i if obj_pos >= len(tail) else tail_container
+                if first_container == i and first_objects[i] < 0:
+                    first_objects[i] = obj_pos - len(tail)
+                pos = obj_pos + obj_size
+                if obj_type not in CAN_ID_OFFSETS or header_version not in (1, 2):
+                    continue
+                timestamp, can_id = _read_can_object(data, obj_pos, header_version, obj_type)
+                timestamp += reader.start_timestamp
+                for container in range(first_container, i + 1):
+                    container_ids[container].add(can_id)
+                    if not start_times[container] <= timestamp:
+                        start_times[container] = timestamp
+                    if not end_times[container] >= timestamp:
+                        end_times[container] = timestamp
+            if pos >= len(tail):
+                # The remaining data starts in this container, with an object which continues in the next one
+                tail_container = i
+                if first_objects[i] < 0 and pos < len(data):
+                    first_objects[i] = pos - len(tail)
+            tail = data[pos:]
+        reader.stop()
+
+    id_pointers = np.zeros(len(offsets) + 1, dtype=np.int64)
+    id_pointers[1:] = np.cumsum([len(ids) for ids in container_ids])
+    ids = np.array([can_id for ids in container_ids for can_id in sorted(ids)], dtype=np.uint32)
+    return BlfIndex(offsets=np.array(offsets, dtype=np.int64), first_objects=np.array(first_objects, dtype=np.int64),
+                    start_times=np.array(start_times, dtype=np.float64), end_times=np.array(end_times, dtype=np.float64),
+                    id_pointers=id_pointers, ids=ids)
+
+
+def _read_can_object(data: bytes, obj_pos: int, header_version: int, obj_type: int) -> tuple[float, int]:
+    """
+    Read the timestamp and arbitration id of a CAN message object.
+
+    Parameters
+    ----------
+    data : bytes
+        The decompressed data of a log container.
+    obj_pos : int
+        The offset of the object.
+    header_version : int
+        The version of the object header, 1 or 2.
+    obj_type : int
+        The type of the object, one of CAN_ID_OFFSETS.
+
+    Returns
+    -------
+    tuple[float, int]
+        The timestamp in seconds relative to the start of the measurement and the arbitration id.
+    """
+    header_pos = obj_pos + OBJ_HEADER_BASE_STRUCT.size
+    if header_version == 1:
+        flags, _, _, timestamp = OBJ_HEADER_V1_STRUCT.unpack_from(data, header_pos)
+        header_pos += OBJ_HEADER_V1_STRUCT.size
+    else:
+        flags, _, _, timestamp = OBJ_HEADER_V2_STRUCT.unpack_from(data, header_pos)
+        header_pos += OBJ_HEADER_V2_STRUCT.size
+    can_id = CAN_ID_STRUCT.unpack_from(data, header_pos + CAN_ID_OFFSETS[obj_type])[0] & 0x1FFFFFFF
+    return timestamp * (1e-5 if flags == 1 else 1e-9), can_id
+
+
+def load_or_build_index(blf_file: Path) -> BlfIndex:
+    """
+    Load the sidecar index of a BLF file, or build and save it if it does not exist or is outdated.
+
+    Parameters
+    ----------
+    blf_file : Path
+        Path to the BLF file.
+
+    Returns
+    -------
+    BlfIndex
+        The index of the BLF file.
+    """
+    index_path = get_index_path(blf_file)
+    index = BlfIndex.load(index_path, blf_file)
+    if index is None:
+        index = build_index(blf_file)
+        try:
+            index.save(index_path, blf_file)
+        except OSError as e:
+            print(f"Could not save the BLF index {index_path}: {e}")
+    return index
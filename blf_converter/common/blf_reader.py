@@ -0,0 +1,574 @@
+# -*- coding: utf-8 -*-
+import mmap
+import zlib
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+import can
+from can.io.blf import (BLFParseError, LOG_CONTAINER, LOG_CONTAINER_STRUCT, NO_COMPRESSION, OBJ_HEADER_BASE_STRUCT,
+                        OBJ_HEADER_V1_STRUCT, OBJ_HEADER_V2_STRUCT, ZLIB_DEFLATE)
+
+if TYPE_CHECKING:
+    from blf_converter.common.blf_index import BlfIndex
+
+
+def find_first_object(data: bytes | mmap.mmap, start: int = 0, end: int | None = None) -> int | None:
+    """
+    Find the first complete object in the decompressed data of a log container.
+
+    Objects can span log containers, so a container may start with the end of an object of the previous container.
+    A candidate object is accepted if its header is valid and it is followed by another object or by the end of the
+    container. The data is searched in place, so an uncompressed log container is not copied out of a mapped file.
+
+    Parameters
+    ----------
+    data : bytes | mmap.mmap
+        The decompressed data of a log container, or the mapped file holding an uncompressed log container.
+    start : int
+        The offset of the data of the log container, by default 0.
+    end : int | None
+        The end of the data of the log container, by default None (end of the data).
+
+    Returns
+    -------
+    int | None
+        The offset of the first object relative to start, None if the container holds no object start.
+    """
+    if end is None:
+        end = len(data)
+    pos = data.find(b"LOBJ", start, end)
+    while pos != -1:
+        if pos + OBJ_HEADER_BASE_STRUCT.size <= end:
+            _, header_size, header_version, obj_size, _ = OBJ_HEADER_BASE_STRUCT.unpack_from(data, pos)
+            if header_version in (1, 2) and OBJ_HEADER_BASE_STRUCT.size < header_size <= obj_size:
+                next_pos = pos + obj_size
+                if next_pos + 8 > end or data.find(b"LOBJ", next_pos, next_pos + 8) != -1:
+                    return pos - start
+        pos = data.find(b"LOBJ", pos + 1, end)
+    return None
+
+
+def iter_objects(data: bytes) -> Iterator[tuple[int, int, int, int]]:
+    """
+    Iterate over the complete objects in the decompressed data of log containers.
+
+    The iteration stops at an object which continues in the next log container, which starts at the end of the last
+    yielded object.
+
+    Parameters
+    ----------
+    data : bytes
+        The decompressed data, starting with an object.
+
+    Yields
+    ------
+    tuple[int, int, int, int]
+        The offset, size, header version and type of the object.
+
+    Raises
+    ------
+    BLFParseError
+        If the data does not continue with an object.
+    """
+    pos = 0
+    while True:
+        # Objects are aligned, so the next object starts within the padding bytes
+        obj_pos = data.find(b"LOBJ", pos, pos + 8)
+        if obj_pos == -1:
+            if pos + 8 > len(data):
+                return
+            raise BLFParseError("Could not find next object")
+        if obj_pos + OBJ_HEADER_BASE_STRUCT.size > len(data):
+            return
+        _, _, header_version, obj_size, obj_type = OBJ_HEADER_BASE_STRUCT.unpack_from(data, obj_pos)
+        if obj_size < OBJ_HEADER_BASE_STRUCT.size:
+            raise BLFParseError(f"Invalid object size {obj_size}")
+        if obj_pos + obj_size > len(data):
+            return
+        yield obj_pos, obj_size, header_version, obj_type
+        pos = obj_pos + obj_size
+
+
+def object_timestamp(data: bytes | mmap.mmap, pos: int, end: int | None = None) -> float | None:
+    """
+    Get the timestamp of an object relative to the start of the measurement.
+
+    Parameters
+    ----------
+    data : bytes | mmap.mmap
+        The decompressed data of a log container, or the mapped file holding an uncompressed log container.
+    pos : int
+        The offset of the object.
+    end : int | None
+        The end of the data of the log container, by default None (end of the data).
+
+    Returns
+    -------
+    float | None
+        The timestamp in seconds, None if the object header is incomplete or of an unknown version.
+    """
+    if end is None:
+        end = len(data)
+    _, _, header_version, _, _ = OBJ_HEADER_BASE_STRUCT.unpack_from(data, pos)
+    pos += OBJ_HEADER_BASE_STRUCT.size
+    if header_version == 1 and pos + OBJ_HEADER_V1_STRUCT.size <= end:
+        flags, _, _, timestamp = OBJ_HEADER_V1_STRUCT.unpack_from(data, pos)
+    elif header_version == 2 and pos + OBJ_HEADER_V2_STRUCT.size <= end:
+        flags, _, _, timestamp = OBJ_HEADER_V2_STRUCT.unpack_from(data, pos)
+    else:
+        return None
+    return timestamp * (1e-5 if flags == 1 else 1e-9)
+
+
+def resolve_time(value: float | datetime | None, start_timestamp: float) -> float | None:
+    """
+    Convert a limit of a time window to an absolute timestamp.
+
+    Parameters
+    ----------
+    value : float | datetime | None
+        Seconds relative to the start of the measurement, or an absolute point in time.
+    start_timestamp : float
+        The start of the measurement as POSIX timestamp.
+
+    Returns
+    -------
+    float | None
+        The POSIX timestamp of the limit, None if there is no limit.
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return start_timestamp + value
+
+
+class SeekableBLFReader(can.BLFReader):
+    """
+    BLF reader which can start reading at any log container.
+
+    The top level of a BLF file is a sequence of log containers, so their offsets are found by reading only the
+    object headers. To read a time window, the reader jumps to the last container starting before the window,
+    found by a binary search which decompresses only a few containers, instead of decoding the file from the
+    beginning. With the index of the file, only the log containers with messages of the window and of the
+    requested arbitration ids are read.
+    """
+
+    def __init__(self, file, **kwargs):
+        """
+        Initialize the SeekableBLFReader class.
+
+        Parameters
+        ----------
+        file : Any
+            A path-like object or a file-like object opened in binary mode, e.g. an mmap of the file.
+        """
+        super().__init__(file, **kwargs)
+        self._data_start = self.file.tell()
+        self._resync = False
+
+    def container_offsets(self) -> list[int]:
+        """
+        Get the file offsets of the log containers.
+
+        Returns
+        -------
+        list[int]
+            The offsets of the log containers in file order.
+        """
+        offsets = []
+        position = self.file.tell()
+        offset = self._data_start
+        self.file.seek(offset)
+        while len(header := self.file.read(OBJ_HEADER_BASE_STRUCT.size)) == OBJ_HEADER_BASE_STRUCT.size:
+            signature, _, _, obj_size, obj_type = OBJ_HEADER_BASE_STRUCT.unpack(header)
+            if signature != b"LOBJ":
+                break
+            if obj_type == LOG_CONTAINER:
+                offsets.append(offset)
+            offset += obj_size + obj_size % 4
+            self.file.seek(offset)
+        self.file.seek(position)
+        return offsets
+
+    def container_sizes(self, offsets: list[int]) -> list[int]:
+        """
+        Get the uncompressed sizes of log containers.
+
+        Parameters
+        ----------
+        offsets : list[int]
+            The file offsets of the log containers.
+
+        Returns
+        -------
+        list[int]
+            The size of the decompressed data of every log container.
+        """
+        sizes = []
+        position = self.file.tell()
+        for offset in offsets:
+            self.file.seek(offset + OBJ_HEADER_BASE_STRUCT.size)
+            sizes.append(LOG_CONTAINER_STRUCT.unpack(self.file.read(LOG_CONTAINER_STRUCT.size))[1])
+        self.file.seek(position)
+        return sizes
+
+    def read_container(self, offset: int) -> bytes:
+        """
+        Read and decompress a log container into bytes, e.g. for the message parser of python-can.
+
+        The data of an uncompressed log container of a mapped file is copied, use container_data to search it in
+        place.
+
+        Parameters
+        ----------
+        offset : int
+            The file offset of the log container.
+
+        Returns
+        -------
+        bytes
+            The decompressed data, empty for an unknown compression method.
+        """
+        data, start, end = self.container_data(offset)
+        return data if isinstance(data, bytes) and start == 0 and end == len(data) else data[start:end]
+
+    def container_buffer(self, offset: int) -> bytes | memoryview:
+        """
+        Read and decompress a log container without copying its data.
+
+        The data of an uncompressed log container of a mapped file is returned as view on the mapping, which has to be
+        released before the mapping is closed.
+
+        Parameters
+        ----------
+        offset : int
+            The file offset of the log container.
+
+        Returns
+        -------
+        bytes | memoryview
+            The decompressed data, empty for an unknown compression method.
+        """
+        data, start, end = self.container_data(offset)
+        return data if isinstance(data, bytes) and start == 0 and end == len(data) else memoryview(data)[start:end]
+
+    def container_data(self, offset: int) -> tuple[bytes | mmap.mmap, int, int]:
+        """
+        Read and decompress a log container, leaving an uncompressed log container of a mapped file in the mapping.
+
+        Compressed data is decompressed directly from the mapped file.
+
+        Parameters
+        ----------
+        offset : int
+            The file offset of the log container.
+
+        Returns
+        -------
+        tuple[bytes | mmap.mmap, int, int]
+            The decompressed data or the mapped file, and the offset and end of the data of the log container in it.
+            The data is empty for an unknown compression method.
+        """
+        data: bytes | mmap.mmap
+        if isinstance(self.file, mmap.mmap):
+            data = self.file
+            _, _, _, obj_size, _ = OBJ_HEADER_BASE_STRUCT.unpack_from(data, offset)
+            start, end = offset + OBJ_HEADER_BASE_STRUCT.size, offset + obj_size
+        else:
+            position = self.file.tell()
+            self.file.seek(offset)
+            _, _, _, obj_size, _ = OBJ_HEADER_BASE_STRUCT.unpack(self.file.read(OBJ_HEADER_BASE_STRUCT.size))
+            data = self.file.read(obj_size - OBJ_HEADER_BASE_STRUCT.size)
+            start, end = 0, len(data)
+            self.file.seek(position)
+        method, _ = LOG_CONTAINER_STRUCT.unpack_from(data, start)
+        start += LOG_CONTAINER_STRUCT.size
+        if method == NO_COMPRESSION:
+            return data, start, end
+        if method == ZLIB_DEFLATE:
+            decompressed = zlib.decompress(memoryview(data)[start:end])
+            return decompressed, 0, len(decompressed)
+        return b"", 0, 0
+
+    def container_start_time(self, offset: int) -> float | None:
+        """
+        Get the absolute timestamp of the first object starting in a log container.
+
+        Parameters
+        ----------
+        offset : int
+            The file offset of the log container.
+
+        Returns
+        -------
+        float | None
+            The POSIX timestamp, None if no object starts in the container.
+        """
+        data, start, end = self.container_data(offset)
+        pos = find_first_object(data, start, end)
+        if pos is None:
+            return None
+        timestamp = object_timestamp(data, start + pos, end)
+        return None if timestamp is None else self.start_timestamp + timestamp
+
+    def seek_time(self, timestamp: float) -> None:
+        """
+        Continue reading at the last log container whose first object is older than the timestamp.
+
+        Parameters
+        ----------
+        timestamp : float
+            The POSIX timestamp to seek to.
+        """
+        offsets = self.container_offsets()
+        start_times = _LazyStartTimes(self, offsets)
+        index = bisect_left(start_times, timestamp) - 1
+        if index <= 0:
+            return
+        self.file.seek(offsets[index])
+        self._tail = b""
+        self._resync = True
+
+    def select_containers(self, offsets: list[int], start_time: float | None = None,
+                          end_time: float | None = None) -> range:
+        """
+        Select the log containers which may hold messages of a time window by a binary search over their start times.
+
+        Parameters
+        ----------
+        offsets : list[int]
+            The file offsets of all log containers of the file.
+        start_time : float | None
+            The POSIX timestamp of the start of the window, by default None (no limit).
+        end_time : float | None
+            The POSIX timestamp of the end of the window, by default None (no limit).
+
+        Returns
+        -------
+        range
+            The indices of the selected log containers.
+        """
+        start_times = _LazyStartTimes(self, offsets)
+        first = 0 if start_time is None else max(bisect_left(start_times, start_time) - 1, 0)
+        last = len(offsets) if end_time is None else bisect_right(start_times, end_time)
+        return range(first, max(first, last))
+
+    def window_containers(self, start_time: float | None = None, end_time: float | None = None,
+                          index: 'BlfIndex | None' = None,
+                          frame_ids: set[int] | None = None) -> Iterator[tuple[int, int | None]]:
+        """
+        Iterate over the log containers to read for a time window, in the form of BlfIndex.iter_containers.
+
+        Parameters
+        ----------
+        start_time : float | None
+            The POSIX timestamp of the start of the window, by default None (no limit).
+        end_time : float | None
+            The POSIX timestamp of the end of the window, by default None (no limit).
+        index : BlfIndex | None
+            The index of the file, by default None (containers are searched by their start time).
+        frame_ids : set[int] | None
+            The arbitration ids of the messages to read if the index is given, by default None (all ids).
+
+        Yields
+        ------
+        tuple[int, int | None]
+            The file offset of the log container and the offset of its first object, or None if reading continues
+            with the end of the last object of the log container before.
+        """
+        if index is not None:
+            yield from index.iter_containers(index.select(start_time, end_time, frame_ids))
+            return
+        offsets = self.container_offsets()
+        selected = self.select_containers(offsets, start_time, end_time)
+        resync = True
+        # The last object of the window may continue in the log container after the selected ones
+        for i in range(selected.start, min(selected.stop + 1, len(offsets))):
+            if not resync:
+                yield offsets[i], None
+                continue
+            first_object = find_first_object(*self.container_data(offsets[i]))
+            if first_object is not None:
+                resync = False
+                yield offsets[i], first_object
+
+    def iter_containers(self, containers: Iterable[tuple[int, int | None]]) -> Iterator[can.Message]:
+        """
+        Iterate over the messages of the given log containers.
+
+        Parameters
+        ----------
+        containers : Iterable[tuple[int, int | None]]
+            The file offset of every log container and the offset of its first object if it does not continue the
+            log container before, otherwise None.
+
+        Yields
+        ------
+        can.Message
+            The messages of the log containers.
+        """
+        for offset, first_object in containers:
+            data = self.read_container(offset)
+            if first_object is not None:
+                self._tail = b""
+                data = data[first_object:]
+            yield from self._parse_container(data)
+
+    def read_container_range(self, offsets: list[int], start: int, end: int,
+                             first_objects: list[int] | None = None) -> bytes | memoryview:
+        """
+        Read the objects which start in a range of log containers.
+
+        The data begins with the first object starting in the range and is completed with the beginning of the
+        following log containers up to the first object starting after the range, so the ranges of a file can be
+        read independently of each other. The log containers are searched in place and their data is only joined if
+        the objects of the range span several log containers.
+
+        Parameters
+        ----------
+        offsets : list[int]
+            The file offsets of all log containers of the file.
+        start : int
+            The index of the first log container of the range.
+        end : int
+            The index of the log container after the range.
+        first_objects : list[int] | None
+            The offset of the first object starting in every log container, -1 for none, e.g. from the index of
+            the file, by default None (the first objects are searched).
+
+        Returns
+        -------
+        bytes | memoryview
+            The decompressed objects of the range, a view on the mapped file if they are the data of one uncompressed
+            log container.
+        """
+        parts: list[bytes | memoryview] = []
+        for i in range(start, len(offsets)):
+            data, data_start, data_end = self.container_data(offsets[i])
+            if parts and i < end:
+                parts.append(memoryview(data)[data_start:data_end])
+                continue
+            if first_objects is not None:
+                first_object = first_objects[i] if first_objects[i] >= 0 else None
+            else:
+                first_object = find_first_object(data, data_start, data_end)
+            if i >= end:
+                # Complete the last object of the range, which may continue in the following containers
+                if not parts:
+                    break
+                if first_object is not None:
+                    if first_object:
+                        parts.append(memoryview(data)[data_start:data_start + first_object])
+                    break
+                parts.append(memoryview(data)[data_start:data_end])
+            elif first_object is not None:
+                parts.append(memoryview(data)[data_start + first_object:data_end])
+        if len(parts) == 1:
+            return parts[0]
+        return b"".join(parts)
+
+    def iter_container_range(self, offsets: list[int], start: int, end: int,
+                             first_objects: list[int] | None = None) -> Iterator[can.Message]:
+        """
+        Iterate over the messages which start in a range of log containers, see read_container_range.
+
+        Parameters
+        ----------
+        offsets : list[int]
+            The file offsets of all log containers of the file.
+        start : int
+            The index of the first log container of the range.
+        end : int
+            The index of the log container after the range.
+        first_objects : list[int] | None
+            The offset of the first object starting in every log container, by default None (searched).
+
+        Yields
+        ------
+        can.Message
+            The messages of the range.
+        """
+        self._tail = b""
+        data = self.read_container_range(offsets, start, end, first_objects)
+        # The message parser of python-can searches the data with bytes.index
+        yield from self._parse_container(data if isinstance(data, bytes) else bytes(data))
+        self._tail = b""
+
+    def iter_window(self, start: float | datetime | None = None, end: float | datetime | None = None,
+                    index: 'BlfIndex | None' = None, frame_ids: set[int] | None = None) -> Iterator[can.Message]:
+        """
+        Iterate over the messages of a time window.
+
+        Reading starts near the window and stops at the first log container which starts after it. The messages
+        of the read log containers are filtered one by one, so messages logged out of order at the end of the window
+        are kept. If the index of the file is given, only the log containers of the window with messages of the
+        requested arbitration ids are read.
+
+        Parameters
+        ----------
+        start : float | datetime | None
+            The start of the window in seconds relative to the start of the measurement or as point in time, by
+            default None (start of the file).
+        end : float | datetime | None
+            The end of the window in seconds relative to the start of the measurement or as point in time, by
+            default None (end of the file).
+        index : BlfIndex | None
+            The index of the file, by default None (containers are searched by their start time).
+        frame_ids : set[int] | None
+            The arbitration ids of the messages to read if the index is given, by default None (all ids). Log
+            containers without these ids are skipped, but the messages of the read containers are not filtered.
+
+        Yields
+        ------
+        can.Message
+            The messages with a timestamp within the window.
+        """
+        start_time = resolve_time(start, self.start_timestamp)
+        end_time = resolve_time(end, self.start_timestamp)
+        if index is not None or end_time is not None:
+            messages = self.iter_containers(self.window_containers(start_time, end_time, index, frame_ids))
+        else:
+            if start_time is not None:
+                self.seek_time(start_time)
+            messages = iter(self)
+        for msg in messages:
+            if (start_time is None or msg.timestamp >= start_time) and (end_time is None or msg.timestamp <= end_time):
+                yield msg
+
+    def _parse_container(self, data):
+        if self._resync:
+            # The container may start with the end of an object of the skipped container before
+            pos = find_first_object(data)
+            if pos is None:
+                return
+            self._resync = False
+            data = data[pos:]
+        yield from super()._parse_container(data)
+
+
+class _LazyStartTimes:
+    """
+    Sequence of the start times of log containers, which are only read if needed by a binary search.
+    """
+
+    def __init__(self, reader: SeekableBLFReader, offsets: list[int]):
+        self._reader = reader
+        self._offsets = offsets
+        self._cache: dict[int, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getitem__(self, index: int) -> float:
+        if index not in self._cache:
+            # A container without object start belongs to the object which started before
+            start_time = None
+            for offset in self._offsets[index::-1]:
+                start_time = self._reader.container_start_time(offset)
+                if start_time is not None:
+                    break
+            self._cache[index] = start_time if start_time is not None else float('-inf')
+        return self._cache[index]
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+import sys
+
+import can
+
+# Number of frames per chunk if no memory budget is given.
+DEFAULT_CHUNK_SIZE = 150000
+# Limits of the adapted chunk size. Smaller chunks cost more overhead per chunk, larger chunks leave the worker
+# processes idle at the end of the file.
+MIN_CHUNK_SIZE = 1000
+MAX_CHUNK_SIZE = 2000000
+# Share of the memory budget used by the chunks in flight, the rest is left for the interpreter, the decoder, the
+# samples held back to write them in time order, the output writer and the over-allocation of the signal buffers.
+CHUNK_MEMORY_SHARE = 0.5
+# Memory of a frame before the first chunk was measured, about a can.Message with one decoded sample.
+INITIAL_BYTES_PER_FRAME = 300
+# Memory of a classic can.Message with its data as measured by message_memory_size, used where the messages are not
+# available, e.g. for the chunks decoded by the worker processes.
+MESSAGE_MEMORY_SIZE = 264
+
+
+class ChunkBudget:
+    """
+    Chunk size and number of chunks in flight which keep the decoding pipeline under a memory budget.
+
+    The memory per frame, i.e. the read frame and its share of the decoded samples, is measured after every chunk.
+    The chunk size is adapted to the largest measured value, so the chunks in flight stay within CHUNK_MEMORY_SHARE
+    of the budget. If the chunks would get smaller than MIN_CHUNK_SIZE, fewer chunks are kept in flight first.
+    """
+
+    def __init__(self, max_memory: int, max_pending: int = 1, min_pending: int = 1):
+        """
+        Initialize the ChunkBudget class.
+
+        Parameters
+        ----------
+        max_memory : int
+            The memory budget in bytes.
+        max_pending : int
+            The maximum number of chunks in flight, by default 1.
+        min_pending : int
+            The minimum number of chunks in flight, e.g. one per worker process, by default 1.
+        """
+        if max_memory <= 0:
+            raise ValueError(f"Invalid memory budget {max_memory}, expected a positive number of bytes.")
+        self.max_memory = max_memory
+        self.bytes_per_frame = float(INITIAL_BYTES_PER_FRAME)
+        self.chunk_size = DEFAULT_CHUNK_SIZE
+        self.max_pending = max_pending
+        self._pending_limits = (min_pending, max_pending)
+        self._measured = False
+        self._adapt()
+
+    def set_pending_limits(self, min_pending: int, max_pending: int) -> None:
+        """
+        Set the range of the number of chunks in flight, e.g. for the worker processes of a pool.
+
+        Parameters
+        ----------
+        min_pending : int
+            The minimum number of chunks in flight.
+        max_pending : int
+            The maximum number of chunks in flight.
+        """
+        self._pending_limits = (min_pending, max(max_pending, min_pending))
+        self._adapt()
+
+    def record(self, frame_count: int, nbytes: int) -> None:
+        """
+        Record the memory of a processed chunk and adapt the chunk size.
+
+        Parameters
+        ----------
+        frame_count : int
+            The number of frames of the chunk.
+        nbytes : int
+            The memory of the frames and of the decoded samples of the chunk in bytes.
+        """
+        if frame_count <= 0:
+            return
+        measured = nbytes / frame_count
+        self.bytes_per_frame = max(self.bytes_per_frame, measured) if self._measured else measured
+        self._measured = True
+        self._adapt()
+
+    def _adapt(self) -> None:
+        """
+        Compute the chunk size and the number of chunks in flight from the memory per frame.
+        """
+        budget = self.max_memory * CHUNK_MEMORY_SHARE
+        min_pending, pending = self._pending_limits
+        while pending > min_pending and budget / (pending * self.bytes_per_frame) < MIN_CHUNK_SIZE:
+            pending -= 1
+        self.max_pending = pending
+        self.chunk_size = int(min(max(budget / (pending * self.bytes_per_frame), MIN_CHUNK_SIZE), MAX_CHUNK_SIZE))
+
+    def __repr__(self) -> str:
+        return (f"ChunkBudget(max_memory={self.max_memory}, chunk_size={self.chunk_size}, "
+                f"max_pending={self.max_pending}, bytes_per_frame={self.bytes_per_frame:.0f})")
+
+
+def current_chunk_size(chunk_size: int | ChunkBudget) -> int:
+    """
+    Get the number of frames of the next chunk.
+
+    Parameters
+    ----------
+    chunk_size : int | ChunkBudget
+        A fixed chunk size or the memory budget which adapts the chunk size.
+
+    Returns
+    -------
+    int
+        The chunk size.
+    """
+    return chunk_size.chunk_size if isinstance(chunk_size, ChunkBudget) else chunk_size
+
+
+def message_memory_size(msg: can.Message) -> int:
+    """
+    Measure the memory of a message with its timestamp, arbitration id, data and reference in a chunk.
+
+    Parameters
+    ----------
+    msg : can.Message
+        The message.
+
+    Returns
+    -------
+    int
+        The memory of the message in bytes.
+    """
+    return (sys.getsizeof(msg) + sys.getsizeof(msg.timestamp) + sys.getsizeof(msg.arbitration_id)
+            + sys.getsizeof(msg.data) + 8)
+
+
+def result_nbytes(signals_dict: dict) -> int:
+    """
+    Get the memory of the decoded samples of a chunk.
+
+    Parameters
+    ----------
+    signals_dict : dict
+        Dictionary of signals with their SignalBuffer.
+
+    Returns
+    -------
+    int
+        The number of bytes of the timestamps and values.
+    """
+    return sum(buffer.nbytes for buffer in signals_dict.values())
@@ -1,13 +1,43 @@
 # -*- coding: utf-8 -*-
 import mmap
-from collections import defaultdict
+from collections import defaultdict, deque
+from collections.abc import Generator, Iterable, Iterator
+from datetime import datetime
+from itertools import islice
+from multiprocessing import Pool
 from pathlib import Path
 from typing import List
 
 import can
 import cantools
+import numpy as np
 
-from blf_converter.common.utils import load_dbc_files, merge_dicts, save_signals_to_mdf
+from blf_converter.common.blf_frames import FRAME_DTYPE, iter_frames, parse_frames
+from blf_converter.common.blf_index import load_or_build_index
+from blf_converter.common.blf_reader import SeekableBLFReader, resolve_time
+from blf_converter.common.memory_budget import (MESSAGE_MEMORY_SIZE, ChunkBudget, current_chunk_size,
+                                                message_memory_size, result_nbytes)
+from blf_converter.common.shared_results import SharedResult, receive_result, share_result, start_resource_tracker
+from blf_converter.common.signal_buffer import SignalBuffer, merge_runs
+from blf_converter.common.signal_decoder import ChannelDecoder, SignalDecoder, build_decoder
+from blf_converter.common.signal_writers import create_writer
+
+# Number of chunks which may be queued per worker process before the reader waits for results.
+# Bounds the memory usage of the parallel pipeline independently of the BLF file size.
+MAX_PENDING_CHUNKS_PER_WORKER = 2
+# Uncompressed size of a classic CAN message object, used to estimate the number of messages of log containers.
+MESSAGE_OBJECT_SIZE = 48
+
+# Decoder and signal list of a worker process, set once by _init_worker.
+_worker_decoder: SignalDecoder | ChannelDecoder | None = None
+_worker_signal_list: List = []
+# Reader, log containers, time window and decoding mode of a worker process, set once by _init_range_worker.
+_worker_reader: SeekableBLFReader | None = None
+_worker_containers: tuple = ([], None)
+_worker_window: tuple = (None, None)
+_worker_bulk_decoding = False
+# Number of shared memory blocks with results a worker process keeps open, the maximum number of results in flight.
+_worker_results_in_flight = 1
 
 
 def process_chunk(args: tuple) -> tuple[dict, set]:
@@ -17,82 +47,610 @@ def process_chunk(args: tuple) -> tuple[dict, set]:
     Parameters
     ----------
     args : tuple
-        Tuple containing the database, chunk of messages and the signal list.
+        Tuple containing the database, SignalDecoder or ChannelDecoder, chunk of messages and the signal list. Optionally
+        the set of frame ids which carry the requested signals can be given as fourth element, all other frames are
+        skipped without being decoded. A ChannelDecoder decodes every message with the database of its channel.
 
     Returns
     -------
     tuple
-        A tuple containing a dictionary of signals and a set of found signals.
+        A tuple containing a dictionary of signals and a set of found signals. The samples of a signal are
+        collected in a SignalBuffer with the numeric physical values, choices are not converted to their names.
     """
-    db, chunk, signal_list = args
-    signals_dict = defaultdict(list)
+    db, chunk, signal_list = args[:3]
+    frame_ids = args[3] if len(args) > 3 else None
+    channel_decoder = db if isinstance(db, ChannelDecoder) else None
+    # The decoders only return the requested signals, the signals of a database have to be filtered
+    requested = None if isinstance(db, (SignalDecoder, ChannelDecoder)) else set(signal_list)
+    signals_dict: defaultdict[str, SignalBuffer] = defaultdict(SignalBuffer)
     found_signals = set()
     for msg in chunk:
+        if frame_ids is not None and msg.arbitration_id not in frame_ids:
+            continue
         try:
-            decoded_msg = db.decode_message(msg.arbitration_id, msg.data)
+            if channel_decoder is not None:
+                decoded_msg = channel_decoder.decode_message(msg.arbitration_id, msg.data, False, msg.channel)
+            else:
+                decoded_msg = db.decode_message(msg.arbitration_id, msg.data, decode_choices=False)
             timestamp = msg.timestamp
             for signal_name, signal_value in decoded_msg.items():
-                if signal_name in signal_list:
+                if requested is None or signal_name in requested:
                     found_signals.add(signal_name)
-                    if isinstance(signal_value, float):
-                        signals_dict[signal_name].append((timestamp, format(signal_value, '.3f')))
-                    else:
-                        signals_dict[signal_name].append((timestamp, str(signal_value)))
+                    signals_dict[signal_name].append(timestamp, signal_value)
         except (cantools.database.errors.Error, KeyError):
             continue
     return signals_dict, found_signals
 
 
-def read_blf_file(filename: Path, dbc_files: List[Path], chunk_size: int, output_filename: Path,
-                  signal_list: List) -> Path:
+def process_frames(args: tuple) -> tuple[dict, set]:
     """
-    Read a BLF file in chunks and process the data.
+    Decode a chunk of frames parsed by iter_frames in bulk.
+
+    The frames are grouped by arbitration id and the requested signals of every message are decoded for all its
+    frames at once, with the same values as process_chunk. With a ChannelDecoder the frames are grouped by channel
+    first and every group is decoded with the decoder of its channel.
+
+    Parameters
+    ----------
+    args : tuple
+        Tuple containing the SignalDecoder or ChannelDecoder and the frames as array of FRAME_DTYPE.
+
+    Returns
+    -------
+    tuple
+        A tuple containing a dictionary of signals and a set of found signals, like process_chunk.
+    """
+    decoder, frames = args[:2]
+    parts: defaultdict[str, list[tuple]] = defaultdict(list)
+    if isinstance(decoder, ChannelDecoder):
+        for channel_decoder, positions in decoder.split_frames(frames['channel']):
+            _collect_frame_parts(channel_decoder, frames[positions], positions, parts)
+    else:
+        _collect_frame_parts(decoder, frames, np.arange(len(frames)), parts)
+
+    signals_dict: defaultdict[str, SignalBuffer] = defaultdict(SignalBuffer)
+    for signal_name, signal_parts in parts.items():
+        positions, timestamps, values = (np.concatenate(arrays) for arrays in zip(*signal_parts))
+        if len(signal_parts) > 1:
+            # A signal of several messages, restore the file order of the samples
+            file_order = np.argsort(positions, kind='stable')
+            timestamps, values = timestamps[file_order], values[file_order]
+        signals_dict[signal_name].extend_arrays(timestamps, values)
+    return signals_dict, set(signals_dict)
+
+
+def _collect_frame_parts(decoder: SignalDecoder, frames: np.ndarray, positions: np.ndarray,
+                         parts: defaultdict[str, list[tuple]]) -> None:
+    """
+    Decode frames in bulk per arbitration id and collect the samples of every signal.
+
+    Parameters
+    ----------
+    decoder : SignalDecoder
+        The decoder of the frames.
+    frames : np.ndarray
+        The frames as array of FRAME_DTYPE in file order.
+    positions : np.ndarray
+        The position of every frame in the chunk, used to restore the file order of signals of several messages.
+    parts : defaultdict[str, list[tuple]]
+        The positions, timestamps and values of the samples per signal name, extended in place.
+    """
+    frame_ids = np.fromiter(decoder.messages, dtype=np.int64, count=len(decoder.messages))
+    selected = np.isin(frames['arbitration_id'], frame_ids)
+    frames, positions = frames[selected], positions[selected]
+    # Sort the frames by id, the stable sort keeps the frames of an id in file order
+    order = np.argsort(frames['arbitration_id'], kind='stable')
+    frames, positions = frames[order], positions[order]
+    ids, starts = np.unique(frames['arbitration_id'], return_index=True)
+    for frame_id, start, stop in zip(ids.tolist(), starts, [*starts[1:], len(frames)]):
+        group = frames[start:stop]
+        for signal_name, (mask, values) in decoder.decode_frames(frame_id, group['data'], group['dlc']).items():
+            parts[signal_name].append((positions[start:stop][mask], group['timestamp'][mask], values))
+
+
+def iter_chunks(filename: Path, chunk_size: int | ChunkBudget, start: float | datetime | None = None,
+                end: float | datetime | None = None, frame_ids: set[int] | None = None,
+                use_index: bool = False) -> Generator[list[can.Message], None, None]:
+    """
+    Read a BLF file lazily and yield its messages in chunks.
+
+    Only the chunk which is currently yielded is kept in memory, so the memory usage does not depend on the size
+    of the BLF file. If a time window is given, reading starts at the log container before the window and stops
+    after the window. With the sidecar index of the BLF file, which is built on the first use, only the log
+    containers of the window with messages of the requested arbitration ids are read.
 
     Parameters
     ----------
     filename : Path
         Path to the BLF file.
-    dbc_files : List[Path]
-        List of paths to the DBC files.
-    chunk_size : int
-        The size of the chunk to process.
-    output_filename : Path
-        Output filename for the MDF file.
+    chunk_size : int | ChunkBudget
+        The maximum number of messages per chunk, or the memory budget which adapts it before every chunk.
+    start : float | datetime | None
+        The start of the time window in seconds relative to the start of the measurement or as point in time, by
+        default None (start of the file).
+    end : float | datetime | None
+        The end of the time window in seconds relative to the start of the measurement or as point in time, by
+        default None (end of the file).
+    frame_ids : set[int] | None
+        The arbitration ids of the messages to read, used to skip log containers with the index, by default None
+        (all ids).
+    use_index : bool
+        Whether to use the sidecar index of the BLF file, by default False.
+
+    Yields
+    ------
+    list[can.Message]
+        The next chunk of messages.
+    """
+    with open(filename, 'rb') as f:
+        mapped_file = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            index = load_or_build_index(filename) if use_index else None
+            log = SeekableBLFReader(mapped_file).iter_window(start, end, index, frame_ids)
+            while chunk := list(islice(log, current_chunk_size(chunk_size))):
+                yield chunk
+        finally:
+            mapped_file.close()
+
+
+def _init_worker(decoder: SignalDecoder | ChannelDecoder, signal_list: List) -> None:
+    """
+    Initialize a worker process of the decoding pool.
+
+    The compiled decoder is sent once per worker, so neither the decoder nor the database has to be sent along
+    with every chunk.
+
+    Parameters
+    ----------
+    decoder : SignalDecoder | ChannelDecoder
+        The decoder of the requested signals.
+    signal_list : List
+        List of signals to decode.
+    """
+    global _worker_decoder, _worker_signal_list
+    _worker_decoder = decoder
+    _worker_signal_list = signal_list
+
+
+def _init_range_worker(filename: Path, decoder: SignalDecoder | ChannelDecoder, signal_list: List, bulk_decoding: bool,
+                       results_in_flight: int, offsets: list[int], first_objects: list[int] | None,
+                       start_time: float | None, end_time: float | None) -> None:
+    """
+    Initialize a worker process which reads and decodes ranges of log containers.
+
+    Every worker maps the BLF file once, the offsets of the log containers and the decoder are sent once per worker.
+
+    Parameters
+    ----------
+    filename : Path
+        Path to the BLF file.
+    decoder : SignalDecoder | ChannelDecoder
+        The decoder of the requested signals.
     signal_list : List
         List of signals to decode.
+    bulk_decoding : bool
+        Whether to decode the frames in bulk with process_frames.
+    results_in_flight : int
+        The maximum number of results which are sent but not yet received, see share_result.
+    offsets : list[int]
+        The file offsets of all log containers.
+    first_objects : list[int] | None
+        The offset of the first object of every log container from the index, None to search them.
+    start_time : float | None
+        The POSIX timestamp of the start of the time window, None for no limit.
+    end_time : float | None
+        The POSIX timestamp of the end of the time window, None for no limit.
+    """
+    global _worker_reader, _worker_containers, _worker_window, _worker_bulk_decoding, _worker_results_in_flight
+    _init_worker(decoder, signal_list)
+    _worker_bulk_decoding = bulk_decoding
+    _worker_results_in_flight = results_in_flight
+    with open(filename, 'rb') as f:
+        _worker_reader = SeekableBLFReader(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    _worker_containers = (offsets, first_objects)
+    _worker_window = (start_time, end_time)
+
+
+def _process_container_range_in_worker(container_range: tuple[int, int]) -> tuple[dict, set] | SharedResult:
+    """
+    Read and decode the messages of a range of log containers in the current worker process.
+
+    Large results are returned in shared memory instead of being pickled, see share_result.
+
+    Parameters
+    ----------
+    container_range : tuple[int, int]
+        The index of the first log container of the range and of the log container after the range.
 
     Returns
     -------
-    Path
-        Path to the output MDF file.
+    tuple[dict, set] | SharedResult
+        A tuple containing a dictionary of signals and a set of found signals, or its shared memory block.
     """
-    db = load_dbc_files(dbc_files)
+    return share_result(_decode_container_range(container_range), _worker_results_in_flight)
 
-    with open(filename, 'rb') as f:
-        mapped_file = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
-        log = can.BLFReader(mapped_file)  # type: ignore
 
-        chunks = []
-        chunk = []
-        for msg in log:
-            chunk.append(msg)
-            if len(chunk) >= chunk_size:
-                chunks.append((db, chunk, signal_list))
-                chunk = []
+def _decode_container_range(container_range: tuple[int, int]) -> tuple[dict, set]:
+    """
+    Read and decode the messages of a range of log containers with the reader and decoder of the worker process.
+
+    Parameters
+    ----------
+    container_range : tuple[int, int]
+        The index of the first log container of the range and of the log container after the range.
+
+    Returns
+    -------
+    tuple
+        A tuple containing a dictionary of signals and a set of found signals.
+    """
+    assert _worker_reader is not None and _worker_decoder is not None
+    offsets, first_objects = _worker_containers
+    start_time, end_time = _worker_window
+    if _worker_bulk_decoding:
+        frames, _ = parse_frames(_worker_reader.read_container_range(offsets, *container_range, first_objects),
+                                 _worker_reader.start_timestamp)
+        if start_time is not None:
+            frames = frames[frames['timestamp'] >= start_time]
+        if end_time is not None:
+            frames = frames[frames['timestamp'] <= end_time]
+        return process_frames((_worker_decoder, frames))
+    messages = [msg for msg in _worker_reader.iter_container_range(offsets, *container_range, first_objects)
+                if (start_time is None or msg.timestamp >= start_time) and (end_time is None or msg.timestamp <= end_time)]
+    return process_chunk((_worker_decoder, messages, _worker_signal_list, _worker_decoder.frame_ids))
+
+
+def iter_container_ranges(selected: list[int], sizes: list[int],
+                          chunk_size: int | ChunkBudget) -> Iterator[tuple[int, int]]:
+    """
+    Split the selected log containers lazily into ranges of consecutive containers with about chunk_size messages.
+
+    The chunk size is read again for every range, so a memory budget adapts the ranges which are not yet split.
+
+    Parameters
+    ----------
+    selected : list[int]
+        The indices of the selected log containers in file order.
+    sizes : list[int]
+        The uncompressed size of every log container of the file.
+    chunk_size : int | ChunkBudget
+        The number of messages per range, estimated from the size of classic CAN message objects, or the memory
+        budget which adapts it.
+
+    Yields
+    ------
+    tuple[int, int]
+        The index of the first log container of the next range and of the log container after the range.
+    """
+    range_start = previous = -1
+    range_size = 0
+    for index in selected:
+        if range_start >= 0 and (index != previous + 1
+                                 or range_size >= current_chunk_size(chunk_size) * MESSAGE_OBJECT_SIZE):
+            yield range_start, previous + 1
+            range_start = -1
+        if range_start < 0:
+            range_start, range_size = index, 0
+        range_size += sizes[index]
+        previous = index
+    if range_start >= 0:
+        yield range_start, previous + 1
+
+
+def _plan_container_ranges(filename: Path, start: float | datetime | None, end: float | datetime | None,
+                           frame_ids: set[int], use_index: bool) -> tuple:
+    """
+    Select the log containers of a BLF file to read and split them into ranges for the worker processes.
+
+    Parameters
+    ----------
+    filename : Path
+        Path to the BLF file.
+    start : float | datetime | None
+        The start of the time window, see iter_chunks.
+    end : float | datetime | None
+        The end of the time window, see iter_chunks.
+    frame_ids : set[int]
+        The arbitration ids of the requested messages, used to skip log containers with the index.
+    use_index : bool
+        Whether to use the sidecar index of the BLF file.
+
+    Returns
+    -------
+    tuple
+        The arguments of _init_range_worker after the decoder and signal list, the indices of the selected log
+        containers and the uncompressed size of every log container.
+    """
+    with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+        reader = SeekableBLFReader(mapped_file)
+        start_time = resolve_time(start, reader.start_timestamp)
+        end_time = resolve_time(end, reader.start_timestamp)
+        offsets = reader.container_offsets()
+        first_objects = None
+        if use_index:
+            index = load_or_build_index(filename)
+            selected = index.select(start_time, end_time, frame_ids).tolist()
+            first_objects = index.first_objects.tolist()
+        else:
+            selected = list(reader.select_containers(offsets, start_time, end_time))
+        sizes = reader.container_sizes(offsets)
+    return offsets, first_objects, start_time, end_time, selected, sizes
+
+
+def iter_processed_chunks(filename: Path, dbc_files: List[Path] | None, chunk_size: int | ChunkBudget,
+                          signal_list: List, num_workers: int = 1, dbc_cache_dir: Path | None = None,
+                          decoder: SignalDecoder | ChannelDecoder | None = None,
+                          start: float | datetime | None = None, end: float | datetime | None = None,
+                          use_index: bool = False, bulk_decoding: bool = False,
+                          channel_dbc_files: dict[int, List[Path]] | None = None) -> Iterator[tuple[dict, set]]:
+    """
+    Read a BLF file in chunks and yield the decoded result of every chunk in file order.
+
+    With more than one worker the log containers of the file are split into ranges of about chunk_size messages,
+    which are decompressed, parsed and decoded by a process pool, so only the decoded samples are sent back, in shared
+    memory for large results. The results are yielded in file order and at most MAX_PENDING_CHUNKS_PER_WORKER ranges
+    per worker are in flight, so the workers do not run ahead of the output. With a memory budget, the memory of
+    every decoded chunk is recorded and the size of the following chunks and the number of ranges in flight are
+    adapted to it.
+
+    Parameters
+    ----------
+    filename : Path
+        Path to the BLF file.
+    dbc_files : List[Path] | None
+        List of paths to the DBC files, used for all channels without own DBC files, None if only the channels of
+        channel_dbc_files are decoded.
+    chunk_size : int | ChunkBudget
+        The size of the chunk to process, or the memory budget which adapts it.
+    signal_list : List
+        List of signals to decode.
+    num_workers : int
+        Number of worker processes, 1 decodes in the current process.
+    dbc_cache_dir : Path | None
+        The directory of the DBC cache, by default None (no caching).
+    decoder : SignalDecoder | ChannelDecoder | None
+        A decoder of the signal list built beforehand, by default None (the DBC files are loaded).
+    start : float | datetime | None
+        The start of the time window, see iter_chunks, by default None (start of the file).
+    end : float | datetime | None
+        The end of the time window, see iter_chunks, by default None (end of the file).
+    use_index : bool
+        Whether to use the sidecar index of the BLF file to skip log containers, by default False.
+    bulk_decoding : bool
+        Whether to parse the frames into arrays and decode them in bulk per message, by default False.
+    channel_dbc_files : dict[int, List[Path]] | None
+        The DBC files of single channels, by channel number starting at 1, see build_decoder, by default None (all
+        channels are decoded with dbc_files).
+
+    Yields
+    ------
+    tuple
+        A tuple containing a dictionary of signals and a set of found signals.
+    """
+    if decoder is None:
+        decoder = build_decoder(dbc_files, signal_list, dbc_cache_dir, channel_dbc_files)
+    if num_workers <= 1 and bulk_decoding:
+        for frames in iter_frames(filename, chunk_size, start, end, decoder.frame_ids, use_index):
+            result = process_frames((decoder, frames))
+            _record_chunk(chunk_size, len(frames), frames.nbytes, result)
+            yield result
+        return
+    if num_workers <= 1:
+        for chunk in iter_chunks(filename, chunk_size, start, end, decoder.frame_ids, use_index):
+            result = process_chunk((decoder, chunk, signal_list, decoder.frame_ids))
+            _record_chunk(chunk_size, len(chunk), len(chunk) * message_memory_size(chunk[0]), result)
+            yield result
+        return
+
+    *containers, selected, sizes = _plan_container_ranges(filename, start, end, decoder.frame_ids, use_index)
+    max_pending = num_workers * MAX_PENDING_CHUNKS_PER_WORKER
+    if isinstance(chunk_size, ChunkBudget):
+        chunk_size.set_pending_limits(num_workers, max_pending)
+    # Memory of a frame in a worker process, the decompressed object and the parsed frame or message
+    frame_bytes = MESSAGE_OBJECT_SIZE + (FRAME_DTYPE.itemsize if bulk_decoding else MESSAGE_MEMORY_SIZE)
+    start_resource_tracker()
+    with Pool(num_workers, initializer=_init_range_worker,
+              initargs=(filename, decoder, signal_list, bulk_decoding, max_pending, *containers)) as pool:
+        pending: deque = deque()
+        for container_range in iter_container_ranges(selected, sizes, chunk_size):
+            frame_count = sum(sizes[container_range[0]:container_range[1]]) // MESSAGE_OBJECT_SIZE
+            pending.append((frame_count, pool.apply_async(_process_container_range_in_worker, (container_range,))))
+            while len(pending) >= (chunk_size.max_pending if isinstance(chunk_size, ChunkBudget) else max_pending):
+                yield _receive_range_result(pending.popleft(), chunk_size, frame_bytes)
+        while pending:
+            yield _receive_range_result(pending.popleft(), chunk_size, frame_bytes)
+
+
+def _receive_range_result(pending: tuple, chunk_size: int | ChunkBudget, frame_bytes: int) -> tuple[dict, set]:
+    """
+    Wait for the decoded result of a range of log containers and record its memory.
+
+    Parameters
+    ----------
+    pending : tuple
+        The estimated number of frames of the range and the pending result of the pool.
+    chunk_size : int | ChunkBudget
+        The chunk size, or the memory budget which records the memory of the range.
+    frame_bytes : int
+        The memory of a frame in the worker process before it is decoded.
+
+    Returns
+    -------
+    tuple[dict, set]
+        A dictionary of signals with their SignalBuffer and a set of found signals.
+    """
+    frame_count, async_result = pending
+    result = receive_result(async_result.get())
+    _record_chunk(chunk_size, frame_count, frame_count * frame_bytes, result)
+    return result
+
+
+def _record_chunk(chunk_size: int | ChunkBudget, frame_count: int, frames_nbytes: int,
+                  result: tuple[dict, set]) -> None:
+    """
+    Record the memory of a decoded chunk in the memory budget, nothing is recorded for a fixed chunk size.
+
+    Parameters
+    ----------
+    chunk_size : int | ChunkBudget
+        The chunk size, or the memory budget.
+    frame_count : int
+        The number of frames of the chunk.
+    frames_nbytes : int
+        The memory of the frames of the chunk.
+    result : tuple[dict, set]
+        The decoded result of the chunk.
+    """
+    if isinstance(chunk_size, ChunkBudget):
+        chunk_size.record(frame_count, frames_nbytes + result_nbytes(result[0]))
 
-        if chunk:
-            chunks.append((db, chunk, signal_list))
 
-        mapped_file.close()
+def iter_time_ordered(results: Iterable[tuple[dict, set]]) -> Iterator[tuple[dict, set]]:
+    """
+    Pass the decoded results of consecutive chunks on with the samples of every signal in time order.
+
+    The samples of a signal in a chunk are one run, sorted if the frames of the chunk were logged out of order. The
+    run of a signal is held back until the next chunk with the signal arrives. Its samples up to the first sample of
+    the next run are passed on, the rest is merged with the next run in linear time and held back in turn, so frames
+    logged out of order across the border of two chunks are merged. The merge is stable, samples with equal
+    timestamps keep the order of the chunks. Samples which are older than samples already passed on, i.e. out of
+    order by more than one chunk, can not be merged any more, so the conversion fails instead of writing them out of
+    order.
+
+    Parameters
+    ----------
+    results : Iterable[tuple[dict, set]]
+        The results of the chunks in file order, dictionaries of signals with their SignalBuffer and sets of found
+        signals.
 
-    # with Pool(num_workers) as pool:
-    #     results = pool.map(process_chunk, chunks)
+    Yields
+    ------
+    tuple[dict, set]
+        A dictionary of signals with the samples which are passed on and the set of found signals of the chunk. The
+        samples held back after the last chunk are yielded with an empty set.
 
-    results = list(map(process_chunk, chunks))
-    signals_dict, found_signals = merge_dicts(results)
-    save_signals_to_mdf(signals_dict, output_filename)
+    Raises
+    ------
+    ValueError
+        If the samples of a signal are out of order by more than one chunk.
+    """
+    held: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+    last_timestamps: dict[str, float] = {}
+    for signals_dict, found_set in results:
+        released = {}
+        for name, samples in signals_dict.items():
+            if not isinstance(samples, SignalBuffer):
+                samples = SignalBuffer.from_samples(samples)
+            if not len(samples):
+                continue
+            samples.sort_by_timestamp()
+            run = (samples.timestamps, samples.values)
+            if run[0][0] < last_timestamps.get(name, -np.inf):
+                raise ValueError(f"The samples of signal {name} are out of order by more than one chunk and can not "
+                                 "be written in time order, convert the file with a larger chunk size.")
+            if name in held:
+                held_timestamps, held_values = held[name]
+                split = int(np.searchsorted(held_timestamps, run[0][0], side='right'))
+                released[name] = (held_timestamps[:split], held_values[:split])
+                if split < len(held_timestamps):
+                    run = merge_runs((held_timestamps[split:], held_values[split:]), run)
+            held[name] = run
+        # The signals are passed on in the order of their first chunk, as without holding them back
+        yield _release_runs({name: released[name] for name in held if name in released}, last_timestamps), found_set
+    yield _release_runs(held, last_timestamps), set()
+
+
+def _release_runs(runs: dict[str, tuple[np.ndarray, np.ndarray]], last_timestamps: dict[str, float]) -> dict:
+    """
+    Wrap the runs of signals which are passed on in buffers and record their last timestamps.
+
+    Parameters
+    ----------
+    runs : dict[str, tuple[np.ndarray, np.ndarray]]
+        The timestamps and values of the signals to pass on.
+    last_timestamps : dict[str, float]
+        The last timestamp passed on of every signal, updated with the runs.
+
+    Returns
+    -------
+    dict
+        Dictionary of signals with their SignalBuffer.
+    """
+    signals_dict = {}
+    for name, (timestamps, values) in runs.items():
+        if not len(timestamps):
+            continue
+        last_timestamps[name] = timestamps[-1]
+        signals_dict[name] = SignalBuffer.from_arrays(timestamps, values)
+    return signals_dict
+
+
+def read_blf_file(filename: Path, dbc_files: List[Path] | None, chunk_size: int | ChunkBudget,
+                  output_filename: Path, signal_list: List, num_workers: int = 1, to_type: str = 'mf4',
+                  dbc_cache_dir: Path | None = None, decoder: SignalDecoder | ChannelDecoder | None = None,
+                  start: float | datetime | None = None, end: float | datetime | None = None, use_index: bool = False,
+                  bulk_decoding: bool = False, channel_dbc_files: dict[int, List[Path]] | None = None,
+                  **writer_options) -> Path:
+    """
+    Read a BLF file in chunks and process the data.
+
+    The chunks are decoded while the file is read and the decoded samples of every chunk are appended to the output
+    once the next chunk is decoded, so neither the messages nor the decoded samples of the whole file are held in
+    memory. The samples of every signal are written in time order, see iter_time_ordered.
+
+    Parameters
+    ----------
+    filename : Path
+        Path to the BLF file.
+    dbc_files : List[Path] | None
+        List of paths to the DBC files, used for all channels without own DBC files, None if only the channels of
+        channel_dbc_files are decoded.
+    chunk_size : int | ChunkBudget
+        The size of the chunk to process, or the memory budget which adapts it.
+    output_filename : Path
+        Output filename for the MDF file, or output directory of the files of the other formats.
+    signal_list : List
+        List of signals to decode.
+    num_workers : int
+        Number of worker processes used to decode the chunks.
+    to_type : str
+        Output format (mf4, csv, resampled, parquet or feather), by default mf4.
+    dbc_cache_dir : Path | None
+        The directory of the DBC cache, by default None (no caching).
+    decoder : SignalDecoder | ChannelDecoder | None
+        A decoder of the signal list built beforehand, by default None (the DBC files are loaded).
+    start : float | datetime | None
+        The start of the time window, see iter_chunks, by default None (start of the file).
+    end : float | datetime | None
+        The end of the time window, see iter_chunks, by default None (end of the file).
+    use_index : bool
+        Whether to use the sidecar index of the BLF file to skip log containers, by default False.
+    bulk_decoding : bool
+        Whether to decode the frames in bulk per message, by default False.
+    channel_dbc_files : dict[int, List[Path]] | None
+        The DBC files of single channels, by channel number starting at 1, by default None (all channels are decoded
+        with dbc_files).
+    **writer_options
+        Options of the output writer, e.g. float_precision for csv.
+
+    Returns
+    -------
+    Path
+        Path to the output MDF file or CSV directory.
+    """
+    if decoder is None:
+        decoder = build_decoder(dbc_files, signal_list, dbc_cache_dir, channel_dbc_files)
+    found_signals: set = set()
+    with create_writer(to_type, output_filename, **writer_options) as writer:
+        results = iter_processed_chunks(filename, dbc_files, chunk_size, signal_list, num_workers, dbc_cache_dir,
+                                        decoder, start, end, use_index, bulk_decoding, channel_dbc_files)
+        for signals_dict, found_set in iter_time_ordered(results):
+            writer.write(signals_dict)
+            found_signals.update(found_set)
+        if not writer.signal_names:
+            raise ValueError("Signals are empty.")
 
-    not_found_signals = set(signal_list) - found_signals
+    not_found_signals = [*decoder.unmatched_selectors, *sorted(decoder.signal_names - found_signals)]
     if not_found_signals:
         print(f"The following signals were not found: {', '.join(not_found_signals)}")
 
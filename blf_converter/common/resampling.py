@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+RESAMPLE_METHODS = ('zoh', 'linear')
+
+
+def make_time_grid(start: float, end: float, rate: float) -> np.ndarray:
+    """
+    Create an equidistant time grid.
+
+    Parameters
+    ----------
+    start : float
+        The first timestamp of the grid.
+    end : float
+        The last timestamp which is covered by the grid.
+    rate : float
+        The sample rate of the grid in Hz.
+
+    Returns
+    -------
+    np.ndarray
+        The timestamps of the grid, starting at start with a step of 1 / rate.
+    """
+    if rate <= 0:
+        raise ValueError(f"The sample rate must be positive, got {rate}.")
+    count = int(np.floor((end - start) * rate + 1e-9)) + 1
+    return start + np.arange(max(count, 1)) / rate
+
+
+def resample(timestamps: np.ndarray, values: np.ndarray, grid: np.ndarray, method: str = 'zoh') -> np.ndarray:
+    """
+    Resample the samples of a signal onto a time grid.
+
+    With zero-order hold, every grid point takes the last sample at or before it. With linear interpolation the
+    value is interpolated between the neighbouring samples, which is only possible for numeric values, so other
+    values are always held. Grid points before the first sample are NaN, or None for non-numeric values; grid
+    points after the last sample hold the last value.
+
+    Parameters
+    ----------
+    timestamps : np.ndarray
+        The timestamps of the samples.
+    values : np.ndarray
+        The values of the samples.
+    grid : np.ndarray
+        The timestamps of the time grid.
+    method : str
+        The resampling method, 'zoh' (zero-order hold) or 'linear', by default 'zoh'.
+
+    Returns
+    -------
+    np.ndarray
+        The values at the grid points, as float64 array for numeric values.
+    """
+    if method not in RESAMPLE_METHODS:
+        raise ValueError(f"Unsupported resampling method: {method}")
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    values = np.asarray(values)
+    if len(timestamps) > 1 and np.any(np.diff(timestamps) < 0):
+        order = np.argsort(timestamps, kind='stable')
+        timestamps, values = timestamps[order], values[order]
+    numeric = values.dtype.kind in 'biuf'
+
+    if numeric:
+        values = values.astype(np.float64)
+        resampled = np.full(len(grid), np.nan)
+    else:
+        resampled = np.full(len(grid), None, dtype=object)
+    if not len(timestamps):
+        return resampled
+
+    index = np.searchsorted(timestamps, grid, side='right') - 1
+    valid = index >= 0
+    if numeric and method == 'linear':
+        resampled[valid] = np.interp(grid[valid], timestamps, values)
+    else:
+        resampled[valid] = values[index[valid]]
+    return resampled
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+import os
+from collections import deque
+from dataclasses import dataclass, field
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from blf_converter.common.signal_buffer import SignalBuffer
+
+# Minimum size of the samples of a result which are sent in shared memory, smaller results are pickled.
+SHARED_RESULT_MIN_BYTES = 1 << 16
+# Alignment of the arrays in the shared memory block.
+ARRAY_ALIGNMENT = 8
+
+# Shared memory blocks created by the current worker process which are kept open, oldest first.
+_created_blocks: deque[SharedMemory] = deque()
+
+
+@dataclass
+class SharedResult:
+    """
+    Decoded result of a chunk whose samples are stored in a shared memory block.
+
+    Only the name of the block and the position of the arrays are pickled, the samples are copied once into the block
+    by the worker process and once out of it by the receiving process.
+    """
+    name: str
+    # Name, dtype of the values, number of samples and offset of the timestamps of every signal. The values follow
+    # the timestamps at the next aligned offset.
+    layout: list[tuple[str, str, int, int]] = field(default_factory=list)
+    found_signals: set[str] = field(default_factory=set)
+
+
+def start_resource_tracker() -> None:
+    """
+    Start the resource tracker of shared memory blocks before the worker processes are started.
+
+    The worker processes then register their blocks at the tracker of the current process, which also unregisters
+    them when the blocks are released by receive_result. Otherwise every worker starts its own tracker, which warns
+    about and tries to remove the blocks released by the current process when the worker exits. There is no resource
+    tracker on Windows.
+    """
+    if os.name == 'posix':
+        resource_tracker.ensure_running()
+
+
+def share_result(result: tuple[dict, set], keep_open: int) -> tuple[dict, set] | SharedResult:
+    """
+    Copy the samples of a decoded result into a new shared memory block.
+
+    The block is kept open by the worker until keep_open newer blocks were created, because on Windows a block is
+    released as soon as no process has it open. keep_open has to be at least the number of results which can be
+    in flight, so the receiver attaches to every block before it is closed by the worker.
+
+    Parameters
+    ----------
+    result : tuple[dict, set]
+        A dictionary of signals with their SignalBuffer and a set of found signals.
+    keep_open : int
+        The number of blocks created by this process which are kept open.
+
+    Returns
+    -------
+    tuple[dict, set] | SharedResult
+        The description of the shared result, or the result itself if it is smaller than SHARED_RESULT_MIN_BYTES or
+        has values which are no plain numbers.
+    """
+    signals_dict, found_signals = result
+    arrays = [(name, buffer.timestamps, buffer.values) for name, buffer in signals_dict.items()]
+    if any(values.dtype.hasobject for _, _, values in arrays):
+        return result
+    layout: list[tuple[str, str, int, int]] = []
+    size = 0
+    for name, timestamps, values in arrays:
+        layout.append((name, values.dtype.str, len(timestamps), size))
+        size = _aligned(_aligned(size + timestamps.nbytes) + values.nbytes)
+    if size < SHARED_RESULT_MIN_BYTES:
+        return result
+
+    block = SharedMemory(create=True, size=size)
+    for (name, dtype, count, offset), (_, timestamps, values) in zip(layout, arrays):
+        shared_timestamps, shared_values = _shared_arrays(block, dtype, count, offset)
+        shared_timestamps[:] = timestamps
+        shared_values[:] = values
+        del shared_timestamps, shared_values
+    _created_blocks.append(block)
+    while len(_created_blocks) > max(keep_open, 1):
+        _created_blocks.popleft().close()
+    return SharedResult(block.name, layout, set(found_signals))
+
+
+def receive_result(result: tuple[dict, set] | SharedResult) -> tuple[dict, set]:
+    """
+    Copy the samples of a shared result into new buffers and release its shared memory block.
+
+    The samples are copied out on purpose: the block is released before the result reaches the writer, so a writer
+    which keeps the arrays, or a SignalBuffer which grows them, never holds a view on memory which is unlinked.
+
+    Parameters
+    ----------
+    result : tuple[dict, set] | SharedResult
+        The result returned by share_result.
+
+    Returns
+    -------
+    tuple[dict, set]
+        A dictionary of signals with their SignalBuffer and a set of found signals.
+    """
+    if not isinstance(result, SharedResult):
+        return result
+    block = SharedMemory(result.name)
+    try:
+        signals_dict = {}
+        for name, dtype, count, offset in result.layout:
+            timestamps, values = _shared_arrays(block, dtype, count, offset)
+            signals_dict[name] = SignalBuffer(count)
+            signals_dict[name].extend_arrays(timestamps, values)
+            del timestamps, values
+    finally:
+        block.close()
+        block.unlink()
+    return signals_dict, result.found_signals
+
+
+def _shared_arrays(block: SharedMemory, dtype: str, count: int, offset: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Get the timestamps and values of a signal in a shared memory block.
+
+    Parameters
+    ----------
+    block : SharedMemory
+        The shared memory block.
+    dtype : str
+        The dtype of the values.
+    count : int
+        The number of samples.
+    offset : int
+        The offset of the timestamps in the block.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        Views on the timestamps and values in the block.
+    """
+    timestamps: np.ndarray = np.ndarray(count, dtype=np.float64, buffer=block.buf, offset=offset)
+    values: np.ndarray = np.ndarray(count, dtype=np.dtype(dtype), buffer=block.buf,
+                                    offset=_aligned(offset + timestamps.nbytes))
+    return timestamps, values
+
+
+def _aligned(offset: int) -> int:
+    """
+    Round an offset up to the next multiple of ARRAY_ALIGNMENT.
+
+    Parameters
+    ----------
+    offset : int
+        The offset.
+
+    Returns
+    -------
+    int
+        The aligned offset.
+    """
+    return -(-offset // ARRAY_ALIGNMENT) * ARRAY_ALIGNMENT
@@ -0,0 +1,342 @@
+# -*- coding: utf-8 -*-
+from collections.abc import Iterable, Iterator
+
+import numpy as np
+
+# Initial number of samples a buffer can hold before it grows.
+DEFAULT_CAPACITY = 1024
+# Number of single appended samples which are collected before they are written to the arrays at once.
+PENDING_SAMPLES = 4096
+
+
+class SignalBuffer:
+    """
+    Growable columnar buffer for the samples of a signal.
+
+    Timestamps and values are stored in two preallocated NumPy arrays whose capacity is doubled when they are full,
+    so appending is amortized O(1). Single samples are collected in a small list first and written to the arrays
+    block-wise. The timestamps and values properties return views on the arrays without copying them, which can be
+    passed directly to an asammdf Signal.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        """
+        Initialize the SignalBuffer class.
+
+        Parameters
+        ----------
+        capacity : int
+            Initial number of samples the buffer can hold, by default DEFAULT_CAPACITY.
+        """
+        self._timestamps = np.empty(max(capacity, 1), dtype=np.float64)
+        self._values: np.ndarray | None = None
+        self._size = 0
+        self._pending: list[tuple] = []
+
+    @classmethod
+    def from_samples(cls, samples: Iterable[tuple]) -> 'SignalBuffer':
+        """
+        Create a buffer from (timestamp, value) tuples.
+
+        Parameters
+        ----------
+        samples : Iterable[tuple]
+            The (timestamp, value) tuples of the signal.
+
+        Returns
+        -------
+        SignalBuffer
+            The filled buffer.
+        """
+        buffer = cls()
+        buffer.extend(samples)
+        return buffer
+
+    @classmethod
+    def from_arrays(cls, timestamps: np.ndarray, values: np.ndarray) -> 'SignalBuffer':
+        """
+        Create a buffer which takes over arrays of timestamps and values without copying them.
+
+        Parameters
+        ----------
+        timestamps : np.ndarray
+            The float64 timestamps of the samples.
+        values : np.ndarray
+            The values of the samples.
+
+        Returns
+        -------
+        SignalBuffer
+            The filled buffer, growing it copies the arrays.
+        """
+        buffer = cls(0)
+        buffer._timestamps, buffer._values, buffer._size = timestamps, values, len(timestamps)
+        return buffer
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """
+        Get the timestamps of the samples.
+
+        Returns
+        -------
+        np.ndarray
+            A float64 view on the timestamps.
+        """
+        self._flush()
+        return self._timestamps[:self._size]
+
+    @property
+    def values(self) -> np.ndarray:
+        """
+        Get the values of the samples.
+
+        Returns
+        -------
+        np.ndarray
+            A view on the values, the dtype is derived from the appended values.
+        """
+        self._flush()
+        if self._values is None:
+            return np.empty(0, dtype=np.float64)
+        return self._values[:self._size]
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Get the number of bytes used by the samples.
+
+        Returns
+        -------
+        int
+            Number of bytes of the timestamps and values.
+        """
+        return self.timestamps.nbytes + self.values.nbytes
+
+    def append(self, timestamp: float, value) -> None:
+        """
+        Append a single sample.
+
+        Parameters
+        ----------
+        timestamp : float
+            The timestamp of the sample.
+        value : Any
+            The value of the sample.
+        """
+        self._pending.append((timestamp, value))
+        if len(self._pending) >= PENDING_SAMPLES:
+            self._flush()
+
+    def extend(self, samples: 'SignalBuffer | Iterable[tuple]') -> None:
+        """
+        Append the samples of another buffer or an iterable of (timestamp, value) tuples.
+
+        Parameters
+        ----------
+        samples : SignalBuffer | Iterable[tuple]
+            The samples to append.
+        """
+        if isinstance(samples, SignalBuffer):
+            self.extend_arrays(samples.timestamps, samples.values)
+        else:
+            for timestamp, value in samples:
+                self.append(timestamp, value)
+
+    def extend_arrays(self, timestamps: np.ndarray, values: np.ndarray) -> None:
+        """
+        Append the samples given as arrays of timestamps and values.
+
+        Parameters
+        ----------
+        timestamps : np.ndarray
+            The timestamps of the samples.
+        values : np.ndarray
+            The values of the samples.
+        """
+        self._flush()
+        self._write(np.asarray(timestamps, dtype=np.float64), np.asarray(values))
+
+    def sort_by_timestamp(self) -> None:
+        """
+        Sort the samples by their timestamps, e.g. the samples of a chunk with frames logged out of order.
+
+        Samples which are already in order are only checked. The sort is stable, samples with equal timestamps keep
+        the order in which they were appended. Views returned before stay valid, as the sorted samples are written to
+        new arrays.
+        """
+        timestamps = self.timestamps
+        if not np.any(timestamps[1:] < timestamps[:-1]):
+            return
+        order = np.argsort(timestamps, kind='stable')
+        self._timestamps, self._values = timestamps[order], self.values[order]
+
+    def _flush(self) -> None:
+        """
+        Write the pending single samples to the arrays.
+        """
+        if not self._pending:
+            return
+        timestamps, values = zip(*self._pending)
+        self._pending.clear()
+        self._write(np.array(timestamps, dtype=np.float64), np.array(values))
+
+    def _write(self, timestamps: np.ndarray, values: np.ndarray) -> None:
+        """
+        Copy the samples into the arrays, growing them if necessary.
+
+        Parameters
+        ----------
+        timestamps : np.ndarray
+            The timestamps of the samples.
+        values : np.ndarray
+            The values of the samples.
+        """
+        count = len(timestamps)
+        if count == 0:
+            return
+        required = self._size + count
+        dtype = values.dtype if self._values is None else _common_dtype(self._values[:self._size], values)
+        if required > len(self._timestamps) or self._values is None or dtype != self._values.dtype:
+            capacity = max(len(self._timestamps), 1)
+            while capacity < required:
+                capacity *= 2
+            self._timestamps = _resize(self._timestamps, capacity, self._timestamps.dtype, self._size)
+            self._values = _resize(self._values, capacity, dtype, self._size)
+        self._timestamps[self._size:required] = timestamps
+        self._values[self._size:required] = values  # type: ignore[index]
+        self._size = required
+
+    def __len__(self) -> int:
+        return self._size + len(self._pending)
+
+    def __iter__(self) -> Iterator[tuple]:
+        return iter(zip(self.timestamps.tolist(), self.values.tolist()))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (SignalBuffer, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __getstate__(self) -> dict:
+        # Only the filled part of the arrays is sent to other processes.
+        return {'timestamps': self.timestamps, 'values': self.values if self._values is not None else None}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(len(state['timestamps']))  # type: ignore[misc]
+        if state['values'] is not None:
+            self._write(state['timestamps'], state['values'])
+
+    def __repr__(self) -> str:
+        return f"SignalBuffer(size={len(self)}, dtype={self.values.dtype})"
+
+
+def _common_dtype(current: np.ndarray, new: np.ndarray) -> np.dtype:
+    """
+    Get the dtype which can hold the current and the new values without loss.
+
+    NumPy promotes int64 and uint64 to float64, which rounds integers beyond 2**53. Integers of both types are
+    kept in the integer type which holds all of them instead, or as Python integers if there is none.
+
+    Parameters
+    ----------
+    current : np.ndarray
+        The stored values.
+    new : np.ndarray
+        The appended values.
+
+    Returns
+    -------
+    np.dtype
+        The common dtype, object if the values can not be combined otherwise.
+    """
+    try:
+        dtype = np.result_type(current.dtype, new.dtype)
+    except TypeError:
+        return np.dtype(object)
+    if dtype.kind == 'f' and current.dtype.kind in 'iu' and new.dtype.kind in 'iu':
+        for candidate in (np.dtype(np.int64), np.dtype(np.uint64)):
+            if _fits(current, candidate) and _fits(new, candidate):
+                return candidate
+        return np.dtype(object)
+    return dtype
+
+
+def _fits(values: np.ndarray, dtype: np.dtype) -> bool:
+    """
+    Check if integer values can be represented by an integer dtype.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        The integer values.
+    dtype : np.dtype
+        The integer dtype.
+
+    Returns
+    -------
+    bool
+        True if all values are in the range of the dtype.
+    """
+    if not len(values):
+        return True
+    info = np.iinfo(dtype)
+    return info.min <= int(values.min()) and int(values.max()) <= info.max
+
+
+def merge_runs(first: tuple[np.ndarray, np.ndarray],
+               second: tuple[np.ndarray, np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Merge two time-ordered runs of samples in linear time.
+
+    Parameters
+    ----------
+    first : tuple[np.ndarray, np.ndarray]
+        The timestamps and values of the earlier run.
+    second : tuple[np.ndarray, np.ndarray]
+        The timestamps and values of the later run, placed behind samples of the earlier run with equal timestamps.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        The timestamps and values of the merged run.
+    """
+    (first_timestamps, first_values), (second_timestamps, second_values) = first, second
+    positions = np.searchsorted(first_timestamps, second_timestamps, side='right') + np.arange(len(second_timestamps))
+    from_first = np.ones(len(first_timestamps) + len(second_timestamps), dtype=bool)
+    from_first[positions] = False
+    timestamps = np.empty(len(from_first), dtype=np.float64)
+    values = np.empty(len(from_first), dtype=_common_dtype(first_values, second_values))
+    timestamps[positions], values[positions] = second_timestamps, second_values
+    timestamps[from_first], values[from_first] = first_timestamps, first_values
+    return timestamps, values
+
+
+def _resize(array: np.ndarray | None, capacity: int, dtype: np.dtype, size: int) -> np.ndarray:
+    """
+    Allocate a new array and copy the filled part of the old array into it.
+
+    Views on the old array stay valid, as the old array is not modified.
+
+    Parameters
+    ----------
+    array : np.ndarray | None
+        The old array.
+    capacity : int
+        The capacity of the new array.
+    dtype : np.dtype
+        The dtype of the new array.
+    size : int
+        The number of filled elements of the old array.
+
+    Returns
+    -------
+    np.ndarray
+        The new array.
+    """
+    resized = np.empty(capacity, dtype=dtype)
+    if array is not None and size:
+        resized[:size] = array[:size]
+    return resized
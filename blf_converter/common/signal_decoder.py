@@ -0,0 +1,596 @@
+# -*- coding: utf-8 -*-
+import struct
+from collections.abc import Collection
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, List
+
+import cantools
+import numpy as np
+from cantools.database.conversion import BaseConversion, IdentityConversion, LinearIntegerConversion
+from cantools.database.errors import DecodeError
+
+from blf_converter.common.utils import load_dbc_files, resolve_signal_selectors
+
+
+@dataclass
+class CompiledSignal:
+    """
+    Precompiled bit position and conversion of a signal.
+
+    The raw value of a signal is read from the payload interpreted as one integer, in little endian byte order
+    for Intel signals and in big endian byte order for Motorola signals.
+    """
+    name: str
+    big_endian: bool
+    shift: int
+    length: int
+    is_signed: bool
+    float_format: str | None
+    conversion: Any
+    multiplexer: str | None = None
+    multiplexer_ids: frozenset[int] = frozenset()
+    numeric_conversion: Any = None
+
+    @property
+    def mask(self) -> int:
+        """Bit mask of the raw value."""
+        return (1 << self.length) - 1
+
+    def raw_value(self, little_endian_payload: int, big_endian_payload: int) -> int | float:
+        """
+        Extract the raw value of the signal from the payload.
+
+        Parameters
+        ----------
+        little_endian_payload : int
+            The payload interpreted as little endian integer.
+        big_endian_payload : int
+            The payload interpreted as big endian integer.
+
+        Returns
+        -------
+        int | float
+            The raw value of the signal.
+        """
+        payload = big_endian_payload if self.big_endian else little_endian_payload
+        raw = (payload >> self.shift) & self.mask
+        if self.float_format is not None:
+            return struct.unpack(self.float_format, raw.to_bytes(self.length // 8, 'little'))[0]
+        if self.is_signed and raw >> (self.length - 1):
+            raw -= 1 << self.length
+        return raw
+
+    def raw_values(self, little_endian_data: np.ndarray, big_endian_data: np.ndarray) -> np.ndarray:
+        """
+        Extract the raw values of the signal from the payloads of many frames at once.
+
+        Parameters
+        ----------
+        little_endian_data : np.ndarray
+            The payloads as uint8 matrix with one row per frame and one column per byte of the message.
+        big_endian_data : np.ndarray
+            The same payloads with reversed byte order.
+
+        Returns
+        -------
+        np.ndarray
+            The raw values, int64 or uint64 for an unsigned 64 bit signal, float64 for float signals.
+
+        Raises
+        ------
+        ValueError
+            If the signal is longer than 64 bits, use raw_value for every frame instead.
+        """
+        if self.length > 64:
+            raise ValueError(f"The signal {self.name} is longer than 64 bits and can not be decoded in bulk")
+        data = big_endian_data if self.big_endian else little_endian_data
+        first, offset = divmod(self.shift, 8)
+        last = (self.shift + self.length - 1) // 8
+        raw = np.zeros(len(data), dtype=np.uint64)
+        for i, column in enumerate(range(first, min(last, first + 7) + 1)):
+            raw |= data[:, column].astype(np.uint64) << np.uint64(8 * i)
+        raw >>= np.uint64(offset)
+        if last - first == 8:
+            # An unaligned 64 bit signal spans 9 bytes
+            raw |= data[:, last].astype(np.uint64) << np.uint64(64 - offset)
+        if self.length < 64:
+            raw &= np.uint64(self.mask)
+        if self.float_format is not None:
+            if self.length == 32:
+                # Signaling NaNs become quiet NaNs like with struct
+                with np.errstate(invalid='ignore'):
+                    return raw.astype(np.uint32).view(np.float32).astype(np.float64)
+            return raw.view(np.float64)
+        if self.is_signed:
+            values = raw.view(np.int64)
+            if self.length < 64:
+                values = np.where(values >> (self.length - 1), values - (1 << self.length), values)
+            return values
+        return raw if self.length == 64 else raw.view(np.int64)
+
+    def scaled_values(self, raw: np.ndarray) -> np.ndarray:
+        """
+        Convert raw values to physical values like the conversion of the signal without choices.
+
+        Parameters
+        ----------
+        raw : np.ndarray
+            The raw values from raw_values.
+
+        Returns
+        -------
+        np.ndarray
+            The physical values, integer for integer conversions and float64 otherwise.
+        """
+        conversion = self.numeric_conversion
+        if isinstance(conversion, IdentityConversion):
+            return raw
+        if isinstance(conversion, LinearIntegerConversion):
+            return raw * conversion.scale + conversion.offset
+        return raw.astype(np.float64) * conversion.scale + conversion.offset
+
+    def active_mask(self, multiplexer_values: dict[str, tuple[np.ndarray, np.ndarray]], count: int) -> np.ndarray:
+        """
+        Check for many frames if the signal is present, see is_active.
+
+        Parameters
+        ----------
+        multiplexer_values : dict[str, tuple[np.ndarray, np.ndarray]]
+            The mask of the frames in which a multiplexer is active and its values, per multiplexer name.
+        count : int
+            The number of frames.
+
+        Returns
+        -------
+        np.ndarray
+            True for the frames in which the signal is present.
+        """
+        if self.multiplexer is None:
+            return np.ones(count, dtype=bool)
+        if self.multiplexer not in multiplexer_values:
+            return np.zeros(count, dtype=bool)
+        active, values = multiplexer_values[self.multiplexer]
+        return active & np.isin(values, list(self.multiplexer_ids))
+
+    def is_active(self, multiplexer_values: dict[str, int]) -> bool:
+        """
+        Check if the signal is present for the given values of the active multiplexers.
+
+        Parameters
+        ----------
+        multiplexer_values : dict[str, int]
+            Values of the active multiplexer signals of a frame.
+
+        Returns
+        -------
+        bool
+            True if the signal is not multiplexed or its multiplexer selects it.
+        """
+        if self.multiplexer is None:
+            return True
+        return multiplexer_values.get(self.multiplexer) in self.multiplexer_ids
+
+
+@dataclass
+class CompiledMessage:
+    """
+    The requested signals of a message together with the multiplexers needed to decode them.
+
+    If all requested signals are multiplexed by the same root multiplexer, selector_pages holds the values of the
+    root multiplexer whose pages carry requested signals, so all other frames are skipped after reading the selector.
+    """
+    name: str
+    length: int
+    signals: List[CompiledSignal]
+    multiplexers: List[tuple[CompiledSignal, frozenset[int]]] = field(default_factory=list)
+    selector_pages: frozenset[int] | None = None
+
+
+def compile_signal(signal: cantools.database.can.Signal, message_length: int) -> CompiledSignal:
+    """
+    Compile the bit position and conversion of a signal.
+
+    Parameters
+    ----------
+    signal : cantools.database.can.Signal
+        The signal of the DBC file.
+    message_length : int
+        The length of the message in bytes.
+
+    Returns
+    -------
+    CompiledSignal
+        The compiled signal.
+    """
+    big_endian = signal.byte_order == 'big_endian'
+    if big_endian:
+        shift = 8 * message_length - (cantools.database.utils.start_bit(signal) + signal.length)
+    else:
+        shift = signal.start
+    float_format = None
+    if signal.is_float:
+        float_format = '<f' if signal.length == 32 else '<d'
+    return CompiledSignal(name=signal.name,
+                          big_endian=big_endian,
+                          shift=shift,
+                          length=signal.length,
+                          is_signed=signal.is_signed,
+                          float_format=float_format,
+                          conversion=signal.conversion,
+                          multiplexer=signal.multiplexer_signal,
+                          multiplexer_ids=frozenset(signal.multiplexer_ids or ()),
+                          # The conversion of the numeric values, choices are not decoded in bulk
+                          numeric_conversion=BaseConversion.factory(scale=signal.conversion.scale,
+                                                                    offset=signal.conversion.offset,
+                                                                    is_float=signal.conversion.is_float))
+
+
+def compile_message(message: cantools.database.can.Message, signal_list: Collection[str]) -> CompiledMessage:
+    """
+    Compile the requested signals of a message.
+
+    Parameters
+    ----------
+    message : cantools.database.can.Message
+        The message of the DBC file.
+    signal_list : Collection[str]
+        Names of the signals to decode.
+
+    Returns
+    -------
+    CompiledMessage
+        The compiled message.
+    """
+    signals = [compile_signal(signal, message.length) for signal in message.signals if signal.name in signal_list]
+    multiplexers = []
+    if message.is_multiplexed():
+        # Order the multiplexers from the root to the leaves, so the value of a parent multiplexer is always known
+        # before its children are checked.
+        depth: dict[str, int] = {}
+
+        def get_depth(signal: cantools.database.can.Signal) -> int:
+            if signal.multiplexer_signal is None:
+                return 0
+            if signal.name not in depth:
+                depth[signal.name] = get_depth(message.get_signal_by_name(signal.multiplexer_signal)) + 1
+            return depth[signal.name]
+
+        for signal in sorted((s for s in message.signals if s.is_multiplexer), key=get_depth):
+            # Same set of valid selector values as cantools uses to build its multiplexer codecs
+            children_ids = {mux_id for child in message.signals if child.multiplexer_signal == signal.name
+                            for mux_id in child.multiplexer_ids or ()}
+            children_ids.update(signal.conversion.choices or {})
+            multiplexers.append((compile_signal(signal, message.length), frozenset(children_ids)))
+    return CompiledMessage(name=message.name, length=message.length, signals=signals, multiplexers=multiplexers,
+                           selector_pages=get_selector_pages(message, signal_list))
+
+
+def get_selector_pages(message: cantools.database.can.Message, signal_list: Collection[str]) -> frozenset[int] | None:
+    """
+    Get the values of the root multiplexer of a message whose pages carry requested signals.
+
+    Parameters
+    ----------
+    message : cantools.database.can.Message
+        The message of the DBC file.
+    signal_list : Collection[str]
+        Names of the signals to decode.
+
+    Returns
+    -------
+    frozenset[int] | None
+        The values of the root multiplexer, None if the message has no single root multiplexer or a requested signal
+        is not multiplexed, so every frame carries requested signals.
+    """
+    roots = [signal for signal in message.signals if signal.is_multiplexer and signal.multiplexer_signal is None]
+    requested = [signal for signal in message.signals if signal.name in signal_list]
+    if len(roots) != 1 or not requested or any(signal.multiplexer_signal is None for signal in requested):
+        return None
+    pages: set[int] = set()
+    for signal in requested:
+        # The page of the root multiplexer is the page of the top level ancestor of the signal
+        while signal.multiplexer_signal is not None:
+            parent = message.get_signal_by_name(signal.multiplexer_signal)
+            if parent.multiplexer_signal is None:
+                break
+            signal = parent
+        pages.update(signal.multiplexer_ids or ())
+    return frozenset(pages)
+
+
+class SignalDecoder:
+    """
+    Decoder for the requested signals of a database.
+
+    The bit positions and conversions of the requested signals are compiled once, so decoding a frame only extracts
+    the requested signals instead of all signals of the message. Signal selectors with patterns are resolved against
+    the database at the same time, so they cost nothing per frame. The decoder can be used in place of the database,
+    as decode_message takes the same arguments and raises the same errors as cantools.
+    """
+
+    def __init__(self, db: cantools.database.Database, signal_list: List[str]):
+        """
+        Initialize the SignalDecoder class.
+
+        Parameters
+        ----------
+        db : cantools.database.Database
+            The database object containing the loaded DBC files.
+        signal_list : List[str]
+            List of signals or signal selectors to decode, see resolve_signal_selectors.
+        """
+        selected, self.unmatched_selectors = resolve_signal_selectors(db, signal_list)
+        self.frame_ids: set[int] = set(selected)
+        self.signal_names: set[str] = set().union(*selected.values())
+        self.messages: dict[int, CompiledMessage] = {
+            frame_id: compile_message(db.get_message_by_frame_id(frame_id), signals)
+            for frame_id, signals in selected.items()
+        }
+
+    def decode_message(self, frame_id: int, data: bytes, decode_choices: bool = True) -> dict[str, Any]:
+        """
+        Decode the requested signals of a frame.
+
+        Parameters
+        ----------
+        frame_id : int
+            The arbitration id of the frame.
+        data : bytes
+            The payload of the frame.
+        decode_choices : bool
+            Whether to convert values to their choice names, if available.
+
+        Returns
+        -------
+        dict[str, Any]
+            A dictionary of the requested signal names and their values.
+
+        Raises
+        ------
+        KeyError
+            If the frame id does not belong to a message with requested signals.
+        DecodeError
+            If the payload is too short or a multiplexer has an unknown value.
+        """
+        message = self.messages[frame_id]
+        if len(data) < message.length:
+            raise DecodeError(f"Wrong data size: {len(data)} instead of {message.length} bytes")
+        data = data[:message.length]
+        little_endian_payload = int.from_bytes(data, 'little')
+        big_endian_payload = int.from_bytes(data, 'big')
+
+        multiplexer_values: dict[str, int] = {}
+        for multiplexer, children_ids in message.multiplexers:
+            if not multiplexer.is_active(multiplexer_values):
+                continue
+            raw = multiplexer.raw_value(little_endian_payload, big_endian_payload)
+            value = multiplexer.conversion.raw_to_scaled(raw, False)
+            if value not in children_ids:
+                raise DecodeError(f"Unexpected multiplexer id {value} of {multiplexer.name}")
+            if (multiplexer.multiplexer is None and message.selector_pages is not None
+                    and value not in message.selector_pages):
+                # The page of the selector carries no requested signal
+                return {}
+            multiplexer_values[multiplexer.name] = value
+
+        decoded = {}
+        for signal in message.signals:
+            if signal.is_active(multiplexer_values):
+                raw = signal.raw_value(little_endian_payload, big_endian_payload)
+                decoded[signal.name] = signal.conversion.raw_to_scaled(raw, decode_choices)
+        return decoded
+
+    def decode_frames(self, frame_id: int, data: np.ndarray,
+                      lengths: np.ndarray) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+        """
+        Decode the requested signals of many frames of the same message at once.
+
+        The values are equal to the values of decode_message without choices. Frames for which decode_message raises
+        a DecodeError, because the payload is too short or a multiplexer has an unknown value, are skipped. Like in
+        decode_message, the root multiplexer is read first and frames whose page carries no requested signal are
+        skipped before anything else is decoded. The frames of a page are then decoded together for all signals
+        of the page, except for signals longer than 64 bits, which are decoded frame by frame.
+
+        Parameters
+        ----------
+        frame_id : int
+            The arbitration id of the frames.
+        data : np.ndarray
+            The payloads as uint8 matrix with one row per frame, at least as wide as the message.
+        lengths : np.ndarray
+            The number of valid bytes of every payload.
+
+        Returns
+        -------
+        dict[str, tuple[np.ndarray, np.ndarray]]
+            The mask of the frames in which a signal is present and its values in these frames, per signal name.
+
+        Raises
+        ------
+        KeyError
+            If the frame id does not belong to a message with requested signals.
+        """
+        message = self.messages[frame_id]
+        rows = np.flatnonzero(lengths >= message.length)
+        little_endian_data = data[rows, :message.length]
+        if message.selector_pages is not None:
+            selector = message.multiplexers[0][0]
+            values = selector.scaled_values(selector.raw_values(little_endian_data, little_endian_data[:, ::-1]))
+            selected = np.isin(values, list(message.selector_pages))
+            rows, little_endian_data = rows[selected], little_endian_data[selected]
+        big_endian_data = little_endian_data[:, ::-1]
+        count = len(rows)
+
+        valid = np.ones(count, dtype=bool)
+        multiplexer_values: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        for multiplexer, children_ids in message.multiplexers:
+            active = multiplexer.active_mask(multiplexer_values, count)
+            values = multiplexer.scaled_values(multiplexer.raw_values(little_endian_data, big_endian_data))
+            valid &= ~active | np.isin(values, list(children_ids))
+            multiplexer_values[multiplexer.name] = (active, values)
+
+        # The frames of every page, shared by the signals of the page
+        pages: dict[tuple, tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        decoded = {}
+        for signal in message.signals:
+            page = (signal.multiplexer, signal.multiplexer_ids)
+            if page not in pages:
+                mask = valid & signal.active_mask(multiplexer_values, count)
+                frame_mask = np.zeros(len(data), dtype=bool)
+                frame_mask[rows[mask]] = True
+                pages[page] = (frame_mask, little_endian_data[mask], big_endian_data[mask])
+            frame_mask, page_little_endian_data, page_big_endian_data = pages[page]
+            if not len(page_little_endian_data):
+                continue
+            if signal.length > 64:
+                # Wider than the integers of NumPy, decoded frame by frame like in decode_message
+                raws = [signal.raw_value(int.from_bytes(payload.tobytes(), 'little'),
+                                         int.from_bytes(payload.tobytes(), 'big'))
+                        for payload in page_little_endian_data]
+                values = np.array([signal.conversion.raw_to_scaled(raw, False) for raw in raws])
+            else:
+                values = signal.scaled_values(signal.raw_values(page_little_endian_data, page_big_endian_data))
+            decoded[signal.name] = (frame_mask, values)
+        return decoded
+
+
+class ChannelDecoder:
+    """
+    Decoder for logs of several CAN buses with a SignalDecoder per channel.
+
+    Every frame is only decoded with the database of its own channel, so messages with the same arbitration id on
+    different buses are decoded with their own definition. Frames of channels without own database are decoded with
+    the default decoder, or skipped if there is none. The decoder can be used in place of a SignalDecoder, the
+    channel of the frames has to be given to decode_message.
+    """
+
+    def __init__(self, decoders: dict[int, SignalDecoder], default: SignalDecoder | None = None):
+        """
+        Initialize the ChannelDecoder class.
+
+        Parameters
+        ----------
+        decoders : dict[int, SignalDecoder]
+            The decoder of every channel, by channel number as shown by the Vector tools, starting at 1.
+        default : SignalDecoder | None
+            The decoder of all other channels, by default None (frames of other channels are skipped).
+        """
+        # python-can counts the channels of can.Message from 0
+        self.decoders: dict[int, SignalDecoder] = {channel - 1: decoder for channel, decoder in decoders.items()}
+        self.default = default
+        all_decoders = [*self.decoders.values(), *([default] if default is not None else [])]
+        self.frame_ids: set[int] = set().union(*(decoder.frame_ids for decoder in all_decoders))
+        self.signal_names: set[str] = set().union(*(decoder.signal_names for decoder in all_decoders))
+        # Selectors are only unmatched if they select no signal of any channel
+        self.unmatched_selectors: list[str] = [
+            selector for selector in all_decoders[0].unmatched_selectors
+            if all(selector in decoder.unmatched_selectors for decoder in all_decoders[1:])
+        ]
+
+    def get_decoder(self, channel: int | None) -> SignalDecoder | None:
+        """
+        Get the decoder of a channel.
+
+        Parameters
+        ----------
+        channel : int | None
+            The channel of the can.Message, counted from 0.
+
+        Returns
+        -------
+        SignalDecoder | None
+            The decoder of the channel, None if frames of the channel are not decoded.
+        """
+        return self.decoders.get(channel, self.default) if channel is not None else self.default
+
+    def decode_message(self, frame_id: int, data: bytes, decode_choices: bool = True,
+                       channel: int | None = None) -> dict[str, Any]:
+        """
+        Decode the requested signals of a frame with the decoder of its channel.
+
+        Parameters
+        ----------
+        frame_id : int
+            The arbitration id of the frame.
+        data : bytes
+            The payload of the frame.
+        decode_choices : bool
+            Whether to convert values to their choice names, if available.
+        channel : int | None
+            The channel of the can.Message, counted from 0.
+
+        Returns
+        -------
+        dict[str, Any]
+            A dictionary of the requested signal names and their values.
+
+        Raises
+        ------
+        KeyError
+            If the channel is not decoded or the frame id does not belong to a message with requested signals.
+        DecodeError
+            If the payload is too short or a multiplexer has an unknown value.
+        """
+        decoder = self.get_decoder(channel)
+        if decoder is None:
+            raise KeyError(channel)
+        return decoder.decode_message(frame_id, data, decode_choices)
+
+    def split_frames(self, channels: np.ndarray) -> list[tuple[SignalDecoder, np.ndarray]]:
+        """
+        Split frames by the decoder of their channel.
+
+        Parameters
+        ----------
+        channels : np.ndarray
+            The channel of every frame, counted from 0.
+
+        Returns
+        -------
+        list[tuple[SignalDecoder, np.ndarray]]
+            Every decoder with the positions of its frames in file order.
+        """
+        groups = [(decoder, np.flatnonzero(channels == channel)) for channel, decoder in self.decoders.items()]
+        if self.default is not None:
+            groups.append((self.default, np.flatnonzero(~np.isin(channels, list(self.decoders)))))
+        return [(decoder, positions) for decoder, positions in groups if len(positions)]
+
+
+def build_decoder(dbc_files: List[Path] | None, signal_list: List[str], dbc_cache_dir: Path | None = None,
+                  channel_dbc_files: dict[int, List[Path]] | None = None) -> SignalDecoder | ChannelDecoder:
+    """
+    Load the DBC files and build the decoder of the requested signals.
+
+    Parameters
+    ----------
+    dbc_files : List[Path] | None
+        The DBC files of all channels without own DBC files, None if only the channels of channel_dbc_files are
+        decoded.
+    signal_list : List[str]
+        List of signals to decode.
+    dbc_cache_dir : Path | None
+        The directory of the DBC cache, by default None (no caching).
+    channel_dbc_files : dict[int, List[Path]] | None
+        The DBC files of single channels, by channel number as shown by the Vector tools, starting at 1, by default
+        None (all channels are decoded with dbc_files).
+
+    Returns
+    -------
+    SignalDecoder | ChannelDecoder
+        A SignalDecoder without channel_dbc_files, otherwise a ChannelDecoder.
+
+    Raises
+    ------
+    ValueError
+        If neither DBC files nor DBC files of channels are given.
+    """
+    if not dbc_files and not channel_dbc_files:
+        raise ValueError("No DBC files are given.")
+    default = SignalDecoder(load_dbc_files(dbc_files, dbc_cache_dir), signal_list) if dbc_files else None
+    if not channel_dbc_files:
+        assert default is not None
+        return default
+    decoders = {channel: SignalDecoder(load_dbc_files(files, dbc_cache_dir), signal_list)
+                for channel, files in channel_dbc_files.items()}
+    return ChannelDecoder(decoders, default)
@@ -0,0 +1,421 @@
+# -*- coding: utf-8 -*-
+import csv
+from pathlib import Path
+
+import numpy as np
+from asammdf import MDF, Signal
+
+from blf_converter.common.resampling import make_time_grid, resample
+from blf_converter.common.signal_buffer import SignalBuffer
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = pq = None
+
+# Number of samples of a signal which are collected before they are written as one Parquet row group or Arrow
+# record batch.
+DEFAULT_ROW_GROUP_SIZE = 1 << 18
+
+
+class SignalWriter:
+    """
+    Base class of the writers which save decoded signals chunk by chunk.
+
+    A writer is used as context manager. The output is only finalized if the block is left without an exception.
+    """
+
+    def __init__(self, output_path: Path):
+        """
+        Initialize the SignalWriter class.
+
+        Parameters
+        ----------
+        output_path : Path
+            The output file or directory.
+        """
+        self.output_path = output_path
+        self.signal_names: list[str] = []
+
+    def write(self, signals_dict: dict) -> None:
+        """
+        Write the samples of a decoded chunk.
+
+        Parameters
+        ----------
+        signals_dict : dict
+            Dictionary of signal names and their samples as SignalBuffer or list of (timestamp, value) tuples.
+        """
+        for signal_name, signal_data in signals_dict.items():
+            if not isinstance(signal_data, SignalBuffer):
+                signal_data = SignalBuffer.from_samples(signal_data)
+            if not len(signal_data):
+                continue
+            if signal_name not in self.signal_names:
+                self.signal_names.append(signal_name)
+            self._write_signal(signal_name, signal_data.timestamps, signal_data.values)
+
+    def _write_signal(self, signal_name: str, timestamps: np.ndarray, values: np.ndarray) -> None:
+        """
+        Write the samples of a single signal.
+
+        Parameters
+        ----------
+        signal_name : str
+            The name of the signal.
+        timestamps : np.ndarray
+            The timestamps of the samples.
+        values : np.ndarray
+            The values of the samples.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """
+        Finalize the output.
+        """
+        raise NotImplementedError
+
+    def abort(self) -> None:
+        """
+        Release all resources without finalizing the output.
+        """
+
+    def __enter__(self) -> 'SignalWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class Mf4Writer(SignalWriter):
+    """
+    Writer of an MF4 file, each signal is saved in its own channel group.
+
+    The samples of every chunk are appended to the channel group of the signal. asammdf keeps appended samples in a
+    temporary file, so the memory usage does not grow with the length of the recording. The data type of a channel
+    is defined by the first chunk of the signal, the values of later chunks must fit into it.
+    """
+
+    def __init__(self, output_path: Path):
+        super().__init__(output_path)
+        self._mdf = MDF(version='4.10')
+        self._groups: dict[str, tuple[int, np.dtype]] = {}
+
+    def _write_signal(self, signal_name: str, timestamps: np.ndarray, values: np.ndarray) -> None:
+        if signal_name in self._groups:
+            index, dtype = self._groups[signal_name]
+            if dtype.kind == 'O':
+                # Samples of string channels are extended as fixed size utf-8 byte strings
+                values = np.char.encode(values.astype(str), 'utf-8')
+            elif values.dtype != dtype:
+                values = _cast_losslessly(signal_name, values, dtype)
+            self._mdf.extend(index, [(timestamps, None), (values, None)])
+        elif values.dtype.kind in 'OU':
+            self._mdf.append(Signal(samples=values.astype(str).tolist(), timestamps=timestamps, name=signal_name,
+                                    encoding='utf-8'))
+            self._groups[signal_name] = (len(self._mdf.groups) - 1, np.dtype(object))
+        else:
+            self._mdf.append(Signal(samples=values, timestamps=timestamps, name=signal_name))
+            self._groups[signal_name] = (len(self._mdf.groups) - 1, values.dtype)
+
+    def close(self) -> None:
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self._mdf.save(self.output_path, overwrite=True)
+        self._mdf.close()
+
+    def abort(self) -> None:
+        self._mdf.close()
+
+
+def _cast_losslessly(signal_name: str, values: np.ndarray, dtype: np.dtype) -> np.ndarray:
+    """
+    Cast the values of a later chunk to the data type of the channel of the signal.
+
+    Parameters
+    ----------
+    signal_name : str
+        The name of the signal.
+    values : np.ndarray
+        The values of the chunk.
+    dtype : np.dtype
+        The data type of the channel.
+
+    Returns
+    -------
+    np.ndarray
+        The values in the data type of the channel.
+
+    Raises
+    ------
+    ValueError
+        If a value changes in the data type of the channel, e.g. an integer out of its range.
+    """
+    try:
+        with np.errstate(invalid='ignore', over='ignore'):
+            cast = values.astype(dtype)
+        # Compared in both types, wrapped integers only differ in the one and rounded values only in the other
+        equal_nan = values.dtype.kind == 'f'
+        lossless = (np.array_equal(cast, values, equal_nan=equal_nan)
+                    and np.array_equal(cast.astype(values.dtype), values, equal_nan=equal_nan))
+    except (TypeError, ValueError, OverflowError):
+        lossless = False
+    if not lossless:
+        raise ValueError(f"The values of signal {signal_name} of type {values.dtype} do not fit into its MF4 channel "
+                         f"of type {dtype}, which is defined by the first chunk of the signal")
+    return cast
+
+
+class CsvWriter(SignalWriter):
+    """
+    Writer of one CSV file per signal, named after the signal.
+
+    Every file has the columns 'timestamps' and the signal name. As in the CSV export of asammdf, the timestamps
+    start from zero at the first sample of the signal.
+    """
+
+    def __init__(self, output_path: Path, float_precision: int | None = None):
+        """
+        Initialize the CsvWriter class.
+
+        Parameters
+        ----------
+        output_path : Path
+            The output directory of the CSV files.
+        float_precision : int | None
+            Number of decimals of float values, by default None (full precision).
+        """
+        super().__init__(output_path)
+        self.float_precision = float_precision
+        self._time_offsets: dict[str, float] = {}
+
+    def _write_signal(self, signal_name: str, timestamps: np.ndarray, values: np.ndarray) -> None:
+        if signal_name not in self._time_offsets:
+            self.output_path.mkdir(parents=True, exist_ok=True)
+            self._time_offsets[signal_name] = float(timestamps[0])
+            mode = 'w'
+        else:
+            mode = 'a'
+        if self.float_precision is not None and values.dtype.kind == 'f':
+            values = np.round(values, self.float_precision)
+        with open(self.output_path / f"{signal_name}.csv", mode, newline='', encoding='utf-8') as csv_file:
+            writer = csv.writer(csv_file, lineterminator='\r\n')
+            if mode == 'w':
+                writer.writerow(['timestamps', signal_name])
+            writer.writerows(zip((timestamps - self._time_offsets[signal_name]).tolist(), values.tolist()))
+
+    def close(self) -> None:
+        pass
+
+
+class ResampledCsvWriter(SignalWriter):
+    """
+    Writer of a single CSV file with all signals resampled onto a common time grid.
+
+    The file has the column 'timestamps' and one column per signal. The grid starts at the first sample of all
+    signals and its timestamps start from zero, as in the CSV files of the single signals. As the grid depends on
+    all samples, the samples are collected until the writer is closed.
+    """
+
+    def __init__(self, output_path: Path, rate: float = 100.0, method: str = 'zoh',
+                 float_precision: int | None = None):
+        """
+        Initialize the ResampledCsvWriter class.
+
+        Parameters
+        ----------
+        output_path : Path
+            The output CSV file.
+        rate : float
+            The sample rate of the time grid in Hz, by default 100.
+        method : str
+            The resampling method, 'zoh' (zero-order hold) or 'linear', by default 'zoh'.
+        float_precision : int | None
+            Number of decimals of float values, by default None (full precision).
+        """
+        super().__init__(output_path)
+        self.rate = rate
+        self.method = method
+        self.float_precision = float_precision
+        self._buffers: dict[str, SignalBuffer] = {}
+
+    def _write_signal(self, signal_name: str, timestamps: np.ndarray, values: np.ndarray) -> None:
+        self._buffers.setdefault(signal_name, SignalBuffer()).extend_arrays(timestamps, values)
+
+    def close(self) -> None:
+        if not self._buffers:
+            return
+        start = min(float(buffer.timestamps.min()) for buffer in self._buffers.values())
+        end = max(float(buffer.timestamps.max()) for buffer in self._buffers.values())
+        grid = make_time_grid(start, end, self.rate)
+        columns = [np.arange(len(grid)) / self.rate]
+        for signal_name in self.signal_names:
+            buffer = self._buffers.pop(signal_name)
+            values = resample(buffer.timestamps, buffer.values, grid, self.method)
+            if self.float_precision is not None and values.dtype.kind == 'f':
+                values = np.round(values, self.float_precision)
+            columns.append(values)
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.output_path, 'w', newline='', encoding='utf-8') as csv_file:
+            writer = csv.writer(csv_file, lineterminator='\r\n')
+            writer.writerow(['timestamps', *self.signal_names])
+            writer.writerows(zip(*(column.tolist() for column in columns)))
+
+    def abort(self) -> None:
+        self._buffers.clear()
+
+
+class ArrowWriter(SignalWriter):
+    """
+    Base class of the writers of one Arrow based file per signal, named after the signal.
+
+    Every file has a float64 column 'timestamps' with the absolute timestamps and a column named after the signal
+    whose type is defined by the first chunk of the signal. The samples of a signal are collected until a row group
+    is full, so the files are not split into many small row groups.
+    """
+
+    suffix = ''
+
+    def __init__(self, output_path: Path, compression: str | None = 'zstd',
+                 row_group_size: int = DEFAULT_ROW_GROUP_SIZE):
+        """
+        Initialize the ArrowWriter class.
+
+        Parameters
+        ----------
+        output_path : Path
+            The output directory of the files.
+        compression : str | None
+            The compression codec, e.g. zstd, lz4 or None (uncompressed), by default zstd.
+        row_group_size : int
+            Number of samples per row group, by default DEFAULT_ROW_GROUP_SIZE.
+        """
+        if pa is None:
+            raise ImportError("pyarrow is required to write parquet and feather files.")
+        super().__init__(output_path)
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self._buffers: dict[str, SignalBuffer] = {}
+        self._writers: dict[str, tuple] = {}
+
+    def _write_signal(self, signal_name: str, timestamps: np.ndarray, values: np.ndarray) -> None:
+        buffer = self._buffers.setdefault(signal_name, SignalBuffer())
+        buffer.extend_arrays(timestamps, values)
+        if len(buffer) >= self.row_group_size:
+            self._flush(signal_name)
+
+    def _flush(self, signal_name: str) -> None:
+        """
+        Write the collected samples of a signal.
+
+        Parameters
+        ----------
+        signal_name : str
+            The name of the signal.
+        """
+        buffer = self._buffers.pop(signal_name)
+        values = buffer.values
+        if signal_name not in self._writers:
+            if values.dtype.kind in 'OU':
+                value_type = pa.string()
+            else:
+                value_type = pa.from_numpy_dtype(values.dtype)
+            schema = pa.schema([('timestamps', pa.float64()), (signal_name, value_type)])
+            self.output_path.mkdir(parents=True, exist_ok=True)
+            self._writers[signal_name] = (self._open(self.output_path / f"{signal_name}{self.suffix}", schema), schema)
+        writer, schema = self._writers[signal_name]
+        value_type = schema.field(signal_name).type
+        if pa.types.is_string(value_type):
+            values = values.astype(str)
+        else:
+            values = values.astype(value_type.to_pandas_dtype(), copy=False)
+        writer.write_table(pa.table([pa.array(buffer.timestamps), pa.array(values, type=value_type)],
+                                    schema=schema))
+
+    def _open(self, path: Path, schema):
+        """
+        Open the file of a signal.
+
+        Parameters
+        ----------
+        path : Path
+            The path of the file.
+        schema : pyarrow.Schema
+            The schema of the file.
+
+        Returns
+        -------
+        Any
+            A writer with a write_table and a close method.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        for signal_name in list(self._buffers):
+            self._flush(signal_name)
+        self.abort()
+
+    def abort(self) -> None:
+        for writer, _ in self._writers.values():
+            writer.close()
+        self._writers.clear()
+        self._buffers.clear()
+
+
+class ParquetWriter(ArrowWriter):
+    """
+    Writer of one Parquet file per signal.
+    """
+
+    suffix = '.parquet'
+
+    def _open(self, path: Path, schema):
+        return pq.ParquetWriter(path, schema, compression=self.compression or 'none')
+
+
+class FeatherWriter(ArrowWriter):
+    """
+    Writer of one Feather (Arrow IPC) file per signal, every row group is written as a record batch.
+    """
+
+    suffix = '.feather'
+
+    def _open(self, path: Path, schema):
+        return pa.ipc.new_file(path, schema, options=pa.ipc.IpcWriteOptions(compression=self.compression))
+
+
+def create_writer(to_type: str, output_path: Path, **options) -> SignalWriter:
+    """
+    Create the writer of an output format.
+
+    Parameters
+    ----------
+    to_type : str
+        Output format (mf4, csv, resampled, parquet or feather).
+    output_path : Path
+        The output file or directory.
+    **options
+        Options of the writer, e.g. float_precision for csv, rate for resampled or compression for parquet and
+        feather.
+
+    Returns
+    -------
+    SignalWriter
+        The writer of the output format.
+    """
+    if to_type == 'mf4':
+        return Mf4Writer(output_path)
+    elif to_type == 'csv':
+        return CsvWriter(output_path, **options)
+    elif to_type == 'resampled':
+        return ResampledCsvWriter(output_path, **options)
+    elif to_type == 'parquet':
+        return ParquetWriter(output_path, **options)
+    elif to_type == 'feather':
+        return FeatherWriter(output_path, **options)
+    else:
+        raise ValueError(f"Unsupported output format: {to_type}")
@@ -1,11 +1,25 @@
 # -*- coding: utf-8 -*-
-from collections import defaultdict
+import fnmatch
+import hashlib
+import os
+import pickle
+import re
+import stat
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 from typing import List
 
 import cantools
 from asammdf import MDF, Signal
 
+from blf_converter.common.settings_parser import SettingsParser
+from blf_converter.common.signal_buffer import SignalBuffer
+
+# Section of the settings file with the DBC files of every CAN channel.
+CHANNEL_DBC_SECTION = 'channel_dbc'
+# Prefix of signal selectors which are regular expressions instead of glob patterns.
+SIGNAL_REGEX_PREFIX = 're:'
+
 
 def validate_results(results: List[tuple[dict, set]]) -> bool:
     """
@@ -24,37 +38,61 @@ def validate_results(results: List[tuple[dict, set]]) -> bool:
     if not isinstance(results, list):
         return False
 
-    for item in results:
-        if not isinstance(item, tuple) or len(item) != 2:
-            return False
-        signals_dict, found_set = item
-        if not isinstance(signals_dict, dict) or not isinstance(found_set, set):
-            return False
-    return True
+    return all(_is_valid_result(item) for item in results)
+
+
+def _is_valid_result(item) -> bool:
+    """
+    Validate a single chunk result.
+
+    Parameters
+    ----------
+    item : Any
+        The result of a single processed chunk.
+
+    Returns
+    -------
+    bool
+        True if the item is a tuple of a signals dictionary and a set of found signals.
+    """
+    if not isinstance(item, tuple) or len(item) != 2:
+        return False
+    signals_dict, found_set = item
+    return isinstance(signals_dict, dict) and isinstance(found_set, set)
 
 
-def merge_dicts(results: List[tuple[dict, set]]) -> tuple[dict, set]:
+def merge_dicts(results: Iterable[tuple[dict, set]]) -> tuple[dict, set]:
     """
     Merge the results of multiple chunks into a single dictionary.
 
+    The results can also be passed as an iterator, e.g. a generator of processed chunks. In this case every chunk
+    result is merged as soon as it is produced, so the chunk itself can be released before the next one is read.
+    The samples of a signal can be a list of (timestamp, value) tuples or a SignalBuffer. The container of the
+    first chunk containing a signal is reused for the merged samples of that signal.
+
     Parameters
     ----------
-    results : List[tuple[dict, set]]
-        List of tuples containing a dictionary of signals and a set of found signals.
+    results : Iterable[tuple[dict, set]]
+        List or iterator of tuples containing a dictionary of signals and a set of found signals.
 
     Returns
     -------
     tuple: [dict, set]
         A tuple containing a merged dictionary of signals and a set of found signals.
     """
-    results_validation = validate_results(results)
-    if not results_validation:
+    if not isinstance(results, (list, Iterator)) or (isinstance(results, list) and not validate_results(results)):
         raise ValueError("Please provide a list of tuples with a dictionary and a set.")
-    merged_dict = defaultdict(list)
+    merged_dict: dict = {}
     found_signals = set()
-    for signals_dict, found_set in results:
+    for item in results:
+        if not _is_valid_result(item):
+            raise ValueError("Please provide a list of tuples with a dictionary and a set.")
+        signals_dict, found_set = item
         for k, v in signals_dict.items():
-            merged_dict[k].extend(v)
+            if k in merged_dict:
+                merged_dict[k].extend(v)
+            else:
+                merged_dict[k] = v
         found_signals.update(found_set)
     return merged_dict, found_signals
 
@@ -66,7 +104,7 @@ def save_signals_to_mdf(signals_dict: dict, output_filename: Path, append: bool
     Parameters
     ----------
     signals_dict : dict
-        Dictionary containing the signals.
+        Dictionary containing the signals, either as SignalBuffer or as list of (timestamp, value) tuples.
     output_filename : Path
         Output filename for the MDF file.
     append : bool
@@ -78,12 +116,14 @@ def save_signals_to_mdf(signals_dict: dict, output_filename: Path, append: bool
         raise ValueError("Signals are illegally formatted.")
     mdf = MDF(version='4.10')
     for signal_name, signal_data in signals_dict.items():
-        timestamps, values = zip(*signal_data)
-        first_value = values[0]
-        if isinstance(first_value, str):
-            signal = Signal(samples=values, timestamps=timestamps, name=signal_name, encoding='utf-8')
+        if not isinstance(signal_data, SignalBuffer):
+            signal_data = SignalBuffer.from_samples(signal_data)
+        values = signal_data.values
+        if values.dtype.kind in 'OU':
+            signal = Signal(samples=values.astype(str).tolist(), timestamps=signal_data.timestamps, name=signal_name,
+                            encoding='utf-8')
         else:
-            signal = Signal(samples=values, timestamps=timestamps, name=signal_name)
+            signal = Signal(samples=values, timestamps=signal_data.timestamps, name=signal_name)
         mdf.append(signal)
     mdf.save(output_filename, overwrite=not append)
 
@@ -117,26 +157,236 @@ def check_output_file_exists(output_dir: Path, filename: str) -> bool:
         return True
 
 
-def load_dbc_files(dbc_files: List[Path]):
+def load_dbc_files(dbc_files: List[Path], cache_dir: Path | None = None):
     """
     Load multiple DBC files into a database.
 
+    If a cache directory is given, the loaded database is stored there and reused as long as the content of the DBC
+    files does not change, which is much faster than parsing the DBC files again. The cache files are pickles, which
+    can run arbitrary code when they are loaded, so the cache directory is created with access for the current user
+    only, and cache files are only loaded if they and the directory belong to the current user and are not writable
+    by other users.
+
     Parameters
     ------------
     dbc_files : list
         The list of paths to the DBC files.
+    cache_dir : Path | None
+        The directory of the DBC cache, by default None (no caching).
 
     Returns
     -----------
     cantools.database.Database
         The database object containing the loaded DBC files.
     """
+    cache_file = None
+    if cache_dir is not None:
+        cache_file = cache_dir / f"{get_dbc_cache_key(dbc_files)}.pickle"
+        if cache_file.is_file() and not _is_trusted_cache_file(cache_file):
+            print(f"Ignoring DBC cache file {cache_file}, which belongs to or is writable by another user")
+            cache_file = None
+        elif cache_file.is_file():
+            try:
+                with open(cache_file, 'rb') as f:
+                    return pickle.load(f)
+            except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+                print(f"Ignoring invalid DBC cache file {cache_file}: {e}")
+
     db = cantools.database.Database()
     for dbc_file in dbc_files:
         db.add_dbc_file(dbc_file)
+
+    if cache_file is not None:
+        cache_file.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        temp_file = cache_file.with_suffix(f'.{os.getpid()}.tmp')
+        with open(temp_file, 'wb') as f:
+            pickle.dump(db, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, cache_file)
     return db
 
 
+def get_channel_dbc_files(channel_dbc: List[tuple[int, Path]] | None = None,
+                          settings_file: Path | None = None) -> dict[int, list[Path]]:
+    """
+    Get the DBC files of every CAN channel from the command line and a settings file.
+
+    In the channel_dbc section of the settings file, the key is the channel number and the value is a comma separated
+    list of DBC files, relative paths are relative to the settings file. The DBC files given on the command line
+    replace the DBC files of the same channel in the settings file.
+
+    Parameters
+    ------------
+    channel_dbc : List[tuple[int, Path]] | None
+        Pairs of channel number and DBC file, a channel can have several DBC files, by default None.
+    settings_file : Path | None
+        The settings file with the channel_dbc section, by default None.
+
+    Returns
+    -----------
+    dict[int, list[Path]]
+        The DBC files by channel number as shown by the Vector tools, starting at 1.
+
+    Raises
+    -----------
+    ValueError
+        If a channel number of the settings file is invalid.
+    """
+    channel_dbc_files: dict[int, list[Path]] = {}
+    if settings_file is not None:
+        for channel, value in SettingsParser(settings_file).get(CHANNEL_DBC_SECTION).items():
+            if not str(channel).isdigit() or int(channel) < 1:
+                raise ValueError(f"Invalid channel {channel!r} in {settings_file}, channels start at 1.")
+            channel_dbc_files[int(channel)] = [settings_file.parent / path.strip() for path in str(value).split(',')
+                                               if path.strip()]
+    command_line_files: dict[int, list[Path]] = {}
+    for channel, dbc_file in channel_dbc or []:
+        command_line_files.setdefault(channel, []).append(dbc_file)
+    channel_dbc_files.update(command_line_files)
+    return channel_dbc_files
+
+
+def _is_trusted_cache_file(cache_file: Path) -> bool:
+    """
+    Check that a DBC cache file and its directory can only have been written by the current user.
+
+    Parameters
+    ------------
+    cache_file : Path
+        The DBC cache file.
+
+    Returns
+    -----------
+    bool
+        True if the file and its directory belong to the current user and are not writable by other users, always
+        True on systems without POSIX user ids.
+    """
+    if not hasattr(os, 'getuid'):
+        return True
+    for path in (cache_file.parent, cache_file):
+        status = path.stat()
+        if status.st_uid != os.getuid() or status.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            return False
+    return True
+
+
+def get_dbc_cache_key(dbc_files: List[Path]) -> str:
+    """
+    Get the key of the cached database of DBC files.
+
+    The key is the hash of the content of the DBC files in the given order and of the cantools version, so any change
+    of a DBC file or of cantools results in a new key.
+
+    Parameters
+    ------------
+    dbc_files : list
+        The list of paths to the DBC files.
+
+    Returns
+    -----------
+    str
+        The hexadecimal cache key.
+    """
+    key = hashlib.sha256(cantools.__version__.encode())
+    for dbc_file in dbc_files:
+        with open(dbc_file, 'rb') as f:
+            key.update(hashlib.sha256(f.read()).digest())
+    return key.hexdigest()
+
+
+def get_frame_ids(db: cantools.database.Database, signal_list: List[str]) -> set[int]:
+    """
+    Get the frame ids of all messages which carry at least one of the given signals.
+
+    Only the message which is actually used to decode a frame id is considered, i.e. if several DBC files define
+    the same frame id, the message of the last loaded DBC file.
+
+    Parameters
+    ------------
+    db : cantools.database.Database
+        The database object containing the loaded DBC files.
+    signal_list : List[str]
+        List of signals or signal selectors to decode, see resolve_signal_selectors.
+
+    Returns
+    -----------
+    set[int]
+        The frame ids of the messages which need to be decoded.
+    """
+    return set(resolve_signal_selectors(db, signal_list)[0])
+
+
+def resolve_signal_selectors(db: cantools.database.Database,
+                             signal_list: List[str]) -> tuple[dict[int, set[str]], list[str]]:
+    """
+    Resolve signal selectors to the signals of the messages of a database.
+
+    A selector is a signal name, a glob pattern like *WheelSpeed*, a regular expression with the prefix re: which
+    matches the whole signal name, or one of these prefixed with a message name or glob pattern and a dot, like
+    ESP_21.* for all signals of a message. Selectors are case-sensitive. A message selected by the message part of
+    a selector like ESP_*.*Speed* without a signal matching the signal part is not decoded, and the selector is only
+    reported as selecting no signal if this holds for all selected messages.
+
+    Parameters
+    ------------
+    db : cantools.database.Database
+        The database object containing the loaded DBC files.
+    signal_list : List[str]
+        List of signal selectors.
+
+    Returns
+    -----------
+    tuple[dict[int, set[str]], list[str]]
+        The names of the selected signals per frame id, only for frame ids with selected signals, and the selectors
+        which select no signal.
+    """
+    selectors = [(selector, *_compile_signal_selector(selector)) for selector in dict.fromkeys(signal_list)]
+    selected: dict[int, set[str]] = {}
+    matched = set()
+    for frame_id in {message.frame_id for message in db.messages}:
+        message = db.get_message_by_frame_id(frame_id)
+        for selector, message_pattern, signal_pattern in selectors:
+            if message_pattern is not None and not message_pattern.fullmatch(message.name):
+                continue
+            names = {signal.name for signal in message.signals if signal_pattern.fullmatch(signal.name)}
+            if names:
+                selected.setdefault(frame_id, set()).update(names)
+                matched.add(selector)
+    return selected, [selector for selector, _, _ in selectors if selector not in matched]
+
+
+def _compile_signal_selector(selector: str) -> tuple[re.Pattern | None, re.Pattern]:
+    """
+    Compile a signal selector to regular expressions of the message and signal names.
+
+    Parameters
+    ------------
+    selector : str
+        The signal selector, see resolve_signal_selectors.
+
+    Returns
+    -----------
+    tuple[re.Pattern | None, re.Pattern]
+        The pattern of the message name, None for all messages, and the pattern of the signal name.
+
+    Raises
+    -----------
+    ValueError
+        If the regular expression of the selector is invalid.
+    """
+    message_pattern = None
+    if not selector.startswith(SIGNAL_REGEX_PREFIX) and '.' in selector:
+        # Message and signal names of DBC files are C identifiers without dots, so the part before the first dot
+        # selects the message and the rest the signals of the message
+        message_selector, selector = selector.split('.', 1)
+        message_pattern = re.compile(fnmatch.translate(message_selector))
+    if not selector.startswith(SIGNAL_REGEX_PREFIX):
+        return message_pattern, re.compile(fnmatch.translate(selector))
+    try:
+        return message_pattern, re.compile(selector[len(SIGNAL_REGEX_PREFIX):])
+    except re.error as e:
+        raise ValueError(f"Invalid regular expression of signal selector {selector!r}: {e}") from None
+
+
 def validate_paths(blf_path: Path, dbc_path: list, export_path: Path) -> dict[str, str | bool]:
     """
     Validate the provided paths for the converter function.
@@ -1,9 +1,155 @@
 # -*- coding: utf-8 -*-
 import argparse
+import re
+from datetime import datetime
 from pathlib import Path
 
+from blf_converter.common.signal_writers import DEFAULT_ROW_GROUP_SIZE
+
+
+def parse_time(value: str) -> float | datetime:
+    """
+    Parse a limit of the time window.
+
+    Parameters
+    ----------
+    value : str
+        Seconds relative to the start of the measurement, or an ISO 8601 date and time, e.g. 2023-11-21T15:47:00.
+
+    Returns
+    -------
+    float | datetime
+        The relative seconds or the point in time.
+    """
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid time: {value!r}") from None
+
+
+def parse_channel_dbc(value: str) -> tuple[int, Path]:
+    """
+    Parse the DBC file of a CAN channel.
+
+    Parameters
+    ----------
+    value : str
+        The channel number as shown by the Vector tools, starting at 1, and the DBC file, e.g. 2=chassis.dbc.
+
+    Returns
+    -------
+    tuple[int, Path]
+        The channel number and the DBC file.
+    """
+    channel, separator, dbc_file = value.partition('=')
+    if not separator or not channel.strip().isdigit() or int(channel) < 1 or not dbc_file:
+        raise argparse.ArgumentTypeError(f"invalid channel DBC file: {value!r}, expected CHANNEL=FILE")
+    return int(channel), Path(dbc_file)
+
+
+def parse_memory_size(value: str) -> int:
+    """
+    Parse a memory size.
+
+    Parameters
+    ----------
+    value : str
+        The number of bytes, optionally with a binary unit K, M, G or T, e.g. 512M or 1.5G.
+
+    Returns
+    -------
+    int
+        The number of bytes.
+    """
+    match = re.fullmatch(r'\s*(\d+(?:\.\d*)?)\s*([KMGT]?)(?:I?B)?\s*', value, re.IGNORECASE)
+    size = int(float(match.group(1)) * 1024 ** ' KMGT'.index(match.group(2).upper() or ' ')) if match else 0
+    if size <= 0:
+        raise argparse.ArgumentTypeError(f"invalid memory size: {value!r}, expected e.g. 512M or 4G")
+    return size
+
+
+def parse_positive_int(value: str) -> int:
+    """
+    Parse a count of at least 1.
+
+    Parameters
+    ----------
+    value : str
+        The count, e.g. 4.
+
+    Returns
+    -------
+    int
+        The count.
+    """
+    try:
+        count = int(value)
+    except ValueError:
+        count = 0
+    if count < 1:
+        raise argparse.ArgumentTypeError(f"invalid positive integer: {value!r}")
+    return count
+
+
 parser = argparse.ArgumentParser(description='A simple command line tool to convert BLF file to a normal file which '
                                              'can be checked easily.')
 parser.add_argument('--blf-file', type=Path, help='The input BLF file path.')
-parser.add_argument('--dbc-file', type=Path, nargs='+', help='The input DBC file paths.')
-parser.add_argument('--signal-list', type=str, nargs='+', help='The name of signals which need to be extracted.')
+parser.add_argument('--batch', type=Path, default=None,
+                    help='A directory or quoted glob pattern of BLF files which are converted in one run instead of '
+                         '--blf-file, e.g. "logs/**/*.blf".')
+parser.add_argument('--dbc-file', type=Path, nargs='+',
+                    help='The input DBC file paths, used for all channels without own DBC files.')
+parser.add_argument('--channel-dbc', type=parse_channel_dbc, nargs='+', default=None, metavar='CHANNEL=FILE',
+                    help='The DBC file of a CAN channel of a multi-bus log, e.g. 1=powertrain.dbc 2=chassis.dbc. '
+                         'Channels start at 1 like in CANoe, frames of a channel are only decoded with its own DBC '
+                         'files.')
+parser.add_argument('--channel-config', type=Path, default=None,
+                    help='A settings file with the DBC files of the CAN channels in the [channel_dbc] section, '
+                         'overridden per channel by --channel-dbc.')
+parser.add_argument('--signal-list', type=str, nargs='+',
+                    help='The name of signals which need to be extracted. Glob patterns like "*WheelSpeed*", '
+                         'regular expressions with the prefix "re:" and message names with a dot like "ESP_21.*" '
+                         'select several signals.')
+parser.add_argument('--to-type', choices=['csv', 'mf4', 'resampled', 'parquet', 'feather'], default='csv',
+                    help='The output format, resampled exports all signals on a common time grid to a single CSV '
+                         'file (default: csv).')
+parser.add_argument('--resample-rate', type=float, default=100.0,
+                    help='The sample rate in Hz of the time grid of the resampled output (default: 100).')
+parser.add_argument('--resample-method', choices=['zoh', 'linear'], default='zoh',
+                    help='The resampling method of the resampled output, zero-order hold or linear interpolation '
+                         '(default: zoh).')
+parser.add_argument('--compression', choices=['zstd', 'lz4', 'none'], default='zstd',
+                    help='The compression codec of the parquet and feather output (default: zstd).')
+parser.add_argument('--row-group-size', type=parse_positive_int, default=DEFAULT_ROW_GROUP_SIZE,
+                    help='The number of samples per row group of the parquet output or record batch of the feather '
+                         f'output (default: {DEFAULT_ROW_GROUP_SIZE}).')
+parser.add_argument('--start', type=parse_time, default=None,
+                    help='The start of the decoded time window, in seconds relative to the start of the measurement '
+                         'or as ISO 8601 date and time (default: start of the file).')
+parser.add_argument('--end', type=parse_time, default=None,
+                    help='The end of the decoded time window, in seconds relative to the start of the measurement '
+                         'or as ISO 8601 date and time (default: end of the file).')
+parser.add_argument('--index', action='store_true',
+                    help='Build a sidecar index file next to the BLF file on the first run and use it to read only '
+                         'the log containers with requested messages.')
+parser.add_argument('--bulk', action='store_true',
+                    help='Parse the frames into arrays and decode the signals of every message in bulk with NumPy '
+                         'instead of frame by frame.')
+parser.add_argument('--workers', type=parse_positive_int, default=1,
+                    help='The number of worker processes used to decode the BLF file, or the number of files '
+                         'converted in parallel in batch mode (default: 1).')
+parser.add_argument('--max-memory', type=parse_memory_size, default=None,
+                    help='The memory budget of the decoded chunks, e.g. 512M or 4G. The chunk size and the number of '
+                         'chunks in flight are adapted to the memory per frame measured while decoding, shared by the '
+                         'files converted in parallel in batch mode (default: chunks of 150000 frames).')
+parser.add_argument('--float-precision', type=int, default=None,
+                    help='The number of decimals of float values in the exported CSV files (default: full precision).')
+parser.add_argument('--dbc-cache-dir', type=Path, default=None,
+                    help='The directory to cache the loaded DBC files, which speeds up repeated conversions with the '
+                         'same DBC files. The cache files are pickles, which can run code when loaded, so use a '
+                         'directory only you can write to. Cache files of other users or writable by them are '
+                         'ignored (default: no caching).')
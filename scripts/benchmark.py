@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+A module to benchmark the stages of the conversion pipeline with generated data
+"""
+import argparse
+import json
+import shutil
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from time import perf_counter
+
+from blf_converter.common.blf_frames import iter_frames
+from blf_converter.common.memory_budget import DEFAULT_CHUNK_SIZE
+from blf_converter.common.processing_chunks import iter_chunks, iter_processed_chunks, read_blf_file
+from blf_converter.common.signal_decoder import build_decoder
+from scripts.generate_benchmark_data import add_data_arguments, data_config, generate_benchmark_data
+
+# Share of the frames per second of the baseline by which a stage may be slower before it is reported as regression.
+DEFAULT_TOLERANCE = 0.2
+
+
+@dataclass
+class StageResult:
+    """
+    Duration and throughput of a stage of the conversion pipeline.
+
+    The peak RSS is the peak of the benchmark process up to the end of the stage, as the stages run one after the
+    other in the same process. The memory of the worker processes is not included.
+    """
+    name: str
+    seconds: float
+    frames: int
+    nbytes: int
+    peak_rss: int | None
+
+    @property
+    def frames_per_second(self) -> float:
+        """
+        Get the number of frames processed per second.
+
+        Returns
+        -------
+        float
+            The frames per second.
+        """
+        return self.frames / self.seconds if self.seconds > 0 else float('inf')
+
+    @property
+    def megabytes_per_second(self) -> float:
+        """
+        Get the number of processed megabytes per second.
+
+        Returns
+        -------
+        float
+            The megabytes per second, of the BLF file for reading and decoding and of the written files otherwise.
+        """
+        return self.nbytes / 1e6 / self.seconds if self.seconds > 0 else float('inf')
+
+
+def peak_rss() -> int | None:
+    """
+    Get the peak resident set size of the current process.
+
+    Returns
+    -------
+    int | None
+        The peak RSS in bytes, None if it is not available on the platform, e.g. on Windows.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _output_size(output: Path) -> int:
+    """
+    Get the size of a written file or of the files in a written directory.
+
+    Parameters
+    ----------
+    output : Path
+        The file or directory.
+
+    Returns
+    -------
+    int
+        The size of all files in bytes.
+    """
+    if output.is_file():
+        return output.stat().st_size
+    return sum(path.stat().st_size for path in output.rglob('*') if path.is_file())
+
+
+def run_benchmark(blf_file: Path, dbc_file: Path, signal_list: list[str], work_dir: Path,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE, bulk_decoding: bool = False,
+                  num_workers: int = 1) -> list[StageResult]:
+    """
+    Convert a BLF file with the streaming pipeline and time every stage.
+
+    Every stage runs the pipeline from the start of the file and includes the stages before: read only reads the
+    chunks, decode also decodes them with iter_processed_chunks, mf4 and csv also write them with read_blf_file, as
+    BlfConverter.decode does. No chunk is kept after it was processed, so the peak RSS is the one of a conversion.
+
+    Parameters
+    ----------
+    blf_file : Path
+        The BLF file.
+    dbc_file : Path
+        The DBC file.
+    signal_list : list[str]
+        The signals to decode, names or selectors.
+    work_dir : Path
+        The directory of the written files, removed before the benchmark.
+    chunk_size : int
+        The number of frames per chunk, by default DEFAULT_CHUNK_SIZE.
+    bulk_decoding : bool
+        Whether to parse the frames into arrays and decode them in bulk, by default False.
+    num_workers : int
+        The number of worker processes of the decode, mf4 and csv stages, by default 1.
+
+    Returns
+    -------
+    list[StageResult]
+        The results of the stages read, decode, mf4 and csv.
+    """
+    shutil.rmtree(work_dir, ignore_errors=True)
+    work_dir.mkdir(parents=True)
+    file_size = blf_file.stat().st_size
+    decoder = build_decoder([dbc_file], signal_list)
+
+    start = perf_counter()
+    if bulk_decoding:
+        frames = sum(len(chunk) for chunk in iter_frames(blf_file, chunk_size, frame_ids=decoder.frame_ids))
+    else:
+        frames = sum(len(chunk) for chunk in iter_chunks(blf_file, chunk_size, frame_ids=decoder.frame_ids))
+    stages = [StageResult('read', perf_counter() - start, frames, file_size, peak_rss())]
+
+    start = perf_counter()
+    for _ in iter_processed_chunks(blf_file, [dbc_file], chunk_size, signal_list, num_workers, decoder=decoder,
+                                   bulk_decoding=bulk_decoding):
+        pass
+    stages.append(StageResult('decode', perf_counter() - start, frames, file_size, peak_rss()))
+
+    for to_type, output in (('mf4', work_dir / 'benchmark.mf4'), ('csv', work_dir / 'csv')):
+        start = perf_counter()
+        read_blf_file(blf_file, [dbc_file], chunk_size, output, signal_list, num_workers, to_type=to_type,
+                      decoder=decoder, bulk_decoding=bulk_decoding)
+        stages.append(StageResult(to_type, perf_counter() - start, frames, _output_size(output), peak_rss()))
+    return stages
+
+
+def print_results(stages: list[StageResult]) -> None:
+    """
+    Print the results of the stages as table.
+
+    Parameters
+    ----------
+    stages : list[StageResult]
+        The results of the stages.
+    """
+    print(f"{'stage':<8} {'seconds':>9} {'frames/s':>12} {'MB/s':>9} {'peak RSS MB':>12}")
+    for stage in stages:
+        rss = f"{stage.peak_rss / 1e6:.1f}" if stage.peak_rss is not None else 'n/a'
+        print(f"{stage.name:<8} {stage.seconds:>9.3f} {stage.frames_per_second:>12,.0f} "
+              f"{stage.megabytes_per_second:>9.1f} {rss:>12}")
+
+
+def find_regressions(stages: list[StageResult], baseline: list[dict],
+                     tolerance: float = DEFAULT_TOLERANCE) -> list[str]:
+    """
+    Compare the throughput of the stages with a baseline.
+
+    Parameters
+    ----------
+    stages : list[StageResult]
+        The results of the stages.
+    baseline : list[dict]
+        The results of the stages of an earlier run, as written by save_results.
+    tolerance : float
+        The share of the baseline throughput by which a stage may be slower, by default DEFAULT_TOLERANCE.
+
+    Returns
+    -------
+    list[str]
+        A description of every stage which is slower than the baseline.
+    """
+    baseline_stages = {entry['name']: StageResult(**entry) for entry in baseline}
+    regressions = []
+    for stage in stages:
+        reference = baseline_stages.get(stage.name)
+        if reference is not None and stage.frames_per_second < reference.frames_per_second * (1 - tolerance):
+            regressions.append(f"{stage.name}: {stage.frames_per_second:,.0f} frames/s, baseline "
+                               f"{reference.frames_per_second:,.0f} frames/s")
+    return regressions
+
+
+def save_results(stages: list[StageResult], json_file: Path) -> None:
+    """
+    Save the results of the stages to a JSON file, e.g. as baseline of later runs.
+
+    Parameters
+    ----------
+    stages : list[StageResult]
+        The results of the stages.
+    json_file : Path
+        The output JSON file.
+    """
+    json_file.parent.mkdir(parents=True, exist_ok=True)
+    json_file.write_text(json.dumps([asdict(stage) for stage in stages], indent=2), encoding='utf-8')
+
+
+def main() -> None:
+    """This is the main function to benchmark the conversion pipeline."""
+    parser = argparse.ArgumentParser(description='Benchmark the stages of the conversion pipeline with a generated '
+                                                 'BLF file and DBC file.')
+    add_data_arguments(parser)
+    parser.add_argument('--signal-list', type=str, nargs='+', default=['*'],
+                        help='The signals to decode, names or selectors like --signal-list of the converter '
+                             '(default: all signals).')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'The number of frames per chunk (default: {DEFAULT_CHUNK_SIZE}).')
+    parser.add_argument('--bulk', action='store_true', help='Decode the frames in bulk with NumPy.')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='The number of worker processes which decode the chunks (default: 1).')
+    parser.add_argument('--json', type=Path, default=None, help='Save the results to a JSON file.')
+    parser.add_argument('--baseline', type=Path, default=None,
+                        help='A JSON file of an earlier run, fails if a stage is slower by more than --tolerance.')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='The share by which a stage may be slower than the baseline '
+                             f'(default: {DEFAULT_TOLERANCE}).')
+    args = parser.parse_args()
+
+    blf_file, dbc_file, _ = generate_benchmark_data(data_config(args), args.data_dir)
+    print(f"[BENCHMARK] {blf_file.name}, {blf_file.stat().st_size / 1e6:.1f} MB, "
+          f"{'bulk' if args.bulk else 'message'} decoding, {args.workers} worker(s)")
+    stages = run_benchmark(blf_file, dbc_file, args.signal_list, args.data_dir / 'output', args.chunk_size, args.bulk,
+                           args.workers)
+    print_results(stages)
+    if args.json is not None:
+        save_results(stages, args.json)
+    if args.baseline is not None:
+        regressions = find_regressions(stages, json.loads(args.baseline.read_text(encoding='utf-8')), args.tolerance)
+        for regression in regressions:
+            print(f"[BENCHMARK] Regression of {regression}")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+A module to generate a synthetic BLF file and the matching DBC file for the benchmark
+"""
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+
+import can
+import numpy as np
+from cantools.database import Database, Message, Signal
+from cantools.database.conversion import LinearConversion
+
+# First arbitration id of the generated messages.
+FIRST_FRAME_ID = 0x100
+# Length in bits of every generated signal, a classic message carries 4 signals and a CAN FD message 32.
+SIGNAL_LENGTH = 16
+# Number of frames whose data bytes are generated at once.
+GENERATED_BLOCK_SIZE = 10000
+# Start of the generated measurement as POSIX timestamp.
+START_TIMESTAMP = 1700000000.0
+
+
+@dataclass
+class BenchmarkData:
+    """
+    Configuration of the generated benchmark data.
+
+    The frames cycle through the arbitration ids, the first fd_ratio of the ids are CAN FD messages with 64 data
+    bytes. The data bytes are random, but reproducible with the seed.
+    """
+    frames: int = 1000000
+    ids: int = 50
+    fd_ratio: float = 0.2
+    compression_level: int = -1
+    cycle_time: float = 0.0001
+    seed: int = 0
+
+    @property
+    def fd_ids(self) -> int:
+        """
+        Get the number of arbitration ids of CAN FD messages.
+
+        Returns
+        -------
+        int
+            The number of CAN FD ids.
+        """
+        return round(self.ids * self.fd_ratio)
+
+    @property
+    def stem(self) -> str:
+        """
+        Get the file name of the generated files without suffix.
+
+        Returns
+        -------
+        str
+            The file name, containing the configuration.
+        """
+        return (f"benchmark_{self.frames}f_{self.ids}id_{round(self.fd_ratio * 100)}fd_"
+                f"c{self.compression_level}_s{self.seed}")
+
+
+def _message_name(index: int) -> str:
+    """
+    Get the name of a generated message.
+
+    Parameters
+    ----------
+    index : int
+        The index of the arbitration id of the message.
+
+    Returns
+    -------
+    str
+        The message name.
+    """
+    return f"Bench_{FIRST_FRAME_ID + index:03X}"
+
+
+def generate_dbc(config: BenchmarkData, dbc_file: Path) -> list[str]:
+    """
+    Write a DBC file with a message for every arbitration id of the benchmark data.
+
+    Every message is filled with little endian signals of SIGNAL_LENGTH bits, alternating unsigned and signed with a
+    linear conversion.
+
+    Parameters
+    ----------
+    config : BenchmarkData
+        The configuration of the benchmark data.
+    dbc_file : Path
+        The output DBC file.
+
+    Returns
+    -------
+    list[str]
+        The names of all signals.
+    """
+    messages = []
+    for index in range(config.ids):
+        is_fd = index < config.fd_ids
+        length = 64 if is_fd else 8
+        name = _message_name(index)
+        signals = [Signal(name=f"{name}_Sig{position}", start=position * SIGNAL_LENGTH, length=SIGNAL_LENGTH,
+                          byte_order='little_endian', is_signed=position % 2 == 1,
+                          conversion=LinearConversion(scale=0.01 * (position + 1), offset=-position, is_float=False))
+                   for position in range(length * 8 // SIGNAL_LENGTH)]
+        messages.append(Message(frame_id=FIRST_FRAME_ID + index, name=name, length=length, signals=signals,
+                                is_fd=is_fd))
+    dbc_file.write_text(Database(messages=messages).as_dbc_string(), encoding='utf-8')
+    return [signal.name for message in messages for signal in message.signals]
+
+
+def generate_blf(config: BenchmarkData, blf_file: Path) -> None:
+    """
+    Write a BLF file with the frames of the benchmark data.
+
+    Parameters
+    ----------
+    config : BenchmarkData
+        The configuration of the benchmark data.
+    blf_file : Path
+        The output BLF file.
+    """
+    rng = np.random.default_rng(config.seed)
+    writer = can.BLFWriter(blf_file, compression_level=config.compression_level)
+    try:
+        for block_start in range(0, config.frames, GENERATED_BLOCK_SIZE):
+            # The data bytes are generated block-wise, so the generator does not raise the peak RSS of the benchmark
+            payload = rng.integers(0, 256, size=(min(GENERATED_BLOCK_SIZE, config.frames - block_start), 64),
+                                   dtype=np.uint8)
+            for i, data in enumerate(payload, block_start):
+                index = i % config.ids
+                is_fd = index < config.fd_ids
+                writer.on_message_received(can.Message(timestamp=START_TIMESTAMP + i * config.cycle_time,
+                                                       arbitration_id=FIRST_FRAME_ID + index, is_extended_id=False,
+                                                       is_fd=is_fd, channel=0,
+                                                       data=data[:64 if is_fd else 8].tobytes()))
+    finally:
+        writer.stop()
+
+
+def generate_benchmark_data(config: BenchmarkData, output_dir: Path) -> tuple[Path, Path, list[str]]:
+    """
+    Generate the BLF and DBC files of the benchmark data, existing files of the same configuration are reused.
+
+    Parameters
+    ----------
+    config : BenchmarkData
+        The configuration of the benchmark data.
+    output_dir : Path
+        The directory of the generated files.
+
+    Returns
+    -------
+    tuple[Path, Path, list[str]]
+        The BLF file, the DBC file and the names of all signals.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    blf_file = output_dir / f"{config.stem}.blf"
+    dbc_file = output_dir / f"{config.stem}.dbc"
+    signal_names = generate_dbc(config, dbc_file)
+    if not blf_file.is_file():
+        print(f"[BENCHMARK] Generate {blf_file.name}")
+        generate_blf(config, blf_file.with_suffix('.tmp'))
+        blf_file.with_suffix('.tmp').replace(blf_file)
+    return blf_file, dbc_file, signal_names
+
+
+def add_data_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the options of the benchmark data to a command line parser.
+
+    Parameters
+    ----------
+    parser : argparse.ArgumentParser
+        The command line parser.
+    """
+    defaults = BenchmarkData()
+    parser.add_argument('--frames', type=int, default=defaults.frames,
+                        help=f'The number of frames of the BLF file (default: {defaults.frames}).')
+    parser.add_argument('--ids', type=int, default=defaults.ids,
+                        help=f'The number of arbitration ids, each with its own message (default: {defaults.ids}).')
+    parser.add_argument('--fd-ratio', type=float, default=defaults.fd_ratio,
+                        help=f'The share of the ids which are CAN FD messages (default: {defaults.fd_ratio}).')
+    parser.add_argument('--compression-level', type=int, default=defaults.compression_level,
+                        help='The zlib compression level of the log containers, 0 writes uncompressed log containers '
+                             f'(default: {defaults.compression_level}).')
+    parser.add_argument('--seed', type=int, default=defaults.seed,
+                        help=f'The seed of the random data bytes (default: {defaults.seed}).')
+    parser.add_argument('--data-dir', type=Path, default=Path('test_results/benchmark'),
+                        help='The directory of the generated files (default: test_results/benchmark).')
+
+
+def data_config(args: argparse.Namespace) -> BenchmarkData:
+    """
+    Get the configuration of the benchmark data from the parsed command line options.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed options of add_data_arguments.
+
+    Returns
+    -------
+    BenchmarkData
+        The configuration of the benchmark data.
+    """
+    return BenchmarkData(frames=args.frames, ids=args.ids, fd_ratio=args.fd_ratio,
+                         compression_level=args.compression_level, seed=args.seed)
+
+
+def main() -> None:
+    """This is the main function to generate the benchmark data."""
+    parser = argparse.ArgumentParser(description='Generate a synthetic BLF file and the matching DBC file.')
+    add_data_arguments(parser)
+    args = parser.parse_args()
+    blf_file, dbc_file, signal_names = generate_benchmark_data(data_config(args), args.data_dir)
+    print(f"[BENCHMARK] {blf_file} ({blf_file.stat().st_size / 1e6:.1f} MB), {dbc_file} ({len(signal_names)} signals)")
+
+
+if __name__ == '__main__':
+    main()
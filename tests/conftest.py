@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+from collections.abc import Callable
+from pathlib import Path
+
+import can
+
+# Timestamp of the first message of the generated BLF files.
+START_TIMESTAMP = 1700000000.0
+# Default size of the log containers of can.BLFWriter.
+MAX_CONTAINER_SIZE = 128 * 1024
+
+
+def robot_frame(i: int, is_fd: bool) -> dict:
+    """
+    Get the arbitration id and data of a message of the ABDRobot DBC file.
+
+    Parameters
+    ----------
+    i : int
+        Number of the message.
+    is_fd : bool
+        Whether the message is a CAN FD message.
+
+    Returns
+    -------
+    dict
+        Keyword arguments of can.Message.
+    """
+    return {'arbitration_id': 0x640 + i % 21, 'data': bytes([i % 256, 0, i % 7, 1, 2, 3, 4, 5])}
+
+
+def write_blf_file(blf_file: Path, count: int, step: float = 0.01, max_container_size: int = MAX_CONTAINER_SIZE,
+                   compression_level: int = -1, fd_every: int = 0, error_every: int = 0,
+                   frame: Callable[[int, bool], dict] = robot_frame) -> Path:
+    """
+    Write a synthetic BLF file with messages in equal time steps from START_TIMESTAMP.
+
+    Parameters
+    ----------
+    blf_file : Path
+        Path of the BLF file, missing parent directories are created.
+    count : int
+        Number of messages.
+    step : float
+        Time between two messages in seconds, by default 0.01.
+    max_container_size : int
+        Maximum size of the uncompressed log containers, by default MAX_CONTAINER_SIZE.
+    compression_level : int
+        The zlib compression level of the log containers, 0 writes uncompressed log containers, by default -1.
+    fd_every : int
+        Every fd_every-th message, starting with the first, is a CAN FD message, by default 0 for none.
+    error_every : int
+        Every error_every-th message, ending with the last of each period, is an error frame, by default 0 for none.
+    frame : Callable[[int, bool], dict]
+        Function of the message number and the CAN FD flag, which returns further keyword arguments of can.Message,
+        at least arbitration_id and data, by default robot_frame.
+
+    Returns
+    -------
+    Path
+        Path to the generated BLF file.
+    """
+    blf_file.parent.mkdir(parents=True, exist_ok=True)
+    writer = can.BLFWriter(blf_file, compression_level=compression_level, max_container_size=max_container_size)
+    for i in range(count):
+        is_fd = fd_every > 0 and i % fd_every == 0
+        is_error_frame = error_every > 0 and i % error_every == error_every - 1
+        writer.on_message_received(can.Message(**{'timestamp': START_TIMESTAMP + i * step, 'is_extended_id': False,
+                                                  'is_fd': is_fd, 'is_error_frame': is_error_frame,
+                                                  **frame(i, is_fd)}))
+    writer.stop()
+    return blf_file
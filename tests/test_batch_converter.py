@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from blf_converter.common.batch_converter import BatchConverter, BatchResult, find_blf_files
+from tests.conftest import write_blf_file
+
+DBC_FILES = [Path('tests/testdata/ABDRobot_Bus1_export_Crossing.DBC')]
+SIGNALS = ['MpDistanceTravelledWheelbaseMidP', 'MpYawAngle']
+
+
+@pytest.fixture(scope='function')
+def blf_directory(tmp_path: Path) -> Path:
+    """
+    A directory with two valid BLF files, one invalid BLF file and a BLF file in a sub directory.
+
+    Returns
+    -------
+    Path
+        Path to the directory.
+    """
+    write_blf_file(tmp_path / 'a.blf', 100)
+    write_blf_file(tmp_path / 'b.BLF', 300)
+    write_blf_file(tmp_path / 'sub' / 'c.blf', 50)
+    (tmp_path / 'broken.blf').write_bytes(b'no blf')
+    (tmp_path / 'notes.txt').write_text('no blf')
+    return tmp_path
+
+
+class TestFindBlfFiles:
+    """
+    UTs for the find_blf_files function
+    """
+    def test_find_blf_files_in_directory(self, blf_directory: Path) -> None:
+        """
+        Test that the BLF files of a directory are found without its sub directories.
+        """
+        assert find_blf_files(blf_directory) == [blf_directory / 'a.blf', blf_directory / 'b.BLF',
+                                                 blf_directory / 'broken.blf']
+
+    def test_find_blf_files_with_glob(self, blf_directory: Path) -> None:
+        """
+        Test that a recursive glob pattern finds the BLF files of sub directories.
+        """
+        assert find_blf_files(blf_directory / '**' / '*.blf') == [blf_directory / 'a.blf',
+                                                                  blf_directory / 'broken.blf',
+                                                                  blf_directory / 'sub' / 'c.blf']
+
+    def test_find_blf_files_without_match(self, tmp_path: Path) -> None:
+        """
+        Test that no file is found for a pattern without match.
+        """
+        assert find_blf_files(tmp_path / '*.blf') == []
+
+
+class TestBatchConverter:
+    """
+    UTs for the BatchConverter class
+    """
+    @pytest.mark.parametrize('num_workers', [1, 2])
+    def test_decode(self, blf_directory: Path, num_workers: int) -> None:
+        """
+        Test that all valid files are converted and the invalid file is reported.
+        """
+        blf_files = find_blf_files(blf_directory)
+        results = BatchConverter(blf_files, DBC_FILES, SIGNALS, num_workers).decode(to_type='csv')
+
+        assert [result.blf_file for result in results] == blf_files
+        assert [result.success for result in results] == [True, True, False]
+        assert results[2].error is not None
+        for result in results[:2]:
+            assert isinstance(result.output, dict)
+            assert set(result.output) == set(SIGNALS)
+            assert result.output['MpYawAngle'].is_file()
+            assert result.size == result.blf_file.stat().st_size
+        csv_lines = (blf_directory / 'b' / 'csv' / 'MpYawAngle.csv').read_text().splitlines()
+        assert len(csv_lines) == 1 + 300 // 21 + 1
+
+    def test_single_file_decodes_chunks_in_parallel(self, blf_directory: Path) -> None:
+        """
+        Test that the workers of a batch with a single file decode the chunks of the file.
+        """
+        with patch('blf_converter.common.batch_converter.BlfConverter', autospec=True) as converter:
+            BatchConverter([blf_directory / 'a.blf'], DBC_FILES, SIGNALS, num_workers=3).decode(to_type='csv')
+
+        assert converter.call_args.kwargs['num_workers'] == 3
+
+    def test_decode_loads_dbc_files_once(self, blf_directory: Path) -> None:
+        """
+        Test that the DBC files are loaded only once for all files of the batch.
+        """
+        blf_files = find_blf_files(blf_directory)
+        with patch('cantools.database.Database.add_dbc_file', autospec=True,
+                   side_effect=lambda db, path: db.add_dbc_string(Path(path).read_text(encoding='cp1252'))) as load:
+            BatchConverter(blf_files, DBC_FILES, SIGNALS).decode(to_type='mf4')
+        assert load.call_count == len(DBC_FILES)
+        assert (blf_directory / 'a' / 'mf4' / 'a.mf4').is_file()
+
+
+class TestBatchResult:
+    """
+    UTs for the BatchResult class
+    """
+    def test_throughput(self) -> None:
+        """
+        Test the throughput and the description of a successful conversion.
+        """
+        result = BatchResult(blf_file=Path('a.blf'), size=4_000_000, seconds=2.0)
+        assert result.success
+        assert result.throughput == 2.0
+        assert str(result) == 'a.blf: 4.0 MB in 2.00 s (2.0 MB/s)'
+
+    def test_failure(self) -> None:
+        """
+        Test the description of a failed conversion.
+        """
+        result = BatchResult(blf_file=Path('a.blf'), size=10, seconds=0.5, error='ValueError: Signals are empty.')
+        assert not result.success
+        assert str(result) == 'a.blf: FAILED after 0.50 s: ValueError: Signals are empty.'
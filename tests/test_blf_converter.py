@@ -1,9 +1,12 @@
 # -*- coding: utf-8 -*-
 from pathlib import Path
+from unittest.mock import patch
 
+import pyarrow.parquet as pq
 import pytest
 
 from blf_converter.common.blf_converter import BlfConverter
+from tests.conftest import write_blf_file
 
 
 @pytest.fixture(scope='function')
@@ -223,3 +226,39 @@ class TestDecodeBlf2csv:
             signal_mapping = data_with_invalid_signal_list["signal_mapping"]
             blf_converter = BlfConverter(blf, dbc, output_path, signal_list, signal_mapping)
             blf_converter.decode_blf2csv()
+
+
+class TestDecodeBlf2Arrow:
+    """
+    UTs for the Parquet and Feather export of the BlfConverter class
+    """
+    def test_decode_with_compression(self, tmp_path: Path) -> None:
+        """
+        Test that the Parquet files are written with the given compression codec.
+        """
+        blf_file = write_blf_file(tmp_path / 'log.blf', 210)
+        blf_converter = BlfConverter(blf_file, [Path('tests/testdata/ABDRobot_Bus1_export_Crossing.DBC')],
+                                     ['MpYawAngle'], compression='lz4')
+
+        output = blf_converter.decode('parquet')
+
+        assert isinstance(output, dict)
+        metadata = pq.ParquetFile(output['MpYawAngle']).metadata
+        assert metadata.num_rows == 10
+        assert metadata.row_group(0).column(1).compression == 'LZ4'
+
+    @pytest.mark.parametrize('to_type', ['parquet', 'feather'])
+    def test_decode_passes_writer_options(self, tmp_path: Path, to_type: str) -> None:
+        """
+        Test that the compression and the row group size are passed to the writer.
+        """
+        blf_file = write_blf_file(tmp_path / 'log.blf', 21)
+        blf_converter = BlfConverter(blf_file, [Path('tests/testdata/ABDRobot_Bus1_export_Crossing.DBC')],
+                                     ['MpYawAngle'], compression=None, row_group_size=1000)
+
+        with patch('blf_converter.common.blf_converter.read_blf_file') as read_blf_file:
+            blf_converter.decode(to_type)
+
+        assert read_blf_file.call_args.kwargs['to_type'] == to_type
+        assert read_blf_file.call_args.kwargs['compression'] is None
+        assert read_blf_file.call_args.kwargs['row_group_size'] == 1000
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+from pathlib import Path
+
+import can
+import numpy as np
+import pytest
+from can.io.blf import BLFParseError
+
+from blf_converter.common.blf_frames import FRAME_DTYPE, IN_PLACE_PARSE_SIZE, iter_frames, parse_frames
+from blf_converter.common.blf_reader import SeekableBLFReader
+from tests.conftest import START_TIMESTAMP, write_blf_file
+
+
+@pytest.fixture(scope='module')
+def blf_file(tmp_path_factory) -> Path:
+    """
+    A BLF file with 600 classic, CAN FD and error frames of different lengths and channels in small log containers.
+
+    Returns
+    -------
+    Path
+        Path to the generated BLF file.
+    """
+    def frame(i: int, is_fd: bool) -> dict:
+        """Get an extended id on every second message and a data length depending on the frame type."""
+        length = [0, 12, 64][i % 9 // 3] if is_fd else i % 9
+        return {'arbitration_id': 0x18FF0000 + i, 'is_extended_id': i % 2 == 0, 'channel': i % 4,
+                'data': bytes([i % 256] * length)}
+
+    return write_blf_file(tmp_path_factory.mktemp('blf') / 'frames.blf', 600, max_container_size=500, fd_every=3,
+                          error_every=50, frame=frame)
+
+
+@pytest.fixture(scope='module')
+def uncompressed_blf_file(tmp_path_factory) -> Path:
+    """
+    An uncompressed BLF file with 20000 classic and CAN FD frames in log containers larger than IN_PLACE_PARSE_SIZE.
+
+    Returns
+    -------
+    Path
+        Path to the generated BLF file.
+    """
+    return write_blf_file(tmp_path_factory.mktemp('blf') / 'uncompressed.blf', 20000, step=0.001,
+                          max_container_size=IN_PLACE_PARSE_SIZE + 1000, compression_level=0, fd_every=7,
+                          frame=lambda i, is_fd: {'arbitration_id': i % 0x800, 'channel': i % 2,
+                                                  'data': bytes([i % 256] * (i % 9))})
+
+
+def assert_frames_equal_messages(frames: np.ndarray, messages: list) -> None:
+    """
+    Assert that the frames have the values of the messages read by can.BLFReader.
+    """
+    assert len(frames) == len(messages)
+    for frame, msg in zip(frames, messages):
+        assert frame['timestamp'] == msg.timestamp
+        assert frame['channel'] == msg.channel
+        assert frame['arbitration_id'] == msg.arbitration_id
+        assert frame['is_extended_id'] == msg.is_extended_id
+        assert frame['is_fd'] == msg.is_fd
+        assert bytes(frame['data'][:frame['dlc']]) == bytes(msg.data)
+        assert not frame['data'][frame['dlc']:].any()
+
+
+class TestParseFrames:
+    """
+    UTs for the parse_frames function
+    """
+    def test_parse_frames(self, blf_file: Path) -> None:
+        """
+        Test that the frames of a log container have the values of the messages, without error frames.
+        """
+        reader = SeekableBLFReader(blf_file)
+        data = reader.read_container(reader.container_offsets()[0])
+        frames, end = parse_frames(data, reader.start_timestamp)
+        reader.stop()
+
+        messages = [msg for msg in can.BLFReader(blf_file) if not msg.is_error_frame][:len(frames)]
+        assert frames.dtype == FRAME_DTYPE
+        assert len(frames) > 0
+        assert 0 < end <= len(data)
+        assert_frames_equal_messages(frames, messages)
+
+    def test_parse_frames_without_objects(self) -> None:
+        """
+        Test that data without complete object gives no frames.
+        """
+        frames, end = parse_frames(b'')
+        assert len(frames) == 0 and end == 0
+
+        frames, end = parse_frames(b'LOBJ' + b'\x00' * 8)
+        assert len(frames) == 0 and end == 0
+
+    def test_parse_frames_with_invalid_object(self) -> None:
+        """
+        Test that an object with an invalid size raises a BLFParseError.
+        """
+        with pytest.raises(BLFParseError):
+            parse_frames(b'LOBJ' + b'\x00' * 12)
+
+
+class TestIterFrames:
+    """
+    UTs for the iter_frames function
+    """
+    @pytest.mark.parametrize('use_index', [False, True])
+    def test_iter_frames(self, blf_file: Path, use_index: bool) -> None:
+        """
+        Test that all frames of the file are read in chunks.
+        """
+        chunks = list(iter_frames(blf_file, 100, use_index=use_index))
+
+        assert [len(chunk) for chunk in chunks] == [100] * 5 + [88]
+        assert_frames_equal_messages(np.concatenate(chunks),
+                                     [msg for msg in can.BLFReader(blf_file) if not msg.is_error_frame])
+
+    @pytest.mark.parametrize('use_index', [False, True])
+    def test_iter_frames_time_window(self, blf_file: Path, use_index: bool) -> None:
+        """
+        Test that exactly the frames of the window are read.
+        """
+        frames = np.concatenate(list(iter_frames(blf_file, 1000, 1.005, 3.995, use_index=use_index)))
+
+        expected = [msg for msg in can.BLFReader(blf_file) if not msg.is_error_frame
+                    and START_TIMESTAMP + 1.005 <= msg.timestamp <= START_TIMESTAMP + 3.995]
+        assert_frames_equal_messages(frames, expected)
+        assert frames['data'][0, 0] == 101 and frames['data'][-1, 0] == 398 % 256
+
+    def test_iter_frames_in_place(self, uncompressed_blf_file: Path) -> None:
+        """
+        Test that the frames of large uncompressed log containers, which are parsed in place, are all read.
+        """
+        reader = SeekableBLFReader(uncompressed_blf_file)
+        data = reader.container_buffer(reader.container_offsets()[0])
+        assert isinstance(data, memoryview) and len(data) >= IN_PLACE_PARSE_SIZE
+        data.release()
+        reader.stop()
+
+        frames = np.concatenate(list(iter_frames(uncompressed_blf_file, 3000)))
+        assert_frames_equal_messages(frames, list(can.BLFReader(uncompressed_blf_file)))
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+import os
+from pathlib import Path
+
+import can
+import numpy as np
+import pytest
+
+from blf_converter.common.blf_index import BlfIndex, build_index, get_index_path, load_or_build_index
+from blf_converter.common.blf_reader import SeekableBLFReader
+from blf_converter.common.processing_chunks import iter_chunks
+from tests.conftest import START_TIMESTAMP, write_blf_file
+
+
+@pytest.fixture(scope='function')
+def blf_file(tmp_path: Path) -> Path:
+    """
+    A BLF file with 1000 messages in 1 ms steps, where every 100th message has the id 0x700 and every 7th message
+    is a CAN FD message spanning several of the small log containers.
+
+    Returns
+    -------
+    Path
+        Path to the generated BLF file.
+    """
+    return write_blf_file(tmp_path / 'indexed.blf', 1000, step=0.001, max_container_size=300, fd_every=7,
+                          frame=lambda i, is_fd: {'arbitration_id': 0x700 if i % 100 == 0 else 0x100 + i % 10,
+                                                  'data': bytes([i % 256, i // 256] * (32 if is_fd else 4))})
+
+
+def message_numbers(messages) -> list[int]:
+    """
+    Get the numbers of the generated messages.
+
+    Returns
+    -------
+    list[int]
+        The number of every message.
+    """
+    return [msg.data[0] + msg.data[1] * 256 for msg in messages]
+
+
+class TestBuildIndex:
+    """
+    UTs for the build_index function
+    """
+    def test_build_index(self, blf_file: Path) -> None:
+        """
+        Test that all log containers are indexed with their time range and ids.
+        """
+        index = build_index(blf_file)
+        reader = SeekableBLFReader(blf_file)
+
+        assert index.offsets.tolist() == reader.container_offsets()
+        assert np.nanmin(index.start_times) == pytest.approx(START_TIMESTAMP)
+        assert np.nanmax(index.end_times) == pytest.approx(START_TIMESTAMP + 0.999)
+        assert set(index.ids.tolist()) == {0x700, *range(0x100, 0x10A)}
+        assert np.all(np.diff(index.id_pointers) > 0)
+        assert 0x700 in index.container_ids(0)
+
+    def test_select(self, blf_file: Path) -> None:
+        """
+        Test that only the log containers with messages of the window and the ids are selected.
+        """
+        index = build_index(blf_file)
+
+        assert index.select().tolist() == list(range(len(index)))
+        assert 0 < len(index.select(frame_ids={0x700})) < len(index) // 5
+        assert len(index.select(frame_ids={0x123})) == 0
+        window = index.select(START_TIMESTAMP + 0.5, START_TIMESTAMP + 0.6)
+        assert np.all(index.end_times[window] >= START_TIMESTAMP + 0.5)
+        assert np.all(index.start_times[window] <= START_TIMESTAMP + 0.6)
+
+    @pytest.mark.parametrize('start, end, frame_ids', [(None, None, None), (None, None, {0x700}), (0.2, 0.45, None),
+                                                       (0.1, 0.8, {0x700, 0x103}), (0.95, None, {0x100})])
+    def test_read_indexed(self, blf_file: Path, start, end, frame_ids) -> None:
+        """
+        Test that reading the selected log containers yields all requested messages.
+        """
+        index = build_index(blf_file)
+        messages = [msg for msg in SeekableBLFReader(blf_file).iter_window(start, end, index, frame_ids)
+                    if frame_ids is None or msg.arbitration_id in frame_ids]
+        expected = [msg for msg in can.BLFReader(blf_file)
+                    if (start is None or msg.timestamp >= START_TIMESTAMP + start - 1e-6)
+                    and (end is None or msg.timestamp <= START_TIMESTAMP + end + 1e-6)
+                    and (frame_ids is None or msg.arbitration_id in frame_ids)]
+        assert message_numbers(messages) == message_numbers(expected)
+
+
+class TestLoadOrBuildIndex:
+    """
+    UTs for the load_or_build_index function
+    """
+    def test_index_is_saved_and_reused(self, blf_file: Path, monkeypatch) -> None:
+        """
+        Test that the index is saved next to the BLF file on the first use and loaded afterward.
+        """
+        index = load_or_build_index(blf_file)
+        assert get_index_path(blf_file).is_file()
+
+        monkeypatch.setattr('blf_converter.common.blf_index.build_index', lambda path: pytest.fail("rebuilt"))
+        loaded = load_or_build_index(blf_file)
+        assert loaded.offsets.tolist() == index.offsets.tolist()
+        assert loaded.ids.tolist() == index.ids.tolist()
+
+    def test_index_is_rebuilt_for_modified_file(self, blf_file: Path) -> None:
+        """
+        Test that the index of a modified BLF file is not used.
+        """
+        load_or_build_index(blf_file)
+        stat = blf_file.stat()
+        os.utime(blf_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert BlfIndex.load(get_index_path(blf_file), blf_file) is None
+        assert len(load_or_build_index(blf_file)) > 0
+        assert BlfIndex.load(get_index_path(blf_file), blf_file) is not None
+
+    def test_invalid_index_file(self, blf_file: Path) -> None:
+        """
+        Test that an invalid index file is replaced.
+        """
+        get_index_path(blf_file).write_bytes(b'invalid')
+
+        assert len(load_or_build_index(blf_file)) == len(build_index(blf_file))
+
+
+class TestIterChunksWithIndex:
+    """
+    UTs for the iter_chunks function with the index
+    """
+    def test_iter_chunks_with_index(self, blf_file: Path) -> None:
+        """
+        Test that the chunks contain the messages of the requested ids, read from the selected containers only.
+        """
+        chunks = list(iter_chunks(blf_file, 50, frame_ids={0x700}, use_index=True))
+        messages = [msg for chunk in chunks for msg in chunk]
+
+        assert get_index_path(blf_file).is_file()
+        assert [number for number, msg in zip(message_numbers(messages), messages)
+                if msg.arbitration_id == 0x700] == list(range(0, 1000, 100))
+        assert len(messages) < 500
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+import mmap
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+import can
+import pytest
+
+from blf_converter.common.blf_reader import SeekableBLFReader, find_first_object, resolve_time
+from tests.conftest import START_TIMESTAMP, write_blf_file
+
+
+@pytest.fixture(scope='module')
+def blf_file(tmp_path_factory) -> Path:
+    """
+    A BLF file with 2000 messages in 10 ms steps and small log containers, so objects span containers.
+
+    Returns
+    -------
+    Path
+        Path to the generated BLF file.
+    """
+    return write_blf_file(tmp_path_factory.mktemp('blf') / 'window.blf', 2000, max_container_size=1000,
+                          frame=lambda i, is_fd: {'arbitration_id': 0x100 + i % 5,
+                                                  'data': bytes([i % 256, i // 256, 0, 0])})
+
+
+@pytest.fixture(scope='module')
+def uncompressed_blf_file(tmp_path_factory) -> Path:
+    """
+    The messages of blf_file in uncompressed log containers.
+
+    Returns
+    -------
+    Path
+        Path to the generated BLF file.
+    """
+    return write_blf_file(tmp_path_factory.mktemp('blf') / 'uncompressed.blf', 2000, max_container_size=1000,
+                          compression_level=0, frame=lambda i, is_fd: {'arbitration_id': 0x100 + i % 5,
+                                                                       'data': bytes([i % 256, i // 256, 0, 0])})
+
+
+def read_window(blf_file: Path, start=None, end=None) -> list[can.Message]:
+    """
+    Read the messages of a time window.
+
+    Returns
+    -------
+    list[can.Message]
+        The messages of the window.
+    """
+    with open(blf_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+        return list(SeekableBLFReader(mapped_file).iter_window(start, end))
+
+
+class TestFindFirstObject:
+    """
+    UTs for the find_first_object function
+    """
+    def test_find_first_object(self, blf_file: Path) -> None:
+        """
+        Test that the first complete object is found after the end of an object of the previous container.
+        """
+        reader = SeekableBLFReader(blf_file)
+        data = reader.read_container(reader.container_offsets()[1])
+        pos = find_first_object(data)
+        assert pos is not None
+        assert data[pos:pos + 4] == b'LOBJ'
+        assert find_first_object(data[pos:]) == 0
+        reader.stop()
+
+    def test_find_first_object_in_mapped_file(self, uncompressed_blf_file: Path) -> None:
+        """
+        Test that the first objects of uncompressed log containers are found in place in the mapped file.
+        """
+        with open(uncompressed_blf_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+            reader = SeekableBLFReader(mapped_file)
+            for offset in reader.container_offsets():
+                data, start, end = reader.container_data(offset)
+                assert data is mapped_file
+                assert find_first_object(data, start, end) == find_first_object(reader.read_container(offset))
+
+    def test_find_first_object_without_object(self) -> None:
+        """
+        Test that no object is found in data without object start.
+        """
+        assert find_first_object(b'\x00' * 64) is None
+        assert find_first_object(b'LOBJ' + b'\x00' * 60) is None
+
+
+class TestSeekableBLFReader:
+    """
+    UTs for the SeekableBLFReader class
+    """
+    def test_container_offsets(self, blf_file: Path) -> None:
+        """
+        Test that all log containers are found.
+        """
+        reader = SeekableBLFReader(blf_file)
+        offsets = reader.container_offsets()
+        assert len(offsets) > 50
+        assert offsets == sorted(offsets)
+        assert len(list(reader)) == 2000
+
+    @pytest.mark.parametrize('start, end', [(5.0, 5.5), (0.0, 0.05), (19.9, 30.0), (None, 1.0), (12.345, None)])
+    def test_iter_window(self, blf_file: Path, start, end) -> None:
+        """
+        Test that exactly the messages of the window are read.
+        """
+        messages = read_window(blf_file, start, end)
+        expected = [i for i in range(2000)
+                    if (start is None or i * 0.01 >= start - 1e-6) and (end is None or i * 0.01 <= end + 1e-6)]
+        assert [msg.data[0] + msg.data[1] * 256 for msg in messages] == expected
+
+    def test_iter_window_absolute(self, blf_file: Path) -> None:
+        """
+        Test a window given as points in time.
+        """
+        messages = read_window(blf_file, datetime.fromtimestamp(START_TIMESTAMP + 3.005),
+                               datetime.fromtimestamp(START_TIMESTAMP + 3.035))
+        assert [msg.data[0] + msg.data[1] * 256 for msg in messages] == [301, 302, 303]
+
+    def test_iter_window_seeks(self, blf_file: Path) -> None:
+        """
+        Test that the containers before the window are not decompressed.
+        """
+        reader = SeekableBLFReader(blf_file)
+        with patch.object(SeekableBLFReader, '_parse_container', autospec=True,
+                          side_effect=SeekableBLFReader._parse_container) as parse_container:
+            messages = list(reader.iter_window(18.0, 18.5))
+        assert len(messages) == 51
+        assert parse_container.call_count < len(reader.container_offsets()) // 5
+
+    def test_iter_window_with_late_message_before_end(self, tmp_path: Path) -> None:
+        """
+        Test that a message after the window does not end it before the last log container of the window.
+        """
+        def frame(i: int, is_fd: bool) -> dict:
+            # Message 555 is logged with a timestamp far after the window
+            timestamp = {'timestamp': START_TIMESTAMP + 100.0} if i == 555 else {}
+            return {'arbitration_id': 0x100, 'data': bytes([i % 256, i // 256, 0, 0]), **timestamp}
+
+        blf_file = write_blf_file(tmp_path / 'late.blf', 2000, max_container_size=1000, frame=frame)
+
+        messages = read_window(blf_file, 5.0, 5.6)
+
+        assert [msg.data[0] + msg.data[1] * 256 for msg in messages] == [i for i in range(500, 561) if i != 555]
+
+    @pytest.mark.parametrize('use_first_objects', [False, True])
+    def test_iter_container_range(self, blf_file: Path, use_first_objects: bool) -> None:
+        """
+        Test that the ranges of log containers together yield every message exactly once.
+        """
+        reader = SeekableBLFReader(blf_file)
+        offsets = reader.container_offsets()
+        first_objects = None
+        if use_first_objects:
+            first_objects = [-1 if (pos := find_first_object(reader.read_container(offset))) is None else pos
+                             for offset in offsets]
+        bounds = [0, 1, 7, 8, 30, len(offsets)]
+        messages = [msg for start, end in zip(bounds, bounds[1:])
+                    for msg in reader.iter_container_range(offsets, start, end, first_objects)]
+        assert [msg.data[0] + msg.data[1] * 256 for msg in messages] == list(range(2000))
+
+    def test_iter_container_range_of_mapped_file(self, uncompressed_blf_file: Path) -> None:
+        """
+        Test that the ranges of uncompressed log containers read in place yield every message exactly once.
+        """
+        with open(uncompressed_blf_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+            reader = SeekableBLFReader(mapped_file)
+            offsets = reader.container_offsets()
+            messages = [msg for start in range(len(offsets))
+                        for msg in reader.iter_container_range(offsets, start, start + 1)]
+        assert [msg.data[0] + msg.data[1] * 256 for msg in messages] == list(range(2000))
+
+    def test_select_containers(self, blf_file: Path) -> None:
+        """
+        Test that the selected log containers cover the window.
+        """
+        reader = SeekableBLFReader(blf_file)
+        offsets = reader.container_offsets()
+        selected = reader.select_containers(offsets, START_TIMESTAMP + 5.0, START_TIMESTAMP + 5.5)
+        messages = list(reader.iter_container_range(offsets, selected.start, selected.stop))
+
+        assert len(selected) < len(offsets) // 5
+        assert messages[0].timestamp <= START_TIMESTAMP + 5.0
+        assert messages[-1].timestamp >= START_TIMESTAMP + 5.5
+        assert reader.select_containers(offsets) == range(len(offsets))
+
+
+class TestResolveTime:
+    """
+    UTs for the resolve_time function
+    """
+    def test_resolve_time(self) -> None:
+        """
+        Test that relative seconds and points in time are converted to timestamps.
+        """
+        assert resolve_time(None, START_TIMESTAMP) is None
+        assert resolve_time(2.5, START_TIMESTAMP) == START_TIMESTAMP + 2.5
+        assert resolve_time(datetime.fromtimestamp(START_TIMESTAMP + 1), 0.0) == START_TIMESTAMP + 1
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import can
+import pytest
+
+from blf_converter.common.memory_budget import (CHUNK_MEMORY_SHARE, MAX_CHUNK_SIZE, MIN_CHUNK_SIZE, ChunkBudget,
+                                                current_chunk_size, message_memory_size)
+
+
+class TestChunkBudget:
+    """
+    UTs for the ChunkBudget class
+    """
+    def test_chunk_size_follows_measured_memory(self) -> None:
+        """
+        Test that the chunk size is adapted to the largest measured memory per frame.
+        """
+        budget = ChunkBudget(100_000_000)
+
+        budget.record(10000, 2_000_000)
+        assert budget.chunk_size == int(100_000_000 * CHUNK_MEMORY_SHARE / 200)
+        budget.record(10000, 4_000_000)
+        budget.record(10000, 1_000_000)
+        assert budget.chunk_size == int(100_000_000 * CHUNK_MEMORY_SHARE / 400)
+        assert current_chunk_size(budget) == budget.chunk_size
+
+    def test_empty_chunk_is_ignored(self) -> None:
+        """
+        Test that a chunk without frames does not change the chunk size.
+        """
+        budget = ChunkBudget(100_000_000)
+        chunk_size = budget.chunk_size
+
+        budget.record(0, 1000)
+
+        assert budget.chunk_size == chunk_size
+
+    def test_pending_chunks_are_reduced_first(self) -> None:
+        """
+        Test that fewer chunks are kept in flight before the chunks get smaller than MIN_CHUNK_SIZE.
+        """
+        budget = ChunkBudget(int(MIN_CHUNK_SIZE * 1000 * 3 / CHUNK_MEMORY_SHARE), max_pending=8, min_pending=2)
+
+        budget.record(1000, 1_000_000)
+        assert budget.max_pending == 3 and budget.chunk_size == MIN_CHUNK_SIZE
+
+        budget.record(1000, 10_000_000)
+        assert budget.max_pending == 2 and budget.chunk_size == MIN_CHUNK_SIZE
+
+    def test_chunk_size_limits(self) -> None:
+        """
+        Test that the chunk size stays within MIN_CHUNK_SIZE and MAX_CHUNK_SIZE.
+        """
+        assert ChunkBudget(512 * 1024 ** 3).chunk_size == MAX_CHUNK_SIZE
+        assert ChunkBudget(1024).chunk_size == MIN_CHUNK_SIZE
+
+    def test_invalid_budget(self) -> None:
+        """
+        Test that a budget without bytes raises a ValueError.
+        """
+        with pytest.raises(ValueError):
+            ChunkBudget(0)
+
+
+class TestMemorySizes:
+    """
+    UTs for the message_memory_size and current_chunk_size functions
+    """
+    def test_message_memory_size(self) -> None:
+        """
+        Test that the memory of a message with more data is larger.
+        """
+        classic = can.Message(arbitration_id=0x100, data=bytes(8))
+        fd = can.Message(arbitration_id=0x100, data=bytes(64), is_fd=True)
+
+        assert 0 < message_memory_size(classic) < message_memory_size(fd)
+
+    def test_fixed_chunk_size(self) -> None:
+        """
+        Test that a fixed chunk size is returned unchanged.
+        """
+        assert current_chunk_size(1234) == 1234
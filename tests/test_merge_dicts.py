@@ -3,6 +3,7 @@
 """
 import pytest
 
+from blf_converter.common.signal_buffer import SignalBuffer
 from blf_converter.common.utils import merge_dicts, validate_results
 
 
@@ -149,6 +150,35 @@ class TestDataMergeModule:
         assert merged_dict == expected_merged_dict
         assert found_signals == expected_found_signals
 
+    def test_merge_dicts_with_signal_buffers(self) -> None:
+        """Test the merge_dicts function with samples collected in signal buffers.
+        """
+        results = [
+            ({"signal1": SignalBuffer.from_samples([(1.0, 1), (2.0, 2)])}, {"signal1"}),
+            ({"signal1": SignalBuffer.from_samples([(3.0, 3)]), "signal2": SignalBuffer.from_samples([(4.0, 4.5)])},
+             {"signal1", "signal2"})
+        ]
+
+        merged_dict, found_signals = merge_dicts(results)
+
+        assert isinstance(merged_dict["signal1"], SignalBuffer)
+        assert merged_dict == {"signal1": [(1.0, 1), (2.0, 2), (3.0, 3)], "signal2": [(4.0, 4.5)]}
+        assert found_signals == {"signal1", "signal2"}
+
+    def test_merge_dicts_with_iterator(self, data_with_valid_results) -> None:
+        """Test the merge_dicts function with results passed as a generator.
+        """
+        merged_dict, found_signals = merge_dicts(result for result in data_with_valid_results)
+
+        assert merged_dict["signal1"] == [(1, 1), (2, 2)]
+        assert found_signals == {"signal1", "signal2", "signal3", "signal4"}
+
+    def test_merge_dicts_with_invalid_iterator(self, data_with_invalid_results_not_set) -> None:
+        """Test the merge_dicts function with invalid results passed as a generator.
+        """
+        with pytest.raises(ValueError):
+            merge_dicts(result for result in data_with_invalid_results_not_set)
+
     def test_merge_dicts_with_empty_results(self, data_with_empty_results) -> None:
         """Test the merge_dicts function with empty results.
         """
@@ -1,11 +1,22 @@
 # -*- coding: utf-8 -*-
 from pathlib import Path
 
+import can
 import cantools
+import numpy as np
 import pytest
+from asammdf import MDF
 from unittest.mock import Mock
 
-from blf_converter.common.processing_chunks import process_chunk, read_blf_file
+from blf_converter.common.blf_frames import FRAME_DTYPE
+from blf_converter.common.memory_budget import CHUNK_MEMORY_SHARE, INITIAL_BYTES_PER_FRAME, ChunkBudget
+from blf_converter.common.processing_chunks import (_plan_container_ranges, iter_chunks, iter_container_ranges,
+                                                    iter_processed_chunks, iter_time_ordered, process_chunk,
+                                                    process_frames, read_blf_file)
+from blf_converter.common.signal_buffer import SignalBuffer
+from blf_converter.common.signal_decoder import ChannelDecoder, SignalDecoder
+from blf_converter.common.utils import merge_dicts
+from tests.conftest import START_TIMESTAMP, write_blf_file
 
 
 class MockMessage:
@@ -107,8 +118,8 @@ def expected_results():
         A tuple containing the expected signals dictionary and the expected found signals.
     """
     expected_signals_dict = {
-        'signal1': [(0.1, '1.234'), (0.2, '2.345')],
-        'signal2': [(0.1, '5')]
+        'signal1': [(0.1, 1.234), (0.2, 2.345)],
+        'signal2': [(0.1, 5)]
     }
     expected_found_signals = {'signal1', 'signal2'}
     return expected_signals_dict, expected_found_signals
@@ -135,6 +146,22 @@ class TestProcessChunk:
         assert result_signals_dict == expected_signals_dict
         assert result_found_signals == expected_found_signals
 
+    def test_process_chunk_with_frame_ids(self, valid_mock_db: Mock, valid_chunk: list, signal_list: list) -> None:
+        """
+        Test that frames which are not in the given frame ids are skipped without being decoded.
+
+        Parameters
+        ----------
+        valid_mock_db
+        valid_chunk
+        signal_list
+        """
+        result_signals_dict, result_found_signals = process_chunk((valid_mock_db, valid_chunk, signal_list, {1}))
+
+        assert valid_mock_db.decode_message.call_count == 1
+        assert result_signals_dict == {'signal1': [(0.1, 1.234)], 'signal2': [(0.1, 5)]}
+        assert result_found_signals == {'signal1', 'signal2'}
+
     def test_process_chunk_with_invalid_db(self, invalid_mock_db: Mock, valid_chunk: list, signal_list: list) -> None:
         """
         Test the process_chunk function with an invalid database.
@@ -201,3 +228,485 @@ class TestReadBlfFileInChunks:
         """
         output = read_blf_file(**valid_data)
         assert output == Path('test_results/Logging2023-11-21_15-46-47.mf4')
+
+
+@pytest.fixture(scope='function')
+def generated_blf_file(tmp_path: Path) -> Path:
+    """
+    A small BLF file with 25 CAN messages.
+
+    Returns
+    -------
+    Path
+        Path to the generated BLF file.
+    """
+    blf_file = tmp_path / 'generated.blf'
+    writer = can.BLFWriter(blf_file)
+    for i in range(25):
+        writer.on_message_received(can.Message(timestamp=1700000000 + i * 0.01, arbitration_id=0x100 + i,
+                                               is_extended_id=False, data=bytes([i] * 8)))
+    writer.stop()
+    return blf_file
+
+
+class TestIterChunks:
+    """
+    UTs for the iter_chunks function
+    """
+    def test_iter_chunks_splits_messages(self, generated_blf_file: Path) -> None:
+        """
+        Test that iter_chunks yields chunks of at most chunk_size messages in file order.
+
+        Parameters
+        ----------
+        generated_blf_file
+        """
+        chunks = list(iter_chunks(generated_blf_file, 10))
+
+        assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+        assert [msg.arbitration_id for chunk in chunks for msg in chunk] == [0x100 + i for i in range(25)]
+
+    def test_iter_chunks_is_lazy(self, generated_blf_file: Path) -> None:
+        """
+        Test that iter_chunks does not read further than the requested chunk.
+
+        Parameters
+        ----------
+        generated_blf_file
+        """
+        chunks = iter_chunks(generated_blf_file, 10)
+        first_chunk = next(chunks)
+        chunks.close()
+
+        assert len(first_chunk) == 10
+
+    def test_iter_chunks_time_window(self, generated_blf_file: Path) -> None:
+        """
+        Test that iter_chunks only yields the messages of the time window.
+
+        Parameters
+        ----------
+        generated_blf_file
+        """
+        chunks = list(iter_chunks(generated_blf_file, 10, start=0.095, end=0.205))
+
+        assert [msg.arbitration_id for chunk in chunks for msg in chunk] == [0x100 + i for i in range(10, 21)]
+
+
+@pytest.fixture(scope='function')
+def robot_blf_file(tmp_path: Path) -> Path:
+    """
+    A BLF file with messages of the ABDRobot DBC file.
+
+    Returns
+    -------
+    Path
+        Path to the generated BLF file.
+    """
+    blf_file = tmp_path / 'robot.blf'
+    writer = can.BLFWriter(blf_file)
+    for i in range(200):
+        arbitration_id = 0x640 + i % 21
+        writer.on_message_received(can.Message(timestamp=1700000000 + i * 0.01, arbitration_id=arbitration_id,
+                                               is_extended_id=False, data=bytes([i % 256, 0, i % 7, 1, 2, 3, 4, 5])))
+    writer.stop()
+    return blf_file
+
+
+class TestReadGeneratedBlfFile:
+    """
+    UTs for the read_blf_file function with a generated BLF file
+    """
+    def test_read_blf_file_writes_all_chunks(self, robot_blf_file: Path, tmp_path: Path) -> None:
+        """
+        Test that the samples of all chunks are written to the MDF file.
+
+        Parameters
+        ----------
+        robot_blf_file
+        tmp_path
+        """
+        dbc_files = [Path('tests/testdata/ABDRobot_Bus1_export_Crossing.DBC')]
+        output_filename = tmp_path / 'robot.mf4'
+
+        output = read_blf_file(robot_blf_file, dbc_files, 30, output_filename, ['MpDistanceTravelledWheelbaseMidP'])
+
+        signal = MDF(output).get('MpDistanceTravelledWheelbaseMidP')
+        expected = [(i + ((i % 7) << 16) + (1 << 24)) * 0.001 for i in range(5, 200, 21)]
+        assert output == output_filename
+        assert np.allclose(signal.samples, expected)
+        assert np.allclose(signal.timestamps, [1700000000 + i * 0.01 for i in range(5, 200, 21)])
+
+    def test_read_blf_file_without_found_signals(self, robot_blf_file: Path, tmp_path: Path) -> None:
+        """
+        Test that a ValueError is raised and no file is written if none of the signals is found.
+
+        Parameters
+        ----------
+        robot_blf_file
+        tmp_path
+        """
+        dbc_files = [Path('tests/testdata/ABDRobot_Bus1_export_Crossing.DBC')]
+        output_filename = tmp_path / 'robot.mf4'
+
+        with pytest.raises(ValueError):
+            read_blf_file(robot_blf_file, dbc_files, 30, output_filename, ['UnknownSignal'])
+        assert not output_filename.exists()
+
+    @pytest.mark.parametrize('bulk_decoding', [False, True])
+    def test_parallel_output_in_time_order(self, tmp_path: Path, bulk_decoding: bool) -> None:
+        """
+        Test that samples logged out of order across the chunks decoded in parallel are written in time order.
+
+        Parameters
+        ----------
+        tmp_path
+        bulk_decoding
+        """
+        # Every fourth message of the id 0x645 is logged 30 steps late, after the next message of the id
+        steps = [i + 30 if i % 21 == 5 and i // 21 % 4 == 1 else i for i in range(600)]
+        blf_file = write_blf_file(tmp_path / 'unordered.blf', 600, max_container_size=200,
+                                  frame=lambda i, is_fd: {'timestamp': START_TIMESTAMP + steps[i] * 0.01,
+                                                          'arbitration_id': 0x640 + i % 21,
+                                                          'data': bytes([i % 256, 0, i % 7, 1, 2, 3, 4, 5])})
+        dbc_files = [Path('tests/testdata/ABDRobot_Bus1_export_Crossing.DBC')]
+        output_filename = tmp_path / 'unordered.mf4'
+
+        read_blf_file(blf_file, dbc_files, 30, output_filename, ['MpDistanceTravelledWheelbaseMidP'], num_workers=2,
+                      bulk_decoding=bulk_decoding)
+
+        signal = MDF(output_filename).get('MpDistanceTravelledWheelbaseMidP')
+        assert np.all(np.diff(signal.timestamps) >= 0)
+        assert np.allclose(signal.timestamps, sorted(START_TIMESTAMP + steps[i] * 0.01 for i in range(5, 600, 21)))
+
+
+class TestIterTimeOrdered:
+    """
+    UTs for the iter_time_ordered function
+    """
+    def test_chunks_are_merged_in_time_order(self) -> None:
+        """
+        Test that samples overlapping the next chunk are merged stably and the signals keep their order.
+        """
+        results: list[tuple[dict, set]] = [
+            ({'b': SignalBuffer.from_samples([(1.0, 1), (4.0, 4), (3.0, 3)]), 'a': [(2.0, 2)]}, {'a', 'b'}),
+            ({'a': SignalBuffer.from_samples([(3.0, 3)]), 'b': SignalBuffer.from_samples([(2.0, 2), (4.0, 40)])},
+             {'a', 'b'}),
+            ({'b': SignalBuffer.from_samples([(5.0, 5)])}, {'b'})]
+
+        ordered = list(iter_time_ordered(results))
+
+        assert [found_set for _, found_set in ordered] == [{'a', 'b'}, {'a', 'b'}, {'b'}, set()]
+        assert [list(signals_dict) for signals_dict, _ in ordered] == [[], ['b', 'a'], ['b'], ['b', 'a']]
+        assert merge_dicts(ordered)[0] == {'b': [(1.0, 1), (2.0, 2), (3.0, 3), (4.0, 4), (4.0, 40), (5.0, 5)],
+                                           'a': [(2.0, 2), (3.0, 3)]}
+
+    def test_samples_out_of_order_by_more_than_one_chunk(self) -> None:
+        """
+        Test that samples older than the samples passed on before raise a ValueError instead of being written.
+        """
+        results: list[tuple[dict, set]] = [({'a': SignalBuffer.from_samples([(5.0, 5)])}, {'a'}),
+                                           ({'a': [(6.0, 6)]}, {'a'}), ({'a': [(1.0, 1)]}, {'a'})]
+        ordered = iter_time_ordered(results)
+
+        assert next(ordered)[0] == {}
+        assert next(ordered)[0] == {'a': [(5.0, 5)]}
+        with pytest.raises(ValueError, match='out of order by more than one chunk'):
+            next(ordered)
+
+    def test_read_blf_file_out_of_order_by_more_than_one_chunk(self, tmp_path: Path) -> None:
+        """
+        Test that no output is written if a frame is logged later than the next chunk.
+        """
+        steps = [i - 100 if i == 150 else i for i in range(200)]
+        blf_file = write_blf_file(tmp_path / 'late.blf', 200,
+                                  frame=lambda i, is_fd: {'timestamp': START_TIMESTAMP + steps[i] * 0.01,
+                                                          'arbitration_id': 0x645,
+                                                          'data': bytes([i % 256, 0, i % 7, 1, 2, 3, 4, 5])})
+        output_filename = tmp_path / 'late.mf4'
+
+        with pytest.raises(ValueError, match='MpDistanceTravelledWheelbaseMidP'):
+            read_blf_file(blf_file, [Path('tests/testdata/ABDRobot_Bus1_export_Crossing.DBC')], 20, output_filename,
+                          ['MpDistanceTravelledWheelbaseMidP'])
+        assert not output_filename.exists()
+
+
+class TestIterProcessedChunks:
+    """
+    UTs for the iter_processed_chunks function
+    """
+    def test_parallel_results_equal_serial_results(self, robot_blf_file: Path) -> None:
+        """
+        Test that decoding with a process pool gives the same result as decoding in the current process.
+
+        Parameters
+        ----------
+        robot_blf_file
+        """
+        dbc_files = [Path('tests/testdata/ABDRobot_Bus1_export_Crossing.DBC')]
+        signal_list = ['TimeToCollisionLongitudinal', 'MpYawAngle', 'SrCommand']
+
+        serial = merge_dicts(iter_processed_chunks(robot_blf_file, dbc_files, 30, signal_list, num_workers=1))
+        parallel = merge_dicts(iter_processed_chunks(robot_blf_file, dbc_files, 30, signal_list, num_workers=2))
+
+        assert serial[1] == set(signal_list)
+        assert parallel == serial
+
+    @pytest.mark.parametrize('start, end, use_index', [(None, None, False), (0.25, 1.55, False), (None, None, True),
+                                                       (0.5, 1.0, True)])
+    def test_parallel_container_ranges(self, tmp_path: Path, start, end, use_index) -> None:
+        """
+        Test that decoding ranges of small log containers in parallel gives the same result as decoding serially.
+
+        Parameters
+        ----------
+        tmp_path
+        """
+        blf_file = tmp_path / 'containers.blf'
+        writer = can.BLFWriter(blf_file, max_container_size=200)
+        for i in range(200):
+            writer.on_message_received(can.Message(timestamp=1700000000 + i * 0.01, arbitration_id=0x640 + i % 21,
+                                                   is_extended_id=False, data=bytes([i % 256, 0, i % 7, 1, 2, 3, 4, 5])))
+        writer.stop()
+        dbc_files = [Path('tests/testdata/ABDRobot_Bus1_export_Crossing.DBC')]
+        signal_list = ['MpDistanceTravelledWheelbaseMidP', 'MpYawAngle']
+
+        serial = merge_dicts(iter_processed_chunks(blf_file, dbc_files, 10, signal_list, num_workers=1, start=start,
+                                                   end=end, use_index=use_index))
+        parallel = merge_dicts(iter_processed_chunks(blf_file, dbc_files, 10, signal_list, num_workers=2, start=start,
+                                                     end=end, use_index=use_index))
+
+        assert serial[1] == set(signal_list)
+        assert parallel == serial
+
+    def test_parallel_results_in_shared_memory(self, robot_blf_file: Path, monkeypatch) -> None:
+        """
+        Test that results sent back in shared memory are equal to the results decoded in the current process.
+
+        Parameters
+        ----------
+        robot_blf_file
+        """
+        monkeypatch.setattr('blf_converter.common.shared_results.SHARED_RESULT_MIN_BYTES', 0)
+        dbc_files = [Path('tests/testdata/ABDRobot_Bus1_export_Crossing.DBC')]
+        signal_list = ['TimeToCollisionLongitudinal', 'MpYawAngle', 'SrCommand']
+
+        serial = merge_dicts(iter_processed_chunks(robot_blf_file, dbc_files, 30, signal_list, num_workers=1,
+                                                   bulk_decoding=True))
+        parallel = merge_dicts(iter_processed_chunks(robot_blf_file, dbc_files, 30, signal_list, num_workers=2,
+                                                     bulk_decoding=True))
+
+        assert parallel == serial
+
+    @pytest.mark.parametrize('num_workers, bulk_decoding', [(1, False), (1, True), (2, False)])
+    def test_memory_budget(self, tmp_path: Path, monkeypatch, num_workers: int, bulk_decoding: bool) -> None:
+        """
+        Test that a memory budget splits the file into adapted chunks with the samples of a fixed chunk size.
+
+        Parameters
+        ----------
+        tmp_path
+        """
+        monkeypatch.setattr('blf_converter.common.memory_budget.MIN_CHUNK_SIZE', 1)
+        blf_file = tmp_path / 'containers.blf'
+        writer = can.BLFWriter(blf_file, max_container_size=200)
+        for i in range(200):
+            writer.on_message_received(can.Message(timestamp=1700000000 + i * 0.01, arbitration_id=0x640 + i % 21,
+                                                   is_extended_id=False, data=bytes([i % 256, 0, i % 7, 1, 2, 3, 4, 5])))
+        writer.stop()
+        dbc_files = [Path('tests/testdata/ABDRobot_Bus1_export_Crossing.DBC')]
+        signal_list = ['TimeToCollisionLongitudinal', 'MpYawAngle', 'SrCommand']
+        budget = ChunkBudget(40000)
+
+        results = list(iter_processed_chunks(blf_file, dbc_files, budget, signal_list, num_workers=num_workers,
+                                             bulk_decoding=bulk_decoding))
+        expected = merge_dicts(iter_processed_chunks(blf_file, dbc_files, 1000, signal_list))
+
+        assert len(results) > 1
+        assert budget.bytes_per_frame != INITIAL_BYTES_PER_FRAME
+        assert budget.chunk_size * budget.max_pending * budget.bytes_per_frame <= 40000 * CHUNK_MEMORY_SHARE
+        assert merge_dicts(results) == expected
+
+    @pytest.mark.parametrize('num_workers', [1, 2])
+    def test_bulk_decoding_equals_message_decoding(self, robot_blf_file: Path, num_workers: int) -> None:
+        """
+        Test that decoding the frames in bulk gives the same samples as decoding every message.
+
+        Parameters
+        ----------
+        robot_blf_file
+        """
+        dbc_files = [Path('tests/testdata/ABDRobot_Bus1_export_Crossing.DBC')]
+        signal_list = ['TimeToCollisionLongitudinal', 'MpYawAngle', 'MpDistanceTravelledWheelbaseMidP', 'SrCommand']
+
+        expected = merge_dicts(iter_processed_chunks(robot_blf_file, dbc_files, 30, signal_list))
+        bulk = merge_dicts(iter_processed_chunks(robot_blf_file, dbc_files, 30, signal_list, num_workers=num_workers,
+                                                 bulk_decoding=True))
+
+        assert bulk[1] == expected[1] == set(signal_list)
+        for name, buffer in expected[0].items():
+            np.testing.assert_array_equal(bulk[0][name].timestamps, buffer.timestamps)
+            np.testing.assert_array_equal(bulk[0][name].values, buffer.values)
+            assert bulk[0][name].values.dtype == buffer.values.dtype
+
+
+class TestProcessFrames:
+    """
+    UTs for the process_frames function
+    """
+    def test_process_frames_keeps_file_order(self) -> None:
+        """
+        Test that the samples of a signal carried by two messages are in file order.
+        """
+        db = cantools.database.load_string(
+            'VERSION ""\n\nBU_: ECU\n\n'
+            'BO_ 16 Front: 8 ECU\n SG_ Speed : 0|16@1+ (0.5,0) [0|0] "" ECU\n\n'
+            'BO_ 32 Rear: 8 ECU\n SG_ Speed : 8|16@1+ (0.5,0) [0|0] "" ECU\n', database_format='dbc')
+        assert isinstance(db, cantools.database.can.Database)
+        frames = np.zeros(5, dtype=FRAME_DTYPE)
+        frames['timestamp'] = [1.0, 2.0, 3.0, 4.0, 5.0]
+        frames['arbitration_id'] = [32, 16, 48, 32, 16]
+        frames['dlc'] = 8
+        frames['data'][:, 0] = [0, 2, 0, 0, 6]
+        frames['data'][:, 1] = [2, 0, 0, 8, 0]
+
+        signals_dict, found_signals = process_frames((SignalDecoder(db, ['Speed']), frames))
+
+        assert found_signals == {'Speed'}
+        assert signals_dict['Speed'].timestamps.tolist() == [1.0, 2.0, 4.0, 5.0]
+        assert signals_dict['Speed'].values.tolist() == [1.0, 1.0, 4.0, 3.0]
+
+
+@pytest.fixture(scope='function')
+def multi_bus_files(tmp_path: Path) -> tuple[Path, Path, Path]:
+    """
+    A BLF file of two CAN buses, where the frames with id 16 carry Speed on channel 1 and Torque on channel 2, and the
+    DBC files of both buses.
+
+    Returns
+    -------
+    tuple[Path, Path, Path]
+        Paths to the BLF file and to the DBC files of channel 1 and channel 2.
+    """
+    header = 'VERSION ""\n\nBU_: ECU\n\n'
+    powertrain_dbc = tmp_path / 'powertrain.dbc'
+    powertrain_dbc.write_text(header + 'BO_ 16 Engine: 8 ECU\n SG_ Speed : 0|16@1+ (0.5,0) [0|0] "" ECU\n')
+    chassis_dbc = tmp_path / 'chassis.dbc'
+    chassis_dbc.write_text(header + 'BO_ 16 Brake: 4 ECU\n SG_ Torque : 8|8@1- (2,0) [0|0] "" ECU\n')
+    blf_file = tmp_path / 'multi_bus.blf'
+    writer = can.BLFWriter(blf_file, max_container_size=200)
+    for i in range(90):
+        writer.on_message_received(can.Message(timestamp=1700000000 + i * 0.01, arbitration_id=16, channel=i % 3,
+                                               is_extended_id=False, data=bytes([i, 1, 0, 0, 0, 0, 0, 0])))
+    writer.stop()
+    return blf_file, powertrain_dbc, chassis_dbc
+
+
+class TestMultiBusDecoding:
+    """
+    UTs for decoding logs of several CAN buses with the DBC files of every channel
+    """
+    @pytest.mark.parametrize('num_workers, bulk_decoding', [(1, False), (1, True), (2, False), (2, True)])
+    def test_frames_are_decoded_with_dbc_of_their_channel(self, multi_bus_files, num_workers: int,
+                                                          bulk_decoding: bool) -> None:
+        """
+        Test that frames with the same id on different channels are only decoded with the DBC files of their channel.
+        """
+        blf_file, powertrain_dbc, chassis_dbc = multi_bus_files
+
+        signals_dict, found_signals = merge_dicts(iter_processed_chunks(
+            blf_file, None, 20, ['Speed', 'Torque'], num_workers=num_workers, bulk_decoding=bulk_decoding,
+            channel_dbc_files={1: [powertrain_dbc], 2: [chassis_dbc]}))
+
+        assert found_signals == {'Speed', 'Torque'}
+        assert signals_dict['Speed'].values.tolist() == [(i + 256) * 0.5 for i in range(0, 90, 3)]
+        assert signals_dict['Torque'].values.tolist() == [2] * 30
+        assert signals_dict['Torque'].timestamps.tolist() == [1700000000 + i * 0.01 for i in range(1, 90, 3)]
+
+    @pytest.mark.parametrize('bulk_decoding', [False, True])
+    def test_other_channels_are_decoded_with_default_dbc(self, multi_bus_files, bulk_decoding: bool) -> None:
+        """
+        Test that the frames of channels without own DBC files are decoded with the default DBC files.
+        """
+        blf_file, powertrain_dbc, chassis_dbc = multi_bus_files
+
+        signals_dict, _ = merge_dicts(iter_processed_chunks(blf_file, [powertrain_dbc], 20, ['Speed', 'Torque'],
+                                                            bulk_decoding=bulk_decoding,
+                                                            channel_dbc_files={2: [chassis_dbc]}))
+
+        assert signals_dict['Speed'].timestamps.tolist() == [1700000000 + i * 0.01 for i in range(90) if i % 3 != 1]
+        assert len(signals_dict['Torque']) == 30
+
+    def test_process_chunk_with_channel_decoder(self, multi_bus_files) -> None:
+        """
+        Test that messages of channels without decoder are skipped.
+        """
+        _, powertrain_dbc, _ = multi_bus_files
+        db = cantools.database.load_file(powertrain_dbc)
+        assert isinstance(db, cantools.database.can.Database)
+        decoder = ChannelDecoder({2: SignalDecoder(db, ['Speed'])})
+        chunk = [can.Message(timestamp=i, arbitration_id=16, channel=i, data=bytes([4, 0] * 4)) for i in range(3)]
+
+        signals_dict, found_signals = process_chunk((decoder, chunk, ['Speed'], decoder.frame_ids))
+
+        assert found_signals == {'Speed'}
+        assert signals_dict['Speed'].timestamps.tolist() == [1]
+
+
+class TestContainerRanges:
+    """
+    UTs for the planning of the log container ranges of the worker processes
+    """
+    def test_iter_container_ranges(self) -> None:
+        """
+        Test that consecutive log containers are grouped until they hold about chunk_size messages.
+        """
+        sizes = [480] * 10
+
+        assert list(iter_container_ranges(list(range(10)), sizes, 20)) == [(0, 2), (2, 4), (4, 6), (6, 8), (8, 10)]
+        assert list(iter_container_ranges(list(range(10)), sizes, 1000)) == [(0, 10)]
+        assert list(iter_container_ranges([0, 1, 4, 5, 6, 9], sizes, 1000)) == [(0, 2), (4, 7), (9, 10)]
+        assert list(iter_container_ranges([], sizes, 10)) == []
+
+    def test_iter_container_ranges_adapts_to_budget(self) -> None:
+        """
+        Test that the chunk size of a memory budget is read again for every range.
+        """
+        budget = ChunkBudget(100_000_000)
+        budget.chunk_size = 20
+        ranges = iter_container_ranges(list(range(10)), [480] * 10, budget)
+
+        assert next(ranges) == (0, 2)
+        budget.chunk_size = 1000
+        assert list(ranges) == [(2, 10)]
+
+    @pytest.mark.parametrize('use_index', [False, True])
+    def test_plan_container_ranges(self, tmp_path: Path, use_index: bool) -> None:
+        """
+        Test that all log containers are selected without time window and their sizes are read.
+        """
+        blf_file = write_blf_file(tmp_path / 'test.blf', 2000, max_container_size=4096)
+
+        offsets, first_objects, start_time, end_time, selected, sizes = _plan_container_ranges(
+            blf_file, None, None, {0x640}, use_index)
+
+        assert len(offsets) > 10
+        assert selected == list(range(len(offsets)))
+        assert len(sizes) == len(offsets) and all(size > 0 for size in sizes)
+        assert start_time is None and end_time is None
+        assert (first_objects is not None) == use_index
+
+    def test_plan_container_ranges_with_time_window(self, tmp_path: Path) -> None:
+        """
+        Test that only the log containers of the time window are selected, the index skipping the container before
+        the window which the binary search over the start times keeps.
+        """
+        blf_file = write_blf_file(tmp_path / 'test.blf', 2000, max_container_size=4096)
+
+        offsets, _, start_time, end_time, selected, _ = _plan_container_ranges(blf_file, 5.0, 10.0, {0x640}, False)
+        indexed = _plan_container_ranges(blf_file, 5.0, 10.0, {0x640}, True)[4]
+
+        assert start_time == pytest.approx(START_TIMESTAMP + 5.0) and end_time == pytest.approx(START_TIMESTAMP + 10.0)
+        assert 0 < selected[0] and selected[-1] < len(offsets) - 1
+        assert selected == list(range(selected[0], selected[-1] + 1))
+        assert set(indexed) <= set(selected) and len(indexed) >= len(selected) - 1
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from blf_converter.common.resampling import make_time_grid, resample
+
+
+class TestMakeTimeGrid:
+    """
+    UTs for the make_time_grid function
+    """
+    def test_make_time_grid(self):
+        """
+        Test that the grid covers the time range with the given rate.
+        """
+        assert np.allclose(make_time_grid(10.0, 10.5, 4), [10.0, 10.25, 10.5])
+        assert np.allclose(make_time_grid(10.0, 10.6, 4), [10.0, 10.25, 10.5])
+
+    def test_make_time_grid_single_point(self):
+        """
+        Test that a grid of a single timestamp has one point.
+        """
+        assert np.allclose(make_time_grid(3.0, 3.0, 100), [3.0])
+
+    def test_make_time_grid_invalid_rate(self):
+        """
+        Test that a rate which is not positive raises a ValueError.
+        """
+        with pytest.raises(ValueError):
+            make_time_grid(0.0, 1.0, 0)
+
+
+class TestResample:
+    """
+    UTs for the resample function
+    """
+    @pytest.fixture
+    def samples(self):
+        """
+        Samples of a signal with an integer value.
+
+        Returns
+        -------
+        tuple
+            The timestamps and values.
+        """
+        return np.array([1.0, 2.0, 4.0]), np.array([10, 20, 40])
+
+    def test_resample_zoh(self, samples):
+        """
+        Test that zero-order hold keeps the last value and is NaN before the first sample.
+        """
+        grid = np.array([0.5, 1.0, 1.5, 3.9, 4.0, 5.0])
+        assert np.array_equal(resample(*samples, grid), [np.nan, 10, 10, 20, 40, 40], equal_nan=True)
+
+    def test_resample_linear(self, samples):
+        """
+        Test that linear interpolation interpolates between the samples.
+        """
+        grid = np.array([0.5, 1.0, 1.5, 3.0, 5.0])
+        assert np.array_equal(resample(*samples, grid, 'linear'), [np.nan, 10, 15, 30, 40], equal_nan=True)
+
+    def test_resample_unsorted(self):
+        """
+        Test that samples which are not ordered by time are sorted.
+        """
+        resampled = resample(np.array([2.0, 1.0]), np.array([2.0, 1.0]), np.array([1.5, 2.5]))
+        assert np.array_equal(resampled, [1.0, 2.0])
+
+    def test_resample_strings(self):
+        """
+        Test that string values are held, also with linear interpolation.
+        """
+        resampled = resample(np.array([1.0, 2.0]), np.array(['P', 'D'], dtype=object), np.array([0.0, 1.5, 2.0]),
+                             'linear')
+        assert resampled.tolist() == [None, 'P', 'D']
+
+    def test_resample_invalid_method(self, samples):
+        """
+        Test that an unsupported method raises a ValueError.
+        """
+        with pytest.raises(ValueError):
+            resample(*samples, np.array([1.0]), 'cubic')
@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 from pathlib import Path
 
+import numpy as np
 import pytest
+from asammdf import MDF
 
 from blf_converter.common.utils import save_signals_to_mdf
 
@@ -49,6 +51,18 @@ class TestSaveSignalsToMF4:
         save_signals_to_mdf(data_with_valid_signals, output_filename)
         assert output_filename.is_file()
 
+    def test_save_signals_to_mdf_numeric_channels(self, tmp_path: Path) -> None:
+        """
+        Test that numeric samples are saved as numeric channels
+        """
+        output_filename = tmp_path / 'numeric.mf4'
+        save_signals_to_mdf({'float_signal': [(0.0, 1.25), (1.0, 2.5)], 'int_signal': [(0.0, 3), (1.0, 4)]},
+                            output_filename)
+        mdf = MDF(output_filename)
+        assert mdf.get('float_signal').samples.dtype.kind == 'f'
+        assert mdf.get('int_signal').samples.dtype.kind in 'iu'
+        assert np.array_equal(mdf.get('float_signal').samples, [1.25, 2.5])
+
     def test_save_signals_to_mdf_empty_signals(self, data_with_empty_signals) -> None:
         """
         Test the save_signals_to_mdf() function with empty signals
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+from multiprocessing.shared_memory import SharedMemory
+from typing import cast
+
+import numpy as np
+import pytest
+
+import blf_converter.common.shared_results as shared_results
+from blf_converter.common.shared_results import SharedResult, receive_result, share_result
+from blf_converter.common.signal_buffer import SignalBuffer
+
+
+@pytest.fixture(scope='function')
+def large_result() -> tuple[dict, set]:
+    """
+    A decoded result with float, integer and boolean signals, larger than SHARED_RESULT_MIN_BYTES.
+
+    Returns
+    -------
+    tuple[dict, set]
+        The signals and found signals.
+    """
+    count = shared_results.SHARED_RESULT_MIN_BYTES // 8
+    timestamps = np.arange(count) * 0.01
+    signals_dict = {'Float': SignalBuffer(), 'Int': SignalBuffer(), 'Bool': SignalBuffer(), 'Odd': SignalBuffer()}
+    signals_dict['Float'].extend_arrays(timestamps, np.sin(timestamps))
+    signals_dict['Int'].extend_arrays(timestamps[::3], np.arange(len(timestamps[::3]), dtype=np.int16))
+    signals_dict['Bool'].extend_arrays(timestamps[:7], np.arange(7) % 2 == 0)
+    signals_dict['Odd'].extend_arrays(timestamps[:5], np.arange(5, dtype=np.uint8))
+    return signals_dict, set(signals_dict)
+
+
+def assert_results_equal(received: tuple[dict, set], expected: tuple[dict, set]) -> None:
+    """
+    Assert that the received result has the samples and dtypes of the expected result.
+    """
+    assert received[1] == expected[1]
+    assert set(received[0]) == set(expected[0])
+    for name, buffer in expected[0].items():
+        np.testing.assert_array_equal(received[0][name].timestamps, buffer.timestamps)
+        np.testing.assert_array_equal(received[0][name].values, buffer.values)
+        assert received[0][name].values.dtype == buffer.values.dtype
+
+
+class TestShareResult:
+    """
+    UTs for the share_result and receive_result functions
+    """
+    def test_shared_result_is_received(self, large_result) -> None:
+        """
+        Test that a large result is sent in shared memory and received with the same samples.
+        """
+        shared = share_result(large_result, 2)
+
+        assert isinstance(shared, SharedResult)
+        assert_results_equal(receive_result(shared), large_result)
+
+    def test_block_is_released_after_receiving(self, large_result) -> None:
+        """
+        Test that the shared memory block is removed when the result is received.
+        """
+        shared = share_result(large_result, 1)
+        assert isinstance(shared, SharedResult)
+        receive_result(shared)
+
+        with pytest.raises(FileNotFoundError):
+            SharedMemory(shared.name)
+
+    def test_only_newest_blocks_are_kept_open(self, large_result) -> None:
+        """
+        Test that the worker closes its oldest blocks, but the blocks stay available until they are received.
+        """
+        shared = [cast(SharedResult, share_result(large_result, 2)) for _ in range(3)]
+        assert all(isinstance(result, SharedResult) for result in shared)
+
+        assert [block.name for block in shared_results._created_blocks][-2:] == [result.name for result in shared[1:]]
+        for result in shared:
+            assert_results_equal(receive_result(result), large_result)
+
+    def test_small_and_object_results_are_not_shared(self) -> None:
+        """
+        Test that small results and results with object values are returned unchanged.
+        """
+        small = ({'Small': SignalBuffer.from_samples([(0.0, 1.0)])}, {'Small'})
+        names = ({'Name': SignalBuffer()}, {'Name'})
+        names[0]['Name'].extend_arrays(np.arange(10000.0), np.array([b'On', 'Off'] * 5000, dtype=object))
+
+        assert share_result(small, 2) is small
+        assert share_result(names, 2) is names
+        assert receive_result(small) is small
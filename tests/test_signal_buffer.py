@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+import pickle
+
+import numpy as np
+import pytest
+
+from blf_converter.common.signal_buffer import PENDING_SAMPLES, SignalBuffer
+
+
+@pytest.fixture(scope='function')
+def float_samples():
+    """
+    Fixture function to yield float samples
+
+    Yields
+    -------
+    list
+        A list of (timestamp, value) tuples
+    """
+    yield [(i * 0.1, i * 1.5) for i in range(3 * PENDING_SAMPLES + 7)]
+
+
+class TestSignalBuffer:
+    """
+    UTs for the SignalBuffer class
+    """
+
+    def test_append_grows_buffer(self, float_samples) -> None:
+        """
+        Test that appended samples are stored in order while the buffer grows
+        """
+        buffer = SignalBuffer(capacity=4)
+        for timestamp, value in float_samples:
+            buffer.append(timestamp, value)
+
+        assert len(buffer) == len(float_samples)
+        assert buffer.timestamps.dtype == np.float64
+        assert buffer.values.dtype == np.float64
+        assert np.array_equal(buffer.values, [value for _, value in float_samples])
+
+    def test_views_stay_valid_after_growing(self) -> None:
+        """
+        Test that views returned earlier are not modified by appending samples
+        """
+        buffer = SignalBuffer(capacity=2)
+        buffer.extend_arrays(np.array([0.0, 1.0]), np.array([1, 2]))
+        values = buffer.values
+        buffer.extend_arrays(np.array([2.0, 3.0]), np.array([3, 4]))
+
+        assert np.array_equal(values, [1, 2])
+        assert np.array_equal(buffer.values, [1, 2, 3, 4])
+
+    def test_int_values_are_promoted_to_float(self) -> None:
+        """
+        Test that the dtype of the values is promoted when float values follow int values
+        """
+        buffer = SignalBuffer.from_samples([(0.0, 1), (1.0, 2)])
+        assert buffer.values.dtype.kind == 'i'
+        buffer.extend([(2.0, 2.5)])
+
+        assert buffer.values.dtype == np.float64
+        assert buffer == [(0.0, 1.0), (1.0, 2.0), (2.0, 2.5)]
+
+    @pytest.mark.parametrize('first, second, dtype', [([-1, 2], [3], np.int64), ([1, 2], [2 ** 63], np.uint64),
+                                                      ([-1, 2], [2 ** 63], object)])
+    def test_int64_and_uint64_values_are_not_promoted_to_float(self, first: list, second: list, dtype) -> None:
+        """
+        Test that int64 and uint64 values are combined without rounding them to float64
+        """
+        buffer = SignalBuffer.from_arrays(np.arange(len(first), dtype=np.float64), np.array(first, dtype=np.int64))
+        buffer.extend_arrays(np.array([5.0]), np.array(second, dtype=np.uint64))
+
+        assert buffer.values.dtype == np.dtype(dtype)
+        assert buffer.values.tolist() == first + second
+
+    def test_extend_with_buffer(self) -> None:
+        """
+        Test extending a buffer with another buffer
+        """
+        buffer = SignalBuffer.from_samples([(0.0, 1), (1.0, 2)])
+        buffer.extend(SignalBuffer.from_samples([(2.0, 3)]))
+
+        assert buffer == [(0.0, 1), (1.0, 2), (2.0, 3)]
+
+    def test_sort_by_timestamp(self) -> None:
+        """
+        Test that samples appended out of order are sorted stably and that views returned before stay valid
+        """
+        buffer = SignalBuffer.from_samples([(3.0, 30), (4.0, 40)])
+        views = buffer.timestamps
+        for run in ([(0.0, 0), (3.0, 31)], [(1.0, 10), (5.0, 50)], [(2.0, 20)]):
+            buffer.extend(SignalBuffer.from_samples(run))
+        buffer.sort_by_timestamp()
+
+        assert buffer == [(0.0, 0), (1.0, 10), (2.0, 20), (3.0, 30), (3.0, 31), (4.0, 40), (5.0, 50)]
+        assert views.tolist() == [3.0, 4.0]
+        buffer.append(6.0, 60)
+        assert buffer.timestamps[-1] == 6.0
+
+    def test_sort_ordered_buffer(self, float_samples) -> None:
+        """
+        Test that ordered samples are not copied when sorting
+        """
+        buffer = SignalBuffer.from_samples(float_samples)
+        timestamps = buffer.timestamps
+        buffer.sort_by_timestamp()
+
+        assert np.shares_memory(buffer.timestamps, timestamps)
+
+    def test_from_arrays(self) -> None:
+        """
+        Test that a buffer takes over the arrays and copies them when it grows
+        """
+        timestamps, values = np.array([0.0, 1.0]), np.array([1, 2])
+        buffer = SignalBuffer.from_arrays(timestamps, values)
+
+        assert np.shares_memory(buffer.timestamps, timestamps)
+        buffer.append(2.0, 3)
+        assert buffer == [(0.0, 1), (1.0, 2), (2.0, 3)]
+        assert timestamps.tolist() == [0.0, 1.0]
+
+    def test_pickle(self, float_samples) -> None:
+        """
+        Test that a buffer with pending samples can be sent to another process
+        """
+        buffer = SignalBuffer.from_samples(float_samples[:10])
+        restored = pickle.loads(pickle.dumps(buffer))
+
+        assert restored == buffer
+        assert np.array_equal(restored.timestamps, buffer.timestamps)
+
+    def test_empty_buffer(self) -> None:
+        """
+        Test the properties of an empty buffer
+        """
+        buffer = SignalBuffer()
+
+        assert len(buffer) == 0
+        assert len(buffer.values) == 0
+        assert buffer == []
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+import random
+import struct
+from pathlib import Path
+
+import cantools
+import numpy as np
+import pytest
+
+from blf_converter.common.signal_decoder import SignalDecoder
+
+
+@pytest.fixture(scope='module')
+def test_db():
+    """
+    A database with Intel, Motorola, float and multiplexed signals.
+
+    Returns
+    -------
+    cantools.database.Database
+        The loaded test database.
+    """
+    return cantools.database.load_file(Path('tests/testdata/signal_decoder_test.dbc'))
+
+
+@pytest.fixture(scope='module')
+def kmatrix_db():
+    """
+    A CAN FD database with data signals of up to 512 bits.
+
+    Returns
+    -------
+    cantools.database.Database
+        The loaded KMatrix database.
+    """
+    return cantools.database.load_file(
+        Path('tests/testdata/E3_1_1_UNECE_CM_E3V_FASCANFD1_KMatrix_V15.04.01.00F_20230727_WL.DBC'))
+
+
+@pytest.fixture(scope='function')
+def random_payloads():
+    """
+    Random payloads of 8 bytes.
+
+    Returns
+    -------
+    list
+        A list of random payloads.
+    """
+    rng = random.Random(0)
+    return [bytes(rng.getrandbits(8) for _ in range(8)) for _ in range(500)]
+
+
+class TestSignalDecoder:
+    """
+    UTs for the SignalDecoder class
+    """
+    def test_frame_ids(self, test_db) -> None:
+        """
+        Test that only messages carrying requested signals are compiled.
+        """
+        decoder = SignalDecoder(test_db, ['Counter', 'Page1_Value'])
+        assert decoder.frame_ids == {0x101, 0x200}
+        assert set(decoder.messages) == {0x101, 0x200}
+
+    def test_signal_selectors(self, test_db) -> None:
+        """
+        Test that signal selectors are resolved to the signals of the messages when the decoder is built.
+        """
+        decoder = SignalDecoder(test_db, ['Multiplexed.Page*', 're:Motorola_.*', 'Unknown*'])
+
+        assert decoder.frame_ids == {0x100, 0x200, 0x300}
+        assert decoder.signal_names == {'Page0_Value', 'Page1_Value', 'Motorola_Unsigned', 'Motorola_Signed',
+                                        'Motorola_Wide'}
+        assert decoder.unmatched_selectors == ['Unknown*']
+        assert decoder.decode_message(0x200, bytes([1, 5, 0, 0, 0, 0, 0, 7])) == {'Page1_Value': 5}
+
+    @pytest.mark.parametrize('frame_id', [0x100, 0x101, 0x200])
+    def test_decode_message_equals_cantools(self, test_db, random_payloads, frame_id: int) -> None:
+        """
+        Test that the decoded values are equal to the values decoded by cantools.
+        """
+        signal_list = [signal.name for signal in test_db.get_message_by_frame_id(frame_id).signals]
+        decoder = SignalDecoder(test_db, signal_list)
+        for data in random_payloads:
+            if frame_id == 0x101:
+                data = struct.pack('<f', random.Random(data).uniform(-1e3, 1e3)) + data[4:]
+            try:
+                expected = test_db.decode_message(frame_id, data)
+            except cantools.database.errors.DecodeError:
+                with pytest.raises(cantools.database.errors.DecodeError):
+                    decoder.decode_message(frame_id, data)
+                continue
+            assert decoder.decode_message(frame_id, data) == expected
+
+    def test_decode_message_only_requested_signals(self, test_db) -> None:
+        """
+        Test that only requested signals are decoded.
+        """
+        decoder = SignalDecoder(test_db, ['Motorola_Signed', 'Gear'])
+        decoded = decoder.decode_message(0x100, bytes([0, 0, 0, 0, 0, 0x3F, 0, 1]))
+        assert decoded == {'Motorola_Signed': test_db.decode_message(0x100, bytes([0, 0, 0, 0, 0, 0x3F, 0, 1]))[
+            'Motorola_Signed'], 'Gear': 'First'}
+
+    def test_decode_message_inactive_multiplexed_signal(self, test_db) -> None:
+        """
+        Test that a multiplexed signal is not decoded if its multiplexer selects another page.
+        """
+        decoder = SignalDecoder(test_db, ['Page0_Value', 'Common'])
+        assert decoder.decode_message(0x200, bytes([1, 5, 0, 0, 0, 0, 0, 7])) == {'Common': 7}
+        assert decoder.decode_message(0x200, bytes([0, 5, 0, 0, 0, 0, 0, 7])) == {'Page0_Value': 0.5, 'Common': 7}
+
+    def test_decode_message_with_short_data(self, test_db) -> None:
+        """
+        Test that a too short payload raises a DecodeError like cantools.
+        """
+        decoder = SignalDecoder(test_db, ['Gear'])
+        with pytest.raises(cantools.database.errors.DecodeError):
+            decoder.decode_message(0x100, bytes(4))
+
+    def test_decode_message_with_unknown_frame_id(self, test_db) -> None:
+        """
+        Test that an unknown frame id raises a KeyError like cantools.
+        """
+        decoder = SignalDecoder(test_db, ['Gear'])
+        with pytest.raises(KeyError):
+            decoder.decode_message(0x101, bytes(8))
+
+
+class TestDecodeFrames:
+    """
+    UTs for the decode_frames method of the SignalDecoder class
+    """
+    @pytest.mark.parametrize('frame_id', [0x100, 0x101, 0x200, 0x300])
+    def test_decode_frames_equals_decode_message(self, test_db, frame_id: int) -> None:
+        """
+        Test that the values decoded in bulk are equal to the values of decode_message, skipping the frames for
+        which decode_message raises a DecodeError.
+        """
+        rng = np.random.default_rng(0)
+        data = rng.integers(0, 256, size=(500, 64), dtype=np.uint8)
+        lengths = rng.choice([4, 64], size=500, p=[0.1, 0.9])
+        signal_list = [signal.name for signal in test_db.get_message_by_frame_id(frame_id).signals]
+        decoder = SignalDecoder(test_db, signal_list)
+
+        decoded = decoder.decode_frames(frame_id, data, lengths)
+
+        expected: dict[str, list] = {name: [] for name in signal_list}
+        masks: dict[str, list] = {name: [] for name in signal_list}
+        for payload, length in zip(data, lengths):
+            try:
+                values = decoder.decode_message(frame_id, payload[:length].tobytes(), decode_choices=False)
+            except cantools.database.errors.DecodeError:
+                values = {}
+            for name in signal_list:
+                masks[name].append(name in values)
+                if name in values:
+                    expected[name].append(values[name])
+        for name in signal_list:
+            mask, decoded_values = decoded[name]
+            assert mask.tolist() == masks[name]
+            np.testing.assert_array_equal(decoded_values, np.array(expected[name], dtype=decoded_values.dtype))
+
+    def test_decode_frames_multiplexed(self, test_db) -> None:
+        """
+        Test that multiplexed signals are only decoded in the frames of their page.
+        """
+        decoder = SignalDecoder(test_db, ['Page0_Value', 'Common'])
+        data = np.zeros((3, 64), dtype=np.uint8)
+        data[:, 0] = [0, 1, 9]
+        data[:, 1] = 5
+        data[:, 7] = 7
+
+        decoded = decoder.decode_frames(0x200, data, np.full(3, 8))
+
+        assert decoded['Page0_Value'][0].tolist() == [True, False, False]
+        assert decoded['Page0_Value'][1].tolist() == [0.5]
+        assert decoded['Common'][0].tolist() == [True, True, False]
+        assert decoded['Common'][1].tolist() == [7, 7]
+
+    @pytest.mark.parametrize('signal_list, selector_pages', [(['Page1_Value'], {1}),
+                                                             (['Page0_Value', 'Page1_Value'], {0, 1}),
+                                                             (['Page1_Value', 'Common'], None), (['Mux'], None)])
+    def test_selector_pages(self, test_db, signal_list: list, selector_pages) -> None:
+        """
+        Test that the pages of the multiplexer with requested signals are compiled, if all requested signals are
+        multiplexed.
+        """
+        decoder = SignalDecoder(test_db, signal_list)
+        assert decoder.messages[0x200].selector_pages == (None if selector_pages is None else frozenset(selector_pages))
+
+    def test_decode_frames_skips_pages_without_requested_signals(self, test_db) -> None:
+        """
+        Test that frames of pages without requested signals are skipped and the others are decoded like with
+        decode_message.
+        """
+        decoder = SignalDecoder(test_db, ['Page1_Value'])
+        data = np.zeros((4, 64), dtype=np.uint8)
+        data[:, 0] = [1, 0, 1, 7]
+        data[:, 1] = [3, 5, 0xFF, 1]
+        data[:, 2] = [0, 0, 0xFF, 0]
+
+        mask, values = decoder.decode_frames(0x200, data, np.full(4, 8))['Page1_Value']
+
+        assert mask.tolist() == [True, False, True, False]
+        assert values.tolist() == [3, -1]
+        assert decoder.decode_message(0x200, data[0, :8].tobytes()) == {'Page1_Value': 3}
+        assert decoder.decode_message(0x200, data[1, :8].tobytes()) == {}
+
+    def test_decode_frames_signals_longer_than_64_bits(self, kmatrix_db) -> None:
+        """
+        Test that signals longer than 64 bits are decoded in bulk like with cantools.
+        """
+        messages = [message for message in kmatrix_db.messages if any(signal.length > 64 for signal in message.signals)]
+        assert messages
+        rng = np.random.default_rng(0)
+        data = rng.integers(0, 256, size=(50, 64), dtype=np.uint8)
+        lengths = np.full(50, 64)
+        for message in messages:
+            signal_list = [signal.name for signal in message.signals]
+            decoder = SignalDecoder(kmatrix_db, signal_list)
+
+            decoded = decoder.decode_frames(message.frame_id, data, lengths)
+
+            for name in signal_list:
+                mask, values = decoded[name]
+                expected = [kmatrix_db.decode_message(message.frame_id, payload[:message.length].tobytes(),
+                                                      decode_choices=False)[name] for payload in data]
+                assert mask.all()
+                assert values.tolist() == expected
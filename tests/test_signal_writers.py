@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+from pathlib import Path
+
+import numpy as np
+import pytest
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+from asammdf import MDF
+
+from blf_converter.common.signal_buffer import SignalBuffer
+from blf_converter.common.signal_writers import (CsvWriter, FeatherWriter, Mf4Writer, ParquetWriter,
+                                                 ResampledCsvWriter, create_writer)
+
+
+@pytest.fixture(scope='function')
+def chunk_results():
+    """
+    Fixture function to yield the decoded signals of two chunks
+
+    Yields
+    -------
+    list
+        A list of signal dictionaries
+    """
+    yield [
+        {'signal1': SignalBuffer.from_samples([(0.0, 1.5), (1.0, 2.5)]), 'signal2': [(0.5, 1), (1.5, 2)]},
+        {'signal1': SignalBuffer.from_samples([(2.0, 3.5)]), 'signal3': SignalBuffer.from_samples([(2.5, 7)])}
+    ]
+
+
+class TestMf4Writer:
+    """
+    UTs for the Mf4Writer class
+    """
+
+    def test_write_chunks(self, chunk_results, tmp_path: Path) -> None:
+        """
+        Test that the samples of all chunks are appended to the channels of their signals
+        """
+        output_filename = tmp_path / 'mf4' / 'output.mf4'
+        with Mf4Writer(output_filename) as writer:
+            for signals_dict in chunk_results:
+                writer.write(signals_dict)
+
+        mdf = MDF(output_filename)
+        assert writer.signal_names == ['signal1', 'signal2', 'signal3']
+        assert np.array_equal(mdf.get('signal1').samples, [1.5, 2.5, 3.5])
+        assert np.array_equal(mdf.get('signal1').timestamps, [0.0, 1.0, 2.0])
+        assert np.array_equal(mdf.get('signal2').samples, [1, 2])
+        assert np.array_equal(mdf.get('signal3').timestamps, [2.5])
+
+    def test_write_aborted(self, chunk_results, tmp_path: Path) -> None:
+        """
+        Test that no output file is created if writing is aborted by an exception
+        """
+        output_filename = tmp_path / 'output.mf4'
+        with pytest.raises(ValueError):
+            with Mf4Writer(output_filename) as writer:
+                writer.write(chunk_results[0])
+                raise ValueError("Decoding failed")
+
+        assert not output_filename.exists()
+
+    def test_write_later_chunks_losslessly(self, tmp_path: Path) -> None:
+        """
+        Test that later chunks are cast to the data type of the channel if their values fit into it
+        """
+        output_filename = tmp_path / 'output.mf4'
+        with Mf4Writer(output_filename) as writer:
+            writer.write({'signal': SignalBuffer.from_arrays(np.array([0.0]), np.array([1], dtype=np.int64))})
+            writer.write({'signal': SignalBuffer.from_arrays(np.array([1.0]), np.array([2], dtype=np.uint64))})
+
+        samples = MDF(output_filename).get('signal').samples
+        assert samples.dtype == np.int64
+        assert samples.tolist() == [1, 2]
+
+    @pytest.mark.parametrize('values', [np.array([2 ** 63], dtype=np.uint64), np.array([1.5])])
+    def test_write_later_chunk_out_of_range(self, values: np.ndarray, tmp_path: Path) -> None:
+        """
+        Test that a later chunk whose values do not fit into the data type of the channel raises a ValueError
+        instead of being truncated
+        """
+        output_filename = tmp_path / 'output.mf4'
+        with pytest.raises(ValueError, match='signal'):
+            with Mf4Writer(output_filename) as writer:
+                writer.write({'signal': SignalBuffer.from_arrays(np.array([0.0]), np.array([1], dtype=np.int64))})
+                writer.write({'signal': SignalBuffer.from_arrays(np.array([1.0]), values)})
+
+        assert not output_filename.exists()
+
+
+class TestCsvWriter:
+    """
+    UTs for the CsvWriter class
+    """
+
+    def test_write_chunks(self, chunk_results, tmp_path: Path) -> None:
+        """
+        Test that one CSV file per signal is written with the samples of all chunks
+        """
+        with CsvWriter(tmp_path / 'csv') as writer:
+            for signals_dict in chunk_results:
+                writer.write(signals_dict)
+
+        assert sorted(path.name for path in (tmp_path / 'csv').glob('*.csv')) == ['signal1.csv', 'signal2.csv',
+                                                                                  'signal3.csv']
+        assert (tmp_path / 'csv' / 'signal1.csv').read_text() == "timestamps,signal1\n0.0,1.5\n1.0,2.5\n2.0,3.5\n"
+        assert (tmp_path / 'csv' / 'signal2.csv').read_text() == "timestamps,signal2\n0.0,1\n1.0,2\n"
+
+    def test_write_with_float_precision(self, tmp_path: Path) -> None:
+        """
+        Test that float values are rounded to the given precision
+        """
+        with CsvWriter(tmp_path, float_precision=1) as writer:
+            writer.write({'signal1': [(10.0, 1.26), (10.5, 2.34)]})
+
+        assert (tmp_path / 'signal1.csv').read_text() == "timestamps,signal1\n0.0,1.3\n0.5,2.3\n"
+
+
+class TestResampledCsvWriter:
+    """
+    UTs for the ResampledCsvWriter class
+    """
+
+    def test_write_chunks(self, chunk_results, tmp_path: Path) -> None:
+        """
+        Test that all signals are written to one CSV file on a common time grid
+        """
+        with ResampledCsvWriter(tmp_path / 'resampled' / 'output.csv', rate=1.0) as writer:
+            for signals_dict in chunk_results:
+                writer.write(signals_dict)
+
+        assert (tmp_path / 'resampled' / 'output.csv').read_text() == (
+            "timestamps,signal1,signal2,signal3\n"
+            "0.0,1.5,nan,nan\n"
+            "1.0,2.5,1.0,nan\n"
+            "2.0,3.5,2.0,nan\n")
+
+    def test_write_linear(self, tmp_path: Path) -> None:
+        """
+        Test that the values are interpolated linearly and rounded to the given precision
+        """
+        with ResampledCsvWriter(tmp_path / 'output.csv', rate=4.0, method='linear', float_precision=2) as writer:
+            writer.write({'signal1': [(100.0, 0.0), (101.0, 1.0)]})
+
+        assert (tmp_path / 'output.csv').read_text() == (
+            "timestamps,signal1\n0.0,0.0\n0.25,0.25\n0.5,0.5\n0.75,0.75\n1.0,1.0\n")
+
+
+class TestParquetWriter:
+    """
+    UTs for the ParquetWriter class
+    """
+
+    def test_write_chunks(self, chunk_results, tmp_path: Path) -> None:
+        """
+        Test that one Parquet file per signal is written with typed columns and the samples of all chunks
+        """
+        with ParquetWriter(tmp_path / 'parquet') as writer:
+            for signals_dict in chunk_results:
+                writer.write(signals_dict)
+
+        assert sorted(path.name for path in (tmp_path / 'parquet').glob('*')) == [
+            'signal1.parquet', 'signal2.parquet', 'signal3.parquet']
+        table = pq.read_table(tmp_path / 'parquet' / 'signal1.parquet')
+        assert table.column_names == ['timestamps', 'signal1']
+        assert table.column('timestamps').to_pylist() == [0.0, 1.0, 2.0]
+        assert table.column('signal1').to_pylist() == [1.5, 2.5, 3.5]
+        assert str(pq.read_schema(tmp_path / 'parquet' / 'signal2.parquet').field('signal2').type) == 'int64'
+
+    def test_write_row_groups(self, tmp_path: Path) -> None:
+        """
+        Test that the samples are written in row groups of the given size, cast to the type of the first chunk
+        """
+        with ParquetWriter(tmp_path, compression=None, row_group_size=4) as writer:
+            for start in range(0, 10, 3):
+                writer.write({'signal1': [(float(i), i) for i in range(start, min(start + 3, 10))]})
+            writer.write({'signal1': [(10.0, 10.7)]})
+
+        parquet_file = pq.ParquetFile(tmp_path / 'signal1.parquet')
+        assert [parquet_file.metadata.row_group(i).num_rows for i in range(parquet_file.num_row_groups)] == [6, 4, 1]
+        assert parquet_file.read().column('signal1').to_pylist() == list(range(11))
+
+    def test_write_strings(self, tmp_path: Path) -> None:
+        """
+        Test that string values are written as string column
+        """
+        with ParquetWriter(tmp_path) as writer:
+            writer.write({'gear': [(0.0, 'P'), (1.0, 'D')]})
+
+        assert pq.read_table(tmp_path / 'gear.parquet').column('gear').to_pylist() == ['P', 'D']
+
+
+class TestFeatherWriter:
+    """
+    UTs for the FeatherWriter class
+    """
+
+    def test_write_chunks(self, chunk_results, tmp_path: Path) -> None:
+        """
+        Test that one Feather file per signal is written with the samples of all chunks
+        """
+        with FeatherWriter(tmp_path, compression='lz4') as writer:
+            for signals_dict in chunk_results:
+                writer.write(signals_dict)
+
+        table = feather.read_table(tmp_path / 'signal1.feather')
+        assert table.column('timestamps').to_pylist() == [0.0, 1.0, 2.0]
+        assert table.column('signal1').to_pylist() == [1.5, 2.5, 3.5]
+        assert feather.read_table(tmp_path / 'signal3.feather').column('signal3').to_pylist() == [7]
+
+
+class TestCreateWriter:
+    """
+    UTs for the create_writer function
+    """
+
+    def test_create_writer(self, tmp_path: Path) -> None:
+        """
+        Test that the writer of the output format is created
+        """
+        assert isinstance(create_writer('mf4', tmp_path / 'output.mf4'), Mf4Writer)
+        assert isinstance(create_writer('csv', tmp_path, float_precision=3), CsvWriter)
+        assert isinstance(create_writer('resampled', tmp_path / 'output.csv', rate=10.0), ResampledCsvWriter)
+        assert isinstance(create_writer('parquet', tmp_path, compression='snappy'), ParquetWriter)
+        assert isinstance(create_writer('feather', tmp_path), FeatherWriter)
+
+    def test_create_writer_with_unsupported_format(self, tmp_path: Path) -> None:
+        """
+        Test that an unsupported output format raises a ValueError
+        """
+        with pytest.raises(ValueError):
+            create_writer('xlsx', tmp_path)
@@ -1,9 +1,13 @@
 # -*- coding: utf-8 -*-
+import os
+import shutil
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
-from blf_converter.common.utils import load_dbc_files
+from blf_converter.common.utils import (get_channel_dbc_files, get_dbc_cache_key, get_frame_ids, load_dbc_files,
+                                        resolve_signal_selectors)
 
 
 @pytest.fixture(scope="function")
@@ -58,6 +62,191 @@ class TestLoadDbcFiles:
         with pytest.raises(FileNotFoundError):
             load_dbc_files(invalid_dbc_files)
 
+    def test_load_dbc_files_invalid_with_cache(self, invalid_dbc_files, tmp_path):
+        """
+        Test that missing DBC files are reported with an enabled cache.
+        """
+        with pytest.raises(FileNotFoundError):
+            load_dbc_files(invalid_dbc_files, tmp_path)
+
+
+class TestDbcCache:
+    """
+    UTs for the cache of load_dbc_files
+    """
+    @pytest.fixture
+    def dbc_file(self, tmp_path):
+        """
+        Copy a DBC file to a temporary directory, so it can be modified.
+
+        Yields
+        -------
+        Path
+            The copied DBC file.
+        """
+        dbc_file = tmp_path / 'robot.dbc'
+        shutil.copy('tests/testdata/ABDRobot_Bus1_export_Crossing.DBC', dbc_file)
+        yield dbc_file
+
+    def test_cache_is_created(self, dbc_file, tmp_path):
+        """
+        Test that the loaded database is stored in the cache directory.
+        """
+        cache_dir = tmp_path / 'cache'
+        db = load_dbc_files([dbc_file], cache_dir)
+        assert (cache_dir / f"{get_dbc_cache_key([dbc_file])}.pickle").is_file()
+        assert db.get_message_by_frame_id(0x64B).name == load_dbc_files([dbc_file]).get_message_by_frame_id(
+            0x64B).name
+
+    def test_cache_is_used(self, dbc_file, tmp_path):
+        """
+        Test that the database is loaded from the cache if the DBC file did not change.
+        """
+        cache_dir = tmp_path / 'cache'
+        load_dbc_files([dbc_file], cache_dir)
+        with patch('cantools.database.Database.add_dbc_file') as add_dbc_file:
+            db = load_dbc_files([dbc_file], cache_dir)
+        add_dbc_file.assert_not_called()
+        assert get_frame_ids(db, ['MpYawAngle']) == {0x643}
+
+    def test_cache_is_invalidated(self, dbc_file, tmp_path):
+        """
+        Test that a modified DBC file is loaded again instead of using the cache.
+        """
+        cache_dir = tmp_path / 'cache'
+        load_dbc_files([dbc_file], cache_dir)
+        dbc_file.write_text(dbc_file.read_text(encoding='cp1252').replace('MpYawAngle', 'MpYawAngleRenamed'),
+                            encoding='cp1252')
+        db = load_dbc_files([dbc_file], cache_dir)
+        assert get_frame_ids(db, ['MpYawAngleRenamed']) == {0x643}
+        assert len(list(cache_dir.glob('*.pickle'))) == 2
+
+    def test_invalid_cache_file(self, dbc_file, tmp_path):
+        """
+        Test that an unreadable cache file is replaced.
+        """
+        cache_dir = tmp_path / 'cache'
+        cache_dir.mkdir()
+        cache_file = cache_dir / f"{get_dbc_cache_key([dbc_file])}.pickle"
+        cache_file.write_bytes(b'invalid')
+        db = load_dbc_files([dbc_file], cache_dir)
+        assert get_frame_ids(db, ['MpYawAngle']) == {0x643}
+        assert load_dbc_files([dbc_file], cache_dir).get_message_by_frame_id(0x643).name == \
+            db.get_message_by_frame_id(0x643).name
+
+    def test_cache_dir_is_private(self, dbc_file, tmp_path):
+        """
+        Test that a new cache directory is only accessible by the current user.
+        """
+        cache_dir = tmp_path / 'cache'
+        load_dbc_files([dbc_file], cache_dir)
+        assert cache_dir.stat().st_mode & 0o077 == 0
+
+    @pytest.mark.skipif(not hasattr(os, 'getuid'), reason='POSIX permissions')
+    def test_cache_writable_by_others_is_ignored(self, dbc_file, tmp_path):
+        """
+        Test that a cache file which other users can write is not loaded.
+        """
+        cache_dir = tmp_path / 'cache'
+        load_dbc_files([dbc_file], cache_dir)
+        cache_file = cache_dir / f"{get_dbc_cache_key([dbc_file])}.pickle"
+        cache_file.chmod(0o666)
+        with patch('cantools.database.Database.add_dbc_file') as add_dbc_file:
+            load_dbc_files([dbc_file], cache_dir)
+        add_dbc_file.assert_called_once()
+
+
+class TestGetFrameIds:
+    """
+    UTs for the get_frame_ids function
+    """
+    def test_get_frame_ids(self):
+        """
+        Test that only the frame ids of messages carrying a requested signal are returned.
+        """
+        db = load_dbc_files([Path('tests/testdata/ABDRobot_Bus1_export_Crossing.DBC')])
+        frame_ids = get_frame_ids(db, ['TimeToCollisionLongitudinal', 'MpYawAngle', 'UnknownSignal'])
+        assert frame_ids == {0x64B, 0x643}
+
+    def test_get_frame_ids_without_signals(self):
+        """
+        Test that no frame id is returned for an empty signal list.
+        """
+        db = load_dbc_files([Path('tests/testdata/ABDRobot_Bus1_export_Crossing.DBC')])
+        assert get_frame_ids(db, []) == set()
+
+
+class TestResolveSignalSelectors:
+    """
+    UTs for the resolve_signal_selectors function
+    """
+    @pytest.fixture
+    def robot_db(self):
+        return load_dbc_files([Path('tests/testdata/ABDRobot_Bus1_export_Crossing.DBC')])
+
+    @pytest.mark.parametrize('signal_list, expected', [
+        (['MpYawAngle', 'TimeToCollisionLongitudinal'],
+         {0x643: {'MpYawAngle'}, 0x64B: {'TimeToCollisionLongitudinal'}}),
+        (['MpYaw*'], {0x643: {'MpYawAngle'}, 0x644: {'MpYawVelocity'}}),
+        (['re:Mp(Roll|Pitch)Angle'], {0x642: {'MpRollAngle', 'MpPitchAngle'}}),
+        (['CMABD04_BUS1.*'], {0x643: {'MpYawAngle', 'MpTime'}}),
+        (['CMABD0[23]_BUS1.re:.*Lateral.*'], {0x641: {'MpLateralVelocity'}, 0x642: {'MpLateralAcceleration'}}),
+        (['MpTime', 'CMABD04_BUS1.*'], {0x643: {'MpYawAngle', 'MpTime'}}),
+        (['CMABD*.MpYaw*'], {0x643: {'MpYawAngle'}, 0x644: {'MpYawVelocity'}}),
+    ])
+    def test_resolve_signal_selectors(self, robot_db, signal_list: list, expected: dict):
+        """
+        Test that names, glob patterns, regular expressions and message selectors select the signals per frame id.
+        """
+        assert resolve_signal_selectors(robot_db, signal_list) == (expected, [])
+
+    def test_unmatched_selectors(self, robot_db):
+        """
+        Test that selectors without signals are returned and selectors are case-sensitive.
+        """
+        selected, unmatched = resolve_signal_selectors(robot_db,
+                                                       ['mpyawangle', 'Unknown*', 're:MpTime', 'CMABD04_BUS1.Mp'])
+
+        assert selected == {0x643: {'MpTime'}}
+        assert unmatched == ['mpyawangle', 'Unknown*', 'CMABD04_BUS1.Mp']
+
+    def test_invalid_regular_expression(self, robot_db):
+        """
+        Test that an invalid regular expression raises a ValueError.
+        """
+        with pytest.raises(ValueError):
+            resolve_signal_selectors(robot_db, ['re:Mp(Yaw'])
+
+
+class TestGetChannelDbcFiles:
+    """
+    UTs for the get_channel_dbc_files function
+    """
+    def test_channel_dbc_files_from_settings_file(self, tmp_path: Path):
+        """
+        Test that the DBC files of the settings file are relative to the settings file and replaced per channel by
+        the command line.
+        """
+        settings_file = tmp_path / 'channels.ini'
+        settings_file.write_text('[channel_dbc]\n1 = powertrain.dbc, hybrid.dbc\n2 = chassis.dbc  # CAN 2\n')
+
+        assert get_channel_dbc_files(None, settings_file) == {1: [tmp_path / 'powertrain.dbc', tmp_path / 'hybrid.dbc'],
+                                                              2: [tmp_path / 'chassis.dbc']}
+        assert get_channel_dbc_files([(2, Path('a.dbc')), (3, Path('b.dbc')), (2, Path('c.dbc'))], settings_file) == \
+            {1: [tmp_path / 'powertrain.dbc', tmp_path / 'hybrid.dbc'], 2: [Path('a.dbc'), Path('c.dbc')],
+             3: [Path('b.dbc')]}
+        assert get_channel_dbc_files() == {}
+
+    def test_invalid_channel_in_settings_file(self, tmp_path: Path):
+        """
+        Test that a channel which is not a positive number raises a ValueError.
+        """
+        settings_file = tmp_path / 'invalid_channels.ini'
+        settings_file.write_text('[channel_dbc]\nCAN1 = powertrain.dbc\n')
+
+        with pytest.raises(ValueError):
+            get_channel_dbc_files(None, settings_file)
+
 
 @pytest.fixture(scope="function")
 def valid_path_mapping():